@@ -2,12 +2,23 @@ import adsk.core, adsk.fusion, traceback
 import os, sys, importlib
 
 from . import config
-from .core import utils, crawler, handler
+from .core import logger, metrics, utils, expressions, graph, evaluator, sweep, crawler, scheduler, payload, snapshot, storage, handler
 
 # Reload when developing (optional but good for Addins)
 importlib.reload(config)
+logger.shutdown() # Stop the previous writer thread before replacing the module
+importlib.reload(logger)
+importlib.reload(metrics)
 importlib.reload(utils)
+importlib.reload(expressions)
+importlib.reload(graph)
+importlib.reload(evaluator)
+importlib.reload(sweep)
 importlib.reload(crawler)
+importlib.reload(scheduler)
+importlib.reload(payload)
+importlib.reload(snapshot)
+importlib.reload(storage)
 importlib.reload(handler)
 
 from .core.handler import ZenPaletteEventHandler
@@ -18,6 +29,7 @@ class ZenParamsAddin:
         self.ui = self.app.userInterface
         self.handlers = []
         self.palette = None
+        self.html_handler = None # Palette event handler (also receives command events)
         
         # Resolve Resource Path
         # We are in src/app.py. Resources are in ../resources
@@ -73,7 +85,13 @@ class ZenParamsAddin:
                 except: pass
             self.handlers.clear()
             
+            # 3. Stop background work (refresh timer / custom event)
+            if self.html_handler:
+                self.html_handler.stop()
+                self.html_handler = None
+            
             utils.log_diag("ZenParams v2 STOPPED.")
+            logger.shutdown() # Write out queued log records
             
         except:
             if self.ui:
@@ -100,9 +118,11 @@ class ZenParamsAddin:
                 utils.log_diag("WARN: Failed to set Docking State (pArea)")
             
             # Bind HTML Event
+            if self.html_handler: self.html_handler.stop()
             on_html_event = ZenPaletteEventHandler(config.PALETTE_ID, self.app_path)
             self.palette.incomingFromHTML.add(on_html_event)
             self.handlers.append((self.palette.incomingFromHTML, on_html_event))
+            self.html_handler = on_html_event
             
         else:
             if toggle:
@@ -136,6 +156,16 @@ class ZenParamsAddin:
         self.app.documentActivated.add(on_doc)
         self.handlers.append((self.app.documentActivated, on_doc))
 
+        # Doc Saving (the crawler index is stored in the design before it's written)
+        on_saving = DocumentSavingHandler(self)
+        self.app.documentSaving.add(on_saving)
+        self.handlers.append((self.app.documentSaving, on_saving))
+        
+        # Command Terminated (Auto-Sort triggers, debounced by the palette handler)
+        on_cmd = CommandTerminatedHandler(self)
+        self.ui.commandTerminated.add(on_cmd)
+        self.handlers.append((self.ui.commandTerminated, on_cmd))
+
 # -----------------------------------------------------------------------------
 # EVENT HANDLERS
 # -----------------------------------------------------------------------------
@@ -160,9 +190,31 @@ class StartupCompletedHandler(adsk.core.ApplicationEventHandler):
         except:
             utils.log_diag(traceback.format_exc())
 
+class CommandTerminatedHandler(adsk.core.ApplicationCommandEventHandler):
+    def __init__(self, addin):
+        super().__init__()
+        self.addin = addin
+    def notify(self, args):
+        try:
+            if self.addin.html_handler:
+                self.addin.html_handler.on_command_terminated(args)
+        except:
+            utils.log_diag(traceback.format_exc())
+
 class DocumentActivatedHandler(adsk.core.DocumentEventHandler):
     def __init__(self, addin):
         super().__init__()
         self.addin = addin
     def notify(self, args):
         pass
+
+class DocumentSavingHandler(adsk.core.DocumentEventHandler):
+    def __init__(self, addin):
+        super().__init__()
+        self.addin = addin
+    def notify(self, args):
+        try:
+            if self.addin.html_handler:
+                self.addin.html_handler.on_document_saving(args)
+        except:
+            utils.log_diag(traceback.format_exc())
@@ -7,3 +7,23 @@ PANEL_ID = 'SolidModifyPanel'
 
 DEBUG_MODE = True
 LOG_FILE = 'zen_debug.log'
+LOG_TO_PALETTE = False # Also echo INFO+ messages to the Text Commands palette (opt-in)
+
+# Model parameters sent with the table; the palette pages the rest
+MODEL_PARAM_PAGE_SIZE = 50
+
+# Preset saves arriving within this window are written to disk once (seconds)
+PRESET_SAVE_DELAY = 0.5
+
+# Sweep exports are written here (relative to the add-in folder); the palette only names the file
+SWEEP_EXPORT_DIR = 'exports'
+
+# Auto-sort writes comments in batches of this many, pushing each batch to the palette as a table delta
+SORT_STREAM_BATCH = 100
+
+# Save the crawler's dependency index in the design on save (reopening skips the full crawl)
+PERSIST_INDEX = True
+
+# Metrics dump: one JSON line of timings per interval (empty = off; relative to src/)
+METRICS_DUMP_FILE = ''
+METRICS_DUMP_INTERVAL = 60
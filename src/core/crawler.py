@@ -1,27 +1,156 @@
 import adsk.core, adsk.fusion
 import traceback
-import re
-from .utils import log_diag
+import zlib
+from .utils import log_diag, log_file
+from .expressions import extract_references, shadowed
+from .graph import ParamGraph
+from .metrics import timed
+
+STATE_VERSION = 2 # export_state() format; older saved states are ignored (full build)
+INDEX_KEY = "crawler_index" # ZenStorage blob holding the saved state
 
 class ZenDependencyCrawler:
     """
     Analyzes parameter dependencies to find what geometry they drive.
     OPTIMIZED (v2): Uses Forward-Indexing O(N) instead of Matrix Scan O(NxM).
+    OPTIMIZED (v3): update_map() patches only what changed since the last build.
+    v3: ParamGraph follows param -> param -> feature chains (Wall = Base*2 drives Base too).
+    v3: Body paths ("Comp/Body") are cached by body token across refreshes (see _body_path).
+    v3: The built maps can be saved into the design and restored on reopen (export_state / restore).
     """
-    def __init__(self, design):
+    def __init__(self, design, state=None):
+        """state: a saved export_state(); restored instead of crawling when it still fits the design."""
         self.design = design
         self.entity_map = {} # { entity_token: set(body_names) }
-        self.dependency_index = {} # { user_param_name: set(owner_tokens) }
-        self.refresh_map()
+        self.dependency_index = {} # { user_param_name: set(owner_tokens) } (direct uses only)
+        self.graph = ParamGraph() # Full param -> param -> owner graph (transitive queries)
+        self.changed_params = set() # User params whose owner set changed in the last build/update
+
+        # Incremental bookkeeping (lets update_map patch instead of rebuild)
+        self._timeline_state = {} # { item_token: signature }
+        self._item_contribs = {} # { item_token: { entity_token: set(paths) } }
+        self._entity_sources = {} # { entity_token: set(item_tokens) }
+        self._param_state = {} # { model_param_name: (expression, owner_token, refs) }
+        self._index_counts = {} # { user_param_name: { owner_token: model_param_count } }
+        self._user_param_names = set()
+        self._touched = set() # Params (and their old refs) patched during the current update
+        self._body_names = {} # { user_param_name: tuple(body paths) } memo of get_param_body_name
+
+        # Resolved names, kept across refresh_map (only dropped for changed items / renamed components)
+        self._path_cache = {} # { body_token: (component_token, body name, "Comp/Body") }
+        self._comp_names = {} # { component_token: name }
+        self._item_bodies = {} # { item_token: set(body_tokens) } bodies each timeline item resolved
+        self._path_stats = {'hits': 0, 'misses': 0, 'invalidated': 0} # Current / last pass
+        self._path_totals = {'hits': 0, 'misses': 0, 'invalidated': 0}
+
+        # What the maps were built from (see fingerprint) / what the design holds
+        self.built_fingerprint = None
+        self.saved_fingerprint = None
+        self._param_crc = 0
+        self._param_count = 0
+        self._names_crc = 0
+
+        if not (state and self.restore(state)):
+            self.refresh_map()
 
     def refresh_map(self):
         """
         Rebuilds the reverse map. Call this when new geometry is created.
         """
+        old_state = self._timeline_state
+        self._clear_maps()
+        self._begin_path_pass()
+        with timed('crawler.reverse_map'):
+            self._build_reverse_map(old_state)
+        with timed('crawler.dependency_index'):
+            self._build_dependency_index()
+        self.changed_params = set(self._user_param_names)
+        self.built_fingerprint = self._built_fingerprint()
+        self._end_path_pass()
+
+    def _clear_maps(self):
         self.entity_map = {}
         self.dependency_index = {}
-        self._build_reverse_map()
-        self._build_dependency_index()
+        self.changed_params = set()
+        self._timeline_state = {}
+        self._item_contribs = {}
+        self._entity_sources = {}
+        self._param_state = {}
+        self._index_counts = {}
+        self._user_param_names = set()
+        self._body_names = {}
+        self.graph.clear()
+
+    def update_map(self, scan_timeline=True):
+        """
+        Incremental refresh. Diffs the timeline and the parameter table against
+        the last build and patches only the entries that were added, removed or changed.
+        scan_timeline=False skips the timeline diff (usage-only commands like Dimension).
+        Returns the set of user parameter names whose owner set changed.
+        """
+        if not self._timeline_state and not self._param_state:
+            self.refresh_map()
+            return self.changed_params
+
+        if scan_timeline:
+            self._begin_path_pass()
+            if self.built_fingerprint and self._names_crc != self.built_fingerprint.get('names'):
+                # Renamed body / component: paths of untouched items are stale too
+                # (the path cache keeps the rebuild to token + name reads)
+                log_file("Crawler: body or component renamed, rebuilding the map")
+                self.refresh_map()
+                return self.changed_params
+
+        self.changed_params = set()
+        self._touched = set()
+        try:
+            changed_entities = set()
+            if scan_timeline:
+                with timed('crawler.update_reverse_map'):
+                    changed_entities = self._update_reverse_map()
+                self._end_path_pass()
+            with timed('crawler.update_dependency_index'):
+                self._update_dependency_index()
+
+            # Owners whose body paths moved -> the params they own are touched too
+            for token in changed_entities:
+                self._touched.update(self.graph.owned_by(token))
+
+            # Anything upstream of a touched param (Base for Wall = Base*2) changed as well
+            for name in self._touched:
+                for p_name in self.graph.ancestors(name) | {name}:
+                    if p_name in self._user_param_names:
+                        self.changed_params.add(p_name)
+
+            # Only the params whose owners / body paths moved need a new answer
+            for name in [n for n in self._body_names if n in self.changed_params or n not in self._user_param_names]:
+                del self._body_names[name]
+
+            # Without a timeline diff the maps still reflect the last scanned timeline
+            fingerprint = self._built_fingerprint()
+            if not scan_timeline and self.built_fingerprint:
+                fingerprint.update({k: self.built_fingerprint.get(k) for k in ('timeline', 'marker', 'items', 'names')})
+            self.built_fingerprint = fingerprint
+        except Exception as e:
+            log_diag(f"Crawler Update Error: {e}")
+            self.refresh_map()
+
+        return self.changed_params
+
+    def relink_param(self, name, refs):
+        """
+        Re-links one parameter whose expression ZenParams just wrote (API writes fire no
+        commandTerminated, so no update_map follows). Its owner is kept; the memoized
+        body answers of every param upstream of it, before and after, are dropped.
+        """
+        stale = self.graph.ancestors(name) | {name}
+        self.graph.set_param(name, refs, self.graph.owner(name))
+        for p_name in stale | self.graph.ancestors(name):
+            self._body_names.pop(p_name, None)
+
+    def user_param_names(self) -> frozenset:
+        """User parameter names as of the last build / update."""
+        return frozenset(self._user_param_names)
 
     def get_param_body_name(self, param):
         """
@@ -30,16 +159,85 @@ class ZenDependencyCrawler:
             - None if no usage found (Unused)
             - ["ComponentName/BodyName"] if used by exactly one body
             - ["Comp1/Body1", "Comp2/Body2", ...] if used by multiple bodies (Shared)
+        Answers are memoized until a rebuild (refresh_map) or an update that changes them (update_map).
         """
         if not param.isValid: return None
         
         target_name = param.name
-        
-        # O(1) Lookup (Forward Index)
-        if target_name not in self.dependency_index:
-            return None
+        paths = self._body_names.get(target_name)
+        if paths is None:
+            paths = self._body_names[target_name] = self._resolve_body_names(target_name)
+        return list(paths) if paths else None
+
+    def categorize_all(self):
+        """
+        Category of every user parameter in one pass:
+            { name: {'category': 'Comp/Body' | 'Shared' | 'Unused', 'bodies': [paths]} }
+        Body paths are propagated upstream through the parameter graph once
+        (downstream params first), so the cost follows the number of graph edges
+        instead of one closure walk per parameter. Results fill the get_param_body_name memo.
+        """
+        with timed('crawler.categorize_all'):
+            paths = self._propagate_paths()
+            result = {}
+            for name in self._user_param_names:
+                bodies = self._body_names.get(name)
+                if bodies is None:
+                    found = paths.get(name)
+                    bodies = _prune_paths(found) if found is not None else self._resolve_body_names(name)
+                    self._body_names[name] = bodies
+                result[name] = {'category': category_for(bodies), 'bodies': list(bodies)}
+            return result
+
+    def _propagate_paths(self):
+        """
+        { param_name: set of body paths } for user params and everything downstream of them:
+        paths(p) = entity_map[owner(p)] + paths of every param referencing p.
+        Depth-first from each user param with a shared memo, so every reachable param and
+        edge is visited once (per-param closures revisit shared downstream chains).
+        Params in (or upstream of) a reference cycle are left out; callers resolve those one by one.
+        The returned sets may be shared with entity_map / each other: read only.
+        """
+        graph = self.graph
+        open_ = object() # Being expanded (seen again before it's done -> cycle)
+        paths = {}
+        for root in self._user_param_names:
+            if root in paths: continue
+            stack = [(root, None)]
+            while stack:
+                name, children = stack.pop()
+                if children is None:
+                    # First visit: expand, come back once the children are done
+                    if name in paths: continue
+                    paths[name] = open_
+                    children = graph.dependents(name)
+                    stack.append((name, children))
+                    stack.extend((child, None) for child in children if child not in paths)
+                    continue
+
+                parts = []
+                own = self.entity_map.get(graph.owner(name))
+                if own: parts.append(own)
+                for child in children:
+                    child_paths = paths.get(child)
+                    if child_paths is None or child_paths is open_:
+                        parts = None # Cycle below this param
+                        break
+                    if child_paths: parts.append(child_paths)
+
+                if parts is None: paths[name] = None
+                elif not parts: paths[name] = _EMPTY
+                elif len(parts) == 1: paths[name] = parts[0] # Chains share one set
+                else: paths[name] = set().union(*parts)
+        return {name: found for name, found in paths.items() if found is not None and found is not open_}
+
+    def _resolve_body_names(self, target_name):
+        """Body paths driven by a parameter (sorted, redundant component paths pruned); () if none."""
+        # O(1) Lookup (cached transitive closure: direct uses + params derived from it)
+        token_list = self.graph.owners(target_name)
+        if not token_list:
+            return ()
             
-        token_list = self.dependency_index[target_name]
         driven_paths = set()
         
         for token in token_list:
@@ -52,15 +250,7 @@ class ZenDependencyCrawler:
             # For now, we stick to the Body-Level mapping which is what entity_map provides.
 
         # Prune redundant paths (e.g. if we have "Comp" and "Comp/Body", remove "Comp")
-        final_paths = set(driven_paths)
-        for p in driven_paths:
-            is_redundant = any(other.startswith(p + "/") for other in driven_paths)
-            if is_redundant:
-                final_paths.discard(p)
-                
-        if len(final_paths) == 0: 
-            return None
-        return list(final_paths)
+        return _prune_paths(driven_paths)
 
     def _build_dependency_index(self):
         """
@@ -69,38 +259,138 @@ class ZenDependencyCrawler:
         """
         try:
             # 1. Get all User Param names set for O(1) checking
-            user_param_names = set([p.name for p in self.design.userParameters])
-            if not user_param_names: return
+            self._user_param_names = set([p.name for p in self.design.userParameters])
 
-            # 2. Regex for variable extraction
-            # Matches valid fusion param names: letters, numbers, underscores
-            var_pattern = re.compile(r'[a-zA-Z_][a-zA-Z0-9_]*')
-            
-            # 3. Iterate ALL parameters ONCE
+            # 2. Iterate ALL parameters ONCE (refs are kept even without user params,
+            #    so update_map can re-intersect them later without re-reading)
+            self._param_crc = 0
+            self._param_count = 0
             for model_param in self.design.allParameters:
-                if not model_param.expression: continue
-                
-                # Check for usage
-                refs = set(var_pattern.findall(model_param.expression))
-                found_params = refs.intersection(user_param_names)
-                
-                if not found_params: continue
-                
-                # Found usage! Now identify the Owner Entity
-                owner_token = self._get_owner_token(model_param)
-                if not owner_token: continue
-                
-                # Record in Index
-                for p_name in found_params:
-                    if p_name not in self.dependency_index:
-                        self.dependency_index[p_name] = set()
-                    self.dependency_index[p_name].add(owner_token)
+                name = model_param.name
+                expr = model_param.expression
+                self._hash_param(name, expr)
+                self._index_param(model_param, name, expr)
 
             # log_diag(f"Dependency Index Built: {len(self.dependency_index)} active user params.")
 
         except Exception as e:
             log_diag(f"Index Build Error: {e}")
 
+    def _update_dependency_index(self):
+        """Patches the index for model parameters added, removed or edited since the last pass."""
+        user_names = set([p.name for p in self.design.userParameters])
+        added_users = user_names - self._user_param_names
+        removed_users = self._user_param_names - user_names
+
+        # 1. Deleted user params drop out of the index wholesale
+        for p_name in removed_users:
+            self._index_counts.pop(p_name, None)
+            self.dependency_index.pop(p_name, None)
+        self._user_param_names = user_names
+
+        # 2. New / edited / deleted model params
+        seen = set()
+        patched = set()
+        self._param_crc = 0
+        self._param_count = 0
+        for model_param in self.design.allParameters:
+            name = model_param.name
+            expr = model_param.expression
+            self._hash_param(name, expr)
+            seen.add(name)
+            old = self._param_state.get(name)
+            if old is not None and old[0] == expr: continue
+            patched.add(name)
+            self._unindex_param(name, user_names - added_users)
+            self._index_param(model_param, name, expr, owner_hint=old[1] if old else None)
+
+        for name in [n for n in self._param_state if n not in seen]:
+            self._unindex_param(name, user_names - added_users)
+            del self._param_state[name]
+            self.graph.remove_param(name)
+
+        # 3. New user params -> re-intersect only the untouched expressions naming them
+        if added_users:
+            reserved = shadowed(added_users) # New 'W' / 'N': stored refs skipped them as units
+            for name, (expr, owner, refs) in list(self._param_state.items()):
+                if reserved and name not in patched:
+                    more = extract_references(expr, reserved) - refs
+                    if more:
+                        refs = refs | more
+                        self._param_state[name] = (expr, owner, refs)
+                        self.graph.set_param(name, refs, owner)
+                found = refs & added_users
+                if not found or name in patched: continue
+                if not owner:
+                    model_param = self.design.allParameters.itemByName(name)
+                    owner = self._get_owner_token(model_param) if model_param else None
+                    if not owner: continue
+                    self._param_state[name] = (expr, owner, refs)
+                    self.graph.set_param(name, refs, owner)
+                for p_name in found:
+                    self._index_add(p_name, owner)
+
+    def _hash_param(self, name, expr):
+        """Feeds one parameter into the running fingerprint hash (same order as allParameters)."""
+        self._param_crc = zlib.crc32(f"{name}={expr};".encode('utf-8'), self._param_crc)
+        self._param_count += 1
+
+    def _index_param(self, model_param, name, expr, owner_hint=None):
+        """Records one model parameter's user-param references in the index."""
+        if not expr:
+            self._param_state[name] = (expr, owner_hint, frozenset())
+            self.graph.set_param(name, (), owner_hint)
+            return
+
+        # Tokenized refs (units/functions/literals skipped), cached per expression string
+        refs = extract_references(expr, self._user_param_names) # A param named 'W' isn't watts
+        found_params = refs.intersection(self._user_param_names)
+
+        # Found usage! Now identify the Owner Entity (owners never move, reuse if known)
+        # Any reference counts: d13 = d12*2 still has to lead back to d13's sketch.
+        owner_token = owner_hint
+        if refs and not owner_token and name not in self._user_param_names:
+            owner_token = self._get_owner_token(model_param)
+
+        self._param_state[name] = (expr, owner_token, refs)
+        self.graph.set_param(name, refs, owner_token)
+        self._touched.add(name)
+        if not owner_token: return
+
+        # Record in Index
+        for p_name in found_params:
+            self._index_add(p_name, owner_token)
+
+    def _unindex_param(self, name, user_names):
+        """Reverses _index_param for the user params that were known when it was indexed."""
+        old = self._param_state.get(name)
+        if not old: return
+        self._touched.add(name)
+        self._touched.update(old[2])
+        if not old[1]: return
+        for p_name in old[2].intersection(user_names):
+            self._index_remove(p_name, old[1])
+
+    def _index_add(self, p_name, owner_token):
+        counts = self._index_counts.setdefault(p_name, {})
+        counts[owner_token] = counts.get(owner_token, 0) + 1
+        if counts[owner_token] == 1:
+            self.dependency_index.setdefault(p_name, set()).add(owner_token)
+            self.changed_params.add(p_name)
+
+    def _index_remove(self, p_name, owner_token):
+        counts = self._index_counts.get(p_name)
+        if not counts or owner_token not in counts: return
+        counts[owner_token] -= 1
+        if counts[owner_token] > 0: return
+
+        del counts[owner_token]
+        owners = self.dependency_index.get(p_name)
+        if owners is not None:
+            owners.discard(owner_token)
+            if not owners: del self.dependency_index[p_name]
+        self.changed_params.add(p_name)
+
     def _get_owner_token(self, model_param):
         """Trace back a model parameter to its owning entity."""
         try:
@@ -123,72 +413,412 @@ class ZenDependencyCrawler:
             return None
         except: return None
 
-    def _build_reverse_map(self):
+    def _build_reverse_map(self, old_state=None):
         """
         Scans the design to find which Features/Sketches own which Bodies.
         Populates self.entity_map.
+        old_state: timeline signatures of the previous build; items whose signature
+        changed (or that are gone) lose their cached body paths.
         """
         try:
+            old_state = old_state or {}
             timeline = self.design.timeline
             for i in range(timeline.count):
                 obj = timeline.item(i)
-                feat = obj.entity
-                if not feat or not feat.isValid: continue
-                
-                # Features that produce bodies
-                if hasattr(feat, 'bodies') and feat.bodies.count > 0:
-                    for k in range(feat.bodies.count):
-                        body = feat.bodies.item(k)
-                        if body and body.isValid:
-                            comp_name = body.parentComponent.name if body.parentComponent else "Root"
-                            path = f"{comp_name}/{body.name}"
-                            self._map_entity(feat, path)
-                            self._map_feature_to_sketch(feat, path)
-                
-                # Sketch on Face logic
-                if isinstance(feat, adsk.fusion.Sketch):
-                    try:
-                        is_mapped = False
-                        plane = feat.referencePlane
-                        if isinstance(plane, adsk.fusion.BRepFace):
-                            body = plane.body
-                            if body and body.isValid:
-                                comp_name = body.parentComponent.name if body.parentComponent else "Root"
-                                path = f"{comp_name}/{body.name}"
-                                self._map_entity(feat, path)
-                                is_mapped = True
-                        
-                        # Fallback: Component mapping
-                        if not is_mapped and feat.parentComponent:
-                            self._map_entity(feat, feat.parentComponent.name)
-                    except: pass
+                item_token, signature = self._timeline_signature(obj)
+                if not item_token: continue
+                self._timeline_state[item_token] = signature
+                if old_state.get(item_token) != signature:
+                    self._invalidate_item_paths(item_token)
+                self._set_item_contribs(item_token, self._scan_timeline_item(obj.entity, item_token))
+
+            for item_token in [t for t in self._item_bodies if t not in self._timeline_state]:
+                self._invalidate_item_paths(item_token)
             
             # log_diag(f"Crawler Map Built: {len(self.entity_map)} entities mapped.")
 
         except Exception as e:
             log_diag(f"Crawler Map Error: {e}")
 
-    def _map_entity(self, entity, path):
+    def _update_reverse_map(self):
+        """
+        Re-scans only timeline items that are new or whose signature changed,
+        and drops the contributions of deleted items.
+        Returns the set of entity tokens whose body paths changed.
+        """
+        changed_entities = set()
+        seen = set()
+        timeline = self.design.timeline
+        for i in range(timeline.count):
+            obj = timeline.item(i)
+            item_token, signature = self._timeline_signature(obj)
+            if not item_token: continue
+            seen.add(item_token)
+            if self._timeline_state.get(item_token) == signature: continue
+
+            self._timeline_state[item_token] = signature
+            self._invalidate_item_paths(item_token)
+            changed_entities.update(self._set_item_contribs(item_token, self._scan_timeline_item(obj.entity, item_token)))
+
+        for item_token in [t for t in self._timeline_state if t not in seen]:
+            del self._timeline_state[item_token]
+            self._invalidate_item_paths(item_token)
+            changed_entities.update(self._set_item_contribs(item_token, {}))
+
+        return changed_entities
+
+    def _timeline_signature(self, obj):
+        """
+        Per-item fingerprint: (token, (suppressed, rolled back, body tokens, input tokens)).
+        Input tokens are the sketches a feature uses, or the body a sketch sits on, so an
+        Edit Feature that swaps profile / target body / face is seen even if the body
+        count stays the same. Tokens only - no names or paths are resolved here.
+        """
         try:
-            token = entity.entityToken
-            if token not in self.entity_map:
-                self.entity_map[token] = set()
-            self.entity_map[token].add(path)
+            feat = obj.entity
+            if not feat or not feat.isValid: return None, None
+            bodies = ()
+            if hasattr(feat, 'bodies'):
+                coll = feat.bodies
+                bodies = tuple(coll.item(k).entityToken for k in range(coll.count))
+            if isinstance(feat, adsk.fusion.Sketch):
+                plane = feat.referencePlane
+                body = plane.body if isinstance(plane, adsk.fusion.BRepFace) else None
+                inputs = (body.entityToken,) if body else ()
+            else:
+                inputs = tuple(sk.entityToken for sk in self._input_sketches(feat))
+            return feat.entityToken, (obj.isSuppressed, obj.isRolledBack, bodies, inputs)
+        except: return None, None
+
+    def _set_item_contribs(self, item_token, contribs):
+        """
+        Replaces what one timeline item contributes to entity_map.
+        Returns the entity tokens whose path sets actually changed.
+        """
+        old = self._item_contribs.pop(item_token, {})
+        if contribs:
+            self._item_contribs[item_token] = contribs
+
+        touched = set(old.keys()) | set(contribs.keys())
+        changed = set()
+        for token in touched:
+            sources = self._entity_sources.setdefault(token, set())
+            if token in contribs: sources.add(item_token)
+            else: sources.discard(item_token)
+
+            paths = set()
+            for src in sources:
+                paths.update(self._item_contribs[src].get(token, ()))
+
+            if not sources: del self._entity_sources[token]
+            if paths != self.entity_map.get(token, set()):
+                changed.add(token)
+            if paths: self.entity_map[token] = paths
+            else: self.entity_map.pop(token, None)
+        return changed
+
+    def _scan_timeline_item(self, feat, item_token=None):
+        """Returns { entity_token: set(paths) } produced by one timeline entity (item_token = feat.entityToken)."""
+        sink = {}
+        try:
+            # Features that produce bodies
+            if hasattr(feat, 'bodies') and feat.bodies.count > 0:
+                sketches = self._input_sketches(feat)
+                for k in range(feat.bodies.count):
+                    body = feat.bodies.item(k)
+                    if body and body.isValid:
+                        path = self._body_path(body, item_token)
+                        self._map_entity(feat, path, sink, item_token)
+                        self._map_feature_to_sketch(feat, path, sink, sketches)
+
+            # Sketch on Face logic
+            if isinstance(feat, adsk.fusion.Sketch):
+                try:
+                    is_mapped = False
+                    plane = feat.referencePlane
+                    if isinstance(plane, adsk.fusion.BRepFace):
+                        body = plane.body
+                        if body and body.isValid:
+                            path = self._body_path(body, item_token)
+                            self._map_entity(feat, path, sink, item_token)
+                            is_mapped = True
+
+                    # Fallback: Component mapping
+                    if not is_mapped and feat.parentComponent:
+                        self._map_entity(feat, feat.parentComponent.name, sink)
+                except: pass
+        except Exception as e:
+            log_diag(f"Crawler Item Error: {e}")
+        return sink
+
+    def _map_entity(self, entity, path, sink, token=None):
+        try:
+            token = token or entity.entityToken
+            if token not in sink:
+                sink[token] = set()
+            sink[token].add(path)
         except: pass
 
-    def _map_feature_to_sketch(self, feat, path):
+    # --- Persistence ---
+
+    def fingerprint(self) -> dict:
+        """
+        What the maps depend on, read from the design now: timeline length and
+        marker, parameter count, a hash of every parameter's name and expression,
+        a hash of the timeline item signatures and one of the component / body names.
+        """
+        self._param_crc = 0
+        self._param_count = 0
+        for param in self.design.allParameters:
+            self._hash_param(param.name, param.expression)
+
+        signatures = {}
+        timeline = self.design.timeline
+        for i in range(timeline.count):
+            item_token, signature = self._timeline_signature(timeline.item(i))
+            if item_token: signatures[item_token] = signature
+        self._check_component_names() # Also hashes the names
+
+        return dict(self._timeline_fingerprint(), **self._param_fingerprint(),
+                    items=_signatures_crc(signatures), names=self._names_crc)
+
+    def _built_fingerprint(self) -> dict:
+        """fingerprint() of what the maps were just built from (hashes from memory, no extra reads)."""
+        return dict(self._timeline_fingerprint(), **self._param_fingerprint(),
+                    items=_signatures_crc(self._timeline_state), names=self._names_crc)
+
+    def _timeline_fingerprint(self) -> dict:
+        try:
+            timeline = self.design.timeline
+            return {'timeline': timeline.count, 'marker': timeline.markerPosition}
+        except:
+            return {'timeline': -1, 'marker': -1}
+
+    def _param_fingerprint(self) -> dict:
+        return {'params': self._param_count, 'expr': self._param_crc}
+
+    def export_state(self) -> dict:
+        """
+        The built maps as compact JSON: entity tokens and body paths are listed
+        once and referenced by index. Derived maps (entity_map, the index counts,
+        the graph) are rebuilt by restore().
+        """
+        tokens = {}
+        paths = {}
+        tok = lambda t: tokens.setdefault(t, len(tokens)) if t else -1
+        path = lambda p: paths.setdefault(p, len(paths))
+
+        timeline = [[tok(item), list(sig)] for item, sig in self._timeline_state.items()]
+        contribs = [[tok(item), [[tok(entity), [path(p) for p in sorted(ps)]] for entity, ps in entries.items()]]
+                    for item, entries in self._item_contribs.items()]
+        params = [[name, expr, tok(owner), sorted(refs)] for name, (expr, owner, refs) in self._param_state.items()]
+        return {
+            'v': STATE_VERSION,
+            'fingerprint': self.built_fingerprint,
+            'tokens': list(tokens),
+            'paths': list(paths),
+            'users': sorted(self._user_param_names),
+            'timeline': timeline,
+            'contribs': contribs,
+            'params': params,
+        }
+
+    def restore(self, state) -> bool:
+        """
+        Loads an export_state(). If the design still matches its fingerprint
+        nothing is crawled; otherwise update_map() patches only what differs.
+        Returns False (caller does a full build) for an unknown format or when
+        the saved tokens don't match this design's timeline.
+        """
+        try:
+            if not isinstance(state, dict) or state.get('v') != STATE_VERSION: return False
+            with timed('crawler.restore'):
+                self._clear_maps()
+                tokens = state['tokens']
+                paths = state['paths']
+                tok = lambda i: tokens[i] if i >= 0 else None
+
+                for item, sig in state['timeline']:
+                    self._timeline_state[tok(item)] = tuple(tuple(v) if isinstance(v, list) else v for v in sig)
+                # Same maps _set_item_contribs keeps, filled directly
+                for item, entries in state['contribs']:
+                    item_token = tok(item)
+                    contribs = self._item_contribs[item_token] = {}
+                    for e, ps in entries:
+                        entity = tok(e)
+                        contribs[entity] = item_paths = set(paths[i] for i in ps)
+                        self._entity_sources.setdefault(entity, set()).add(item_token)
+                        self.entity_map.setdefault(entity, set()).update(item_paths)
+
+                self._user_param_names = users = set(state['users'])
+                nodes = []
+                for name, expr, owner, refs in state['params']:
+                    owner = tok(owner)
+                    refs = frozenset(refs)
+                    self._param_state[name] = (expr, owner, refs)
+                    nodes.append((name, refs, owner))
+                    if not owner: continue
+                    for p_name in refs & users:
+                        counts = self._index_counts.setdefault(p_name, {})
+                        counts[owner] = counts.get(owner, 0) + 1
+                        self.dependency_index.setdefault(p_name, set()).add(owner)
+                self.graph.load(nodes)
+
+                # Tokens from another design (copied attributes) or a changed token scheme -> unusable
+                timeline = self.design.timeline
+                for i in range(min(3, timeline.count)):
+                    item_token, _ = self._timeline_signature(timeline.item(i))
+                    if item_token and item_token not in self._timeline_state:
+                        log_diag("Crawler: saved index doesn't match this design's timeline, rebuilding")
+                        self._clear_maps()
+                        return False
+
+            self.built_fingerprint = self.saved_fingerprint = state.get('fingerprint')
+            current = self.fingerprint()
+            if current == self.built_fingerprint:
+                self.changed_params = set(self._user_param_names)
+                log_file(f"Crawler: restored saved index ({len(self._param_state)} params, {len(self.entity_map)} entities)")
+                return True
+
+            if current.get('names') != self.built_fingerprint.get('names'):
+                # Renamed bodies / components: the saved paths are stale wherever they appear
+                log_file("Crawler: saved index has old body names, rebuilding")
+                self.refresh_map()
+                return True
+
+            with timed('crawler.restore_update'):
+                self.update_map()
+            self.changed_params = set(self._user_param_names)
+            log_file("Crawler: restored saved index and patched the changes since it was saved")
+            return True
+        except Exception as e:
+            log_diag(f"Crawler Restore Error: {e}")
+            self._clear_maps()
+            return False
+
+    # --- Body path cache ---
+
+    def _body_path(self, body, item_token=None):
+        """
+        "Comp/Body" for a body. Cached by body token, so an unchanged body costs its
+        token + name per refresh instead of parentComponent + two names.
+        The name is compared on every hit: a body rename doesn't touch the timeline.
+        """
+        token = None
+        try: token = body.entityToken
+        except: pass
+        body_name = body.name
+
+        cached = self._path_cache.get(token) if token else None
+        if cached is not None and cached[1] == body_name:
+            self._path_stats['hits'] += 1
+            if item_token: self._item_bodies.setdefault(item_token, set()).add(token)
+            return cached[2]
+        if cached is not None:
+            self._path_stats['invalidated'] += 1 # Renamed body
+
+        self._path_stats['misses'] += 1
+        comp = body.parentComponent
+        comp_token = None
+        comp_name = "Root"
+        if comp:
+            try: comp_token = comp.entityToken
+            except: pass
+            comp_name = self._comp_names.get(comp_token) if comp_token else None
+            if comp_name is None:
+                comp_name = comp.name
+                if comp_token: self._comp_names[comp_token] = comp_name
+        path = f"{comp_name}/{body_name}"
+
+        if token:
+            self._path_cache[token] = (comp_token, body_name, path)
+            if item_token: self._item_bodies.setdefault(item_token, set()).add(token)
+        return path
+
+    def _invalidate_item_paths(self, item_token):
+        """Drops the cached paths of the bodies a (changed / deleted) timeline item resolved."""
+        for token in self._item_bodies.pop(item_token, ()):
+            if self._path_cache.pop(token, None) is not None:
+                self._path_stats['invalidated'] += 1
+
+    def _check_component_names(self):
+        """
+        One pass over the components: a renamed component drops the paths of its bodies.
+        Also hashes every component and body name (self._names_crc, part of the fingerprint).
+        """
+        crc = 0
+        try:
+            renamed = set()
+            for comp in self.design.allComponents:
+                comp_token = comp.entityToken
+                name = comp.name
+                old = self._comp_names.get(comp_token)
+                if old is not None and old != name:
+                    renamed.add(comp_token)
+                self._comp_names[comp_token] = name
+                names = [name] + [body.name for body in comp.bRepBodies]
+                crc = (crc + zlib.crc32('/'.join(names).encode('utf-8'))) & 0xFFFFFFFF
+            if renamed:
+                stale = [t for t, entry in self._path_cache.items() if entry[0] in renamed]
+                for token in stale:
+                    del self._path_cache[token]
+                self._path_stats['invalidated'] += len(stale)
+        except:
+            # Can't tell what was renamed -> start over
+            self.clear_path_cache()
+            crc = -1
+        self._names_crc = crc
+
+    def _begin_path_pass(self):
+        self._path_stats = {'hits': 0, 'misses': 0, 'invalidated': 0}
+        self._check_component_names()
+
+    def _end_path_pass(self):
+        for key, value in self._path_stats.items():
+            self._path_totals[key] += value
+        stats = self._path_stats
+        looked_up = stats['hits'] + stats['misses']
+        if looked_up:
+            log_file(f"Crawler: body paths {stats['hits']}/{looked_up} cached, {stats['invalidated']} invalidated")
+
+    def clear_path_cache(self):
+        """Forgets every cached body path / component name (next refresh re-reads them all)."""
+        self._path_stats['invalidated'] += len(self._path_cache)
+        self._path_cache = {}
+        self._comp_names = {}
+        self._item_bodies = {}
+
+    def path_cache_stats(self) -> dict:
+        """Body path cache counters for the last pass and since the crawler was created."""
+        def with_rate(stats):
+            looked_up = stats['hits'] + stats['misses']
+            return dict(stats, hit_rate=round(stats['hits'] / looked_up, 3) if looked_up else None)
+        return {
+            'entries': len(self._path_cache),
+            'components': len(self._comp_names),
+            'last': with_rate(self._path_stats),
+            'total': with_rate(self._path_totals),
+        }
+
+    def _map_feature_to_sketch(self, feat, path, sink, sketches=None):
+        for sketch in (self._input_sketches(feat) if sketches is None else sketches):
+            self._map_entity(sketch, path, sink)
+
+    def _input_sketches(self, feat):
+        """Sketches a feature was built from (profiles, hole points, emboss profiles)."""
+        sketches = []
         try:
             # 1. Profile-based
             if hasattr(feat, 'profile'): 
                 profile = feat.profile
                 if profile:
                     if isinstance(profile, adsk.fusion.Profile):
-                        self._map_entity(profile.parentSketch, path)
+                        sketches.append(profile.parentSketch)
                     elif hasattr(profile, 'count'): 
                         for k in range(profile.count):
                             item = profile.item(k)
                             if isinstance(item, adsk.fusion.Profile):
-                                self._map_entity(item.parentSketch, path)
+                                sketches.append(item.parentSketch)
                                 
             # 2. Hole Feature
             if isinstance(feat, adsk.fusion.HoleFeature):
@@ -196,7 +826,7 @@ class ZenDependencyCrawler:
                 if points and points.count > 0:
                     pt = points.item(0)
                     if hasattr(pt, 'parentSketch'):
-                         self._map_entity(pt.parentSketch, path)
+                         sketches.append(pt.parentSketch)
                          
              # 3. Emboss
             if isinstance(feat, adsk.fusion.EmbossFeature):
@@ -204,9 +834,47 @@ class ZenDependencyCrawler:
                  if profs and profs.count > 0:
                      p = profs.item(0)
                      if isinstance(p, adsk.fusion.Profile):
-                         self._map_entity(p.parentSketch, path)
+                         sketches.append(p.parentSketch)
         except: pass
+        return sketches
 
     def get_driven_bodies(self, param):
         name = self.get_param_body_name(param)
         return [name] if name else []
+
+
+_EMPTY = frozenset()
+
+
+def _signatures_crc(signatures):
+    """Order-independent hash of { item_token: signature } (a timeline diff may reorder the dict)."""
+    crc = 0
+    for item_token, signature in signatures.items():
+        crc = (crc + zlib.crc32(repr((item_token, signature)).encode('utf-8'))) & 0xFFFFFFFF
+    return crc
+
+
+def _prune_paths(paths):
+    """
+    Drops paths that are a prefix of another one ("Comp" when "Comp/Body" is there).
+    Prefix tree over the '/' segments: only paths ending on a leaf survive.
+    Linear in the total path length (the old pairwise startswith scan was quadratic).
+    """
+    if len(paths) < 2: return tuple(paths)
+    root = {}
+    ends = [] # (path, its node)
+    for path in paths:
+        node = root
+        for part in path.split('/'):
+            node = node.setdefault(part, {})
+        ends.append((path, node))
+    return tuple(sorted(path for path, node in ends if not node))
+
+
+def category_for(bodies):
+    """Auto-sort category for a body list: 'Unused', the single body path, or 'Shared'."""
+    if not bodies: return "Unused"
+    if len(bodies) == 1:
+        # Clean up root component name
+        return 'Main Design' if bodies[0] == '(Unsaved)' else bodies[0]
+    return "Shared"
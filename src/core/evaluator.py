@@ -0,0 +1,415 @@
+import math
+import random
+from functools import lru_cache
+from .expressions import tokenize, extract_references, shadowed, NUMBER, NAME, UNIT, FUNC, CONST, OP, REF_CACHE_SIZE
+from .graph import batch_order
+
+# Dimensions: (length, angle, mass, time)
+DIMLESS = (0, 0, 0, 0)
+LENGTH = (1, 0, 0, 0)
+ANGLE = (0, 1, 0, 0)
+
+# unit -> (factor to internal units, dimensions)
+# Internal units match Fusion's param.value: cm, rad, kg, s
+UNIT_TABLE = {
+    # Length
+    'mm': (0.1, LENGTH), 'cm': (1.0, LENGTH), 'm': (100.0, LENGTH), 'km': (1e5, LENGTH),
+    'um': (1e-4, LENGTH), 'micron': (1e-4, LENGTH), 'nm': (1e-7, LENGTH),
+    'in': (2.54, LENGTH), 'inch': (2.54, LENGTH), 'ft': (30.48, LENGTH), 'foot': (30.48, LENGTH),
+    'yd': (91.44, LENGTH), 'mi': (160934.4, LENGTH), 'mil': (0.00254, LENGTH),
+    # Angle
+    'deg': (math.pi / 180, ANGLE), 'rad': (1.0, ANGLE), 'grad': (math.pi / 200, ANGLE),
+    # Mass
+    'g': (0.001, (0, 0, 1, 0)), 'kg': (1.0, (0, 0, 1, 0)),
+    'lb': (0.45359237, (0, 0, 1, 0)), 'lbmass': (0.45359237, (0, 0, 1, 0)), 'oz': (0.028349523125, (0, 0, 1, 0)),
+    # Time
+    's': (1.0, (0, 0, 0, 1)), 'sec': (1.0, (0, 0, 0, 1)), 'hr': (3600.0, (0, 0, 0, 1)),
+    # Derived (kg * cm / s^2 based)
+    'N': (100.0, (1, 0, 1, -2)), 'lbf': (444.82216152605, (1, 0, 1, -2)),
+    'Pa': (0.01, (-1, 0, 1, -2)), 'kPa': (10.0, (-1, 0, 1, -2)), 'MPa': (1e4, (-1, 0, 1, -2)),
+    'psi': (68.94757293168, (-1, 0, 1, -2)),
+    'J': (1e4, (2, 0, 1, -2)), 'W': (1e4, (2, 0, 1, -3)),
+}
+
+# Bare numbers next to a quantity ("Wall + 2") are read in these units
+DEFAULT_UNITS = {LENGTH: 'mm', ANGLE: 'deg'}
+
+CONSTANT_VALUES = {'PI': math.pi, 'E': math.e}
+
+# floor/ceil/round snap to this many decimals first (drops unit-conversion float noise)
+SNAP_DIGITS = 9
+
+
+class EvaluationError(ValueError):
+    """Raised when an expression can't be evaluated (syntax, units, unknown names)."""
+    pass
+
+
+class Quantity:
+    """
+    A value in internal units plus its dimensions.
+    bare: a plain number the user typed without a unit ("2"); it takes the unit
+    of whatever it is added to, like Fusion does.
+    """
+    __slots__ = ('value', 'dims', 'bare')
+
+    def __init__(self, value, dims=DIMLESS, bare=False):
+        self.value = value
+        self.dims = dims
+        self.bare = bare
+
+    def __repr__(self):
+        return f"Quantity({self.value!r}, {self.dims}, bare={self.bare})"
+
+    def to(self, unit):
+        """Value expressed in unit (a unit expression such as 'mm' or 'mm * mm')."""
+        factor, dims = unit_info(unit)
+        if dims != self.dims:
+            raise EvaluationError(f"Result is not in {unit or 'a unitless value'}")
+        return self.value / factor
+
+
+@lru_cache(maxsize=256)
+def unit_info(unit):
+    """(factor, dims) of a unit string: 'mm', 'deg', 'mm^2', 'N * m' or '' (unitless)."""
+    if not unit: return (1.0, DIMLESS)
+    q = _eval(compile_expression(unit), {}, None)
+    return (q.value, q.dims)
+
+
+# --- PARSER ---
+# AST nodes are tuples: ('num', v) ('unit', name) ('const', name) ('name', name)
+# ('neg', a) ('bin', op, a, b) ('call', func, args) ('with_unit', a, unit)
+
+@lru_cache(maxsize=REF_CACHE_SIZE)
+def compile_expression(expr, known=frozenset()):
+    """
+    Parses an expression into an AST (cached by expression string).
+    known: parameter names spelled like a unit / constant (expressions.shadowed).
+    """
+    try:
+        tokens = tokenize(expr, known)
+    except ValueError as e:
+        raise EvaluationError(str(e))
+    if not tokens:
+        raise EvaluationError("Empty expression")
+    parser = _Parser(tokens, expr)
+    node = parser.expression()
+    if parser.pos != len(tokens):
+        raise EvaluationError(f"Unexpected '{tokens[parser.pos][1]}' in: {expr}")
+    return node
+
+
+class _Parser:
+    def __init__(self, tokens, expr):
+        self.tokens = tokens
+        self.expr = expr
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self):
+        tok = self.peek()
+        self.pos += 1
+        return tok
+
+    def expect(self, text):
+        kind, t = self.take()
+        if kind != OP or t != text:
+            raise EvaluationError(f"Expected '{text}' in: {self.expr}")
+
+    def expression(self):
+        node = self.term()
+        while self.peek() in ((OP, '+'), (OP, '-')):
+            op = self.take()[1]
+            node = ('bin', op, node, self.term())
+        return node
+
+    def term(self):
+        node = self.unary()
+        while self.peek() in ((OP, '*'), (OP, '/'), (OP, '%')):
+            op = self.take()[1]
+            node = ('bin', op, node, self.unary())
+        return node
+
+    def unary(self):
+        if self.peek() == (OP, '-'):
+            self.take()
+            return ('neg', self.unary())
+        if self.peek() == (OP, '+'):
+            self.take()
+            return self.unary()
+        return self.power()
+
+    def power(self):
+        node = self.postfix()
+        if self.peek() == (OP, '^'):
+            self.take()
+            node = ('bin', '^', node, self.unary()) # Right associative
+        return node
+
+    def postfix(self):
+        node = self.primary()
+        # "3 mm", "(a + b) mm"
+        while self.peek()[0] == UNIT:
+            node = ('with_unit', node, self.take()[1])
+        return node
+
+    def primary(self):
+        kind, text = self.take()
+        if kind == NUMBER:
+            return ('num', float(text))
+        if kind == UNIT:
+            return ('unit', text) # Bare unit: "mm" == 1 mm
+        if kind == CONST:
+            return ('const', text)
+        if kind == NAME:
+            return ('name', text)
+        if kind == FUNC:
+            self.expect('(')
+            args = []
+            if self.peek() != (OP, ')'):
+                args.append(self.expression())
+                while self.peek() in ((OP, ';'), (OP, ',')):
+                    self.take()
+                    args.append(self.expression())
+            self.expect(')')
+            return ('call', text, tuple(args))
+        if (kind, text) == (OP, '('):
+            node = self.expression()
+            self.expect(')')
+            return node
+        raise EvaluationError(f"Unexpected '{text}' in: {self.expr}" if text else f"Incomplete expression: {self.expr}")
+
+
+# --- EVALUATION ---
+
+def evaluate(expr, env, unit=None, ops=None, known=None):
+    """
+    Evaluates one expression. env: { name: Quantity }.
+    unit: the param's unit, used for a unitless result.
+    ops: function table (SCALAR_OPS by default; values may then be arrays).
+    known: parameter names spelled like units (expressions.shadowed); taken from env when None.
+    """
+    q = _eval(compile_expression(expr, shadowed(env) if known is None else known), env, unit, ops)
+    if unit and q.dims == DIMLESS:
+        # Unitless result ("5", "Wall / Gap") is read in the param's unit
+        factor, dims = unit_info(unit)
+        q = Quantity(q.value * factor, dims)
+    return q
+
+
+def evaluate_params(params, overrides=None):
+    """
+    Evaluates a whole parameter set in dependency order.
+    params: { name: (expression, unit) }; overrides: { name: expression } (previewed edits).
+    Returns (values { name: Quantity }, errors { name: msg }).
+    """
+    exprs = {}
+    for name, (expr, unit) in params.items():
+        exprs[name] = (expr, unit)
+    for name, expr in (overrides or {}).items():
+        unit = exprs[name][1] if name in exprs else 'mm'
+        exprs[name] = (expr, unit)
+
+    errors = {}
+    refs_by_name = {}
+    known = shadowed(exprs) # A param named 'W' is W, not watts
+    for name, (expr, unit) in exprs.items():
+        try:
+            compile_expression(expr, known)
+            refs_by_name[name] = extract_references(expr, known)
+        except EvaluationError as e:
+            errors[name] = str(e)
+
+    order, cycles = batch_order(refs_by_name)
+    values = {}
+    for name in order:
+        if name in cycles:
+            errors[name] = "Circular reference"
+            continue
+        expr, unit = exprs[name]
+        bad = [r for r in refs_by_name[name] if r in errors]
+        if bad:
+            errors[name] = f"Depends on invalid '{bad[0]}'"
+            continue
+        try:
+            values[name] = evaluate(expr, values, unit, known=known)
+        except EvaluationError as e:
+            errors[name] = str(e)
+        except (ArithmeticError, ValueError) as e:
+            errors[name] = f"Math error: {e}"
+    return values, errors
+
+
+def _eval(node, env, unit, ops=None):
+    kind = node[0]
+    if kind == 'num':
+        return Quantity(node[1], DIMLESS, True)
+    if kind == 'unit':
+        factor, dims = UNIT_TABLE[node[1]]
+        return Quantity(factor, dims)
+    if kind == 'const':
+        return Quantity(CONSTANT_VALUES[node[1]])
+    if kind == 'name':
+        q = env.get(node[1])
+        if q is None:
+            raise EvaluationError(f"Unknown parameter '{node[1]}'")
+        return q
+    if kind == 'neg':
+        a = _eval(node[1], env, unit, ops)
+        return Quantity(-a.value, a.dims, a.bare)
+    if kind == 'with_unit':
+        a = _eval(node[1], env, unit, ops)
+        factor, dims = UNIT_TABLE[node[2]]
+        if a.dims != DIMLESS:
+            raise EvaluationError(f"Unit '{node[2]}' applied to a value that already has units")
+        return Quantity(a.value * factor, dims)
+    if kind == 'bin':
+        return _binary(node[1], _eval(node[2], env, unit, ops), _eval(node[3], env, unit, ops), unit)
+    if kind == 'call':
+        return _call(node[1], [_eval(a, env, unit, ops) for a in node[2]], unit, ops or SCALAR_OPS)
+    raise EvaluationError(f"Bad node {kind}")
+
+
+def _default_factor(dims, unit):
+    """Factor a bare number gets when it meets a quantity of these dimensions."""
+    if unit:
+        factor, unit_dims = unit_info(unit)
+        if unit_dims == dims: return factor
+    name = DEFAULT_UNITS.get(dims)
+    if name: return UNIT_TABLE[name][0]
+    raise EvaluationError("Missing unit on a number")
+
+
+def _align(a, b, unit):
+    """Brings two operands of + - max min to the same dimensions."""
+    if a.dims == b.dims: return a, b
+    if a.bare and a.dims == DIMLESS:
+        return Quantity(a.value * _default_factor(b.dims, unit), b.dims), b
+    if b.bare and b.dims == DIMLESS:
+        return a, Quantity(b.value * _default_factor(a.dims, unit), a.dims)
+    raise EvaluationError("Incompatible units")
+
+
+def _binary(op, a, b, unit):
+    if op in '+-':
+        a, b = _align(a, b, unit)
+        value = a.value + b.value if op == '+' else a.value - b.value
+        return Quantity(value, a.dims, a.bare and b.bare)
+    if op == '*':
+        return Quantity(a.value * b.value, _dims_add(a.dims, b.dims), a.bare and b.bare)
+    if op == '/':
+        return Quantity(a.value / b.value, _dims_add(a.dims, b.dims, -1), a.bare and b.bare)
+    if op == '%':
+        a, b = _align(a, b, unit)
+        return Quantity(a.value % b.value, a.dims, a.bare and b.bare)
+    if op == '^':
+        if b.dims != DIMLESS:
+            raise EvaluationError("Exponent must be unitless")
+        return _pow(a, b.value)
+    raise EvaluationError(f"Unknown operator '{op}'")
+
+
+def _pow(a, exponent):
+    if a.dims == DIMLESS:
+        return Quantity(_real(a.value ** exponent), DIMLESS, a.bare)
+    if not isinstance(exponent, (int, float)):
+        raise EvaluationError("Power of a unit needs a constant exponent")
+    dims = tuple(d * exponent for d in a.dims)
+    if any(d != int(d) for d in dims):
+        raise EvaluationError("Fractional power of a unit")
+    return Quantity(_real(a.value ** exponent), tuple(int(d) for d in dims))
+
+
+def _real(v):
+    # (-4) ** 0.5 is complex in Python (NaN for arrays)
+    if isinstance(v, complex):
+        raise EvaluationError("No real result (negative root)")
+    return v
+
+
+def _dims_add(a, b, sign=1):
+    return tuple(x + sign * y for x, y in zip(a, b))
+
+
+def _angle(q):
+    """Trig argument in radians (a bare number is read in degrees, like Fusion)."""
+    if q.dims == ANGLE: return q.value
+    if q.dims == DIMLESS: return q.value * UNIT_TABLE['deg'][0] if q.bare else q.value
+    raise EvaluationError("Trig functions need an angle")
+
+
+def _unitless(q, func):
+    if q.dims != DIMLESS:
+        raise EvaluationError(f"{func}() needs a unitless value")
+    return q.value
+
+
+def _rounded(fn, q, unit, snap):
+    """
+    floor/ceil/round act on the value as displayed (mm, deg), not on internal cm/rad.
+    The scaled value is snapped to SNAP_DIGITS first: 12 mm / 3 is 3.9999999999999996
+    after the cm round trip, and floor() must still give 4.
+    """
+    if q.dims == DIMLESS: return Quantity(fn(snap(q.value, SNAP_DIGITS)), DIMLESS, q.bare)
+    factor = _default_factor(q.dims, unit)
+    return Quantity(fn(snap(q.value / factor, SNAP_DIGITS)) * factor, q.dims)
+
+
+# Function implementations for plain floats. The sweep engine (sweep.py)
+# passes the same table built from NumPy ufuncs to evaluate whole arrays.
+SCALAR_OPS = {
+    'sin': math.sin, 'cos': math.cos, 'tan': math.tan,
+    'asin': math.asin, 'acos': math.acos, 'atan': math.atan,
+    'sinh': math.sinh, 'cosh': math.cosh, 'tanh': math.tanh,
+    'asinh': math.asinh, 'acosh': math.acosh, 'atanh': math.atanh,
+    'exp': math.exp, 'ln': math.log, 'log': math.log10,
+    'floor': math.floor, 'ceil': math.ceil, 'round': round,
+    'sign': lambda v: (v > 0) - (v < 0),
+    'max': max, 'min': min,
+    'random': random.random,
+}
+
+
+def _call(func, args, unit, ops):
+    def arity(n):
+        if len(args) != n:
+            raise EvaluationError(f"{func}() takes {n} argument{'s' if n > 1 else ''}")
+    if func in ('sin', 'cos', 'tan'):
+        arity(1)
+        return Quantity(ops[func](_angle(args[0])))
+    if func in ('asin', 'acos', 'atan'):
+        arity(1)
+        return Quantity(ops[func](_unitless(args[0], func)), ANGLE)
+    if func in ('sinh', 'cosh', 'tanh', 'asinh', 'acosh', 'atanh', 'exp', 'ln', 'log'):
+        arity(1)
+        return Quantity(ops[func](_unitless(args[0], func)))
+    if func == 'sqrt':
+        arity(1)
+        return _pow(args[0], 0.5)
+    if func == 'pow':
+        arity(2)
+        return _pow(args[0], _unitless(args[1], func))
+    if func == 'abs':
+        arity(1)
+        return Quantity(abs(args[0].value), args[0].dims, args[0].bare)
+    if func == 'sign':
+        arity(1)
+        return Quantity(ops['sign'](args[0].value))
+    if func in ('floor', 'ceil', 'round'):
+        arity(1)
+        return _rounded(ops[func], args[0], unit, ops['round'])
+    if func in ('max', 'min'):
+        if not args:
+            raise EvaluationError(f"{func}() needs arguments")
+        best = args[0]
+        for q in args[1:]:
+            best, q = _align(best, q, unit)
+            best = Quantity(ops[func](best.value, q.value), best.dims, best.bare and q.bare)
+        return best
+    if func == 'random':
+        arity(0)
+        return Quantity(ops['random']())
+    raise EvaluationError(f"Unknown function '{func}'")
@@ -0,0 +1,127 @@
+import re
+from functools import lru_cache
+
+# Fusion 360 expression vocabulary.
+# Units and constants are only names, so a parameter may be called 'W' or 'E':
+# callers pass the known parameter names ('known') and those win.
+UNITS = frozenset([
+    # Length
+    'mm', 'cm', 'm', 'km', 'um', 'micron', 'nm', 'in', 'inch', 'ft', 'foot', 'yd', 'mi', 'mil',
+    # Angle
+    'deg', 'rad', 'grad',
+    # Mass / Time / Misc
+    'g', 'kg', 'lb', 'lbmass', 'oz', 's', 'sec', 'hr', 'N', 'lbf', 'Pa', 'kPa', 'MPa', 'psi', 'J', 'W',
+])
+
+FUNCTIONS = frozenset([
+    'sin', 'cos', 'tan', 'asin', 'acos', 'atan', 'sinh', 'cosh', 'tanh', 'asinh', 'acosh', 'atanh',
+    'sqrt', 'abs', 'sign', 'exp', 'ln', 'log', 'pow', 'floor', 'ceil', 'round', 'max', 'min', 'random',
+])
+
+CONSTANTS = frozenset(['PI', 'E'])
+
+RESERVED = UNITS | CONSTANTS # Names that are a unit / constant unless a parameter has the name
+
+
+def shadowed(known) -> frozenset:
+    """The reserved names that are parameters here (small, so it's a cheap cache key)."""
+    return frozenset(n for n in RESERVED if n in known) if known else frozenset()
+
+# Cache size for extract_references (one entry per distinct expression string)
+REF_CACHE_SIZE = 65536
+
+# Token kinds
+NUMBER = 'number'
+NAME = 'name'
+UNIT = 'unit'
+FUNC = 'func'
+CONST = 'const'
+STRING = 'string'
+OP = 'op'
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<string>'[^']*'|"[^"]*")
+  | (?P<op>[-+*/^%(),;])
+""", re.VERBOSE)
+
+# Fast path for reference extraction: literals are consumed whole (so '1e-3'
+# never yields 'e'), names are captured together with a trailing '(' if any.
+_REF_RE = re.compile(r"""(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|'[^']*'|"[^"]*"|([A-Za-z_][A-Za-z0-9_]*)(\s*\()?""")
+
+
+class ExpressionSyntaxError(ValueError):
+    """Raised when an expression contains characters Fusion would reject."""
+    pass
+
+
+def tokenize(expr: str, known=frozenset()) -> list:
+    """
+    Splits a Fusion expression into (kind, text) tokens.
+    Names are classified as UNIT / FUNC / CONST / NAME, so callers
+    never have to guess whether 'mm' or 'sin' is a parameter.
+    known: parameter names; a unit / constant spelling in it stays a NAME.
+    """
+    raw = []
+    pos = 0
+    length = len(expr)
+    while pos < length:
+        m = _TOKEN_RE.match(expr, pos)
+        if not m:
+            raise ExpressionSyntaxError(f"Unexpected '{expr[pos]}' at {pos} in: {expr}")
+        pos = m.end()
+        kind = m.lastgroup
+        if kind == 'ws': continue
+        raw.append((kind, m.group(kind)))
+
+    tokens = []
+    for i, (kind, text) in enumerate(raw):
+        if kind == NAME:
+            is_call = i + 1 < len(raw) and raw[i + 1] == (OP, '(')
+            if is_call and text in FUNCTIONS: kind = FUNC
+            elif text in known: pass
+            elif text in UNITS: kind = UNIT
+            elif text in CONSTANTS: kind = CONST
+        tokens.append((kind, text))
+    return tokens
+
+
+def extract_references(expr: str, known=None) -> frozenset:
+    """
+    Returns the parameter names an expression refers to (units, functions,
+    constants and literals excluded). Parsing is cached by expression string, so
+    unchanged expressions are never re-parsed across crawler refreshes.
+    known: parameter names; unit / constant spellings in it ('W', 'N', 'E') count
+    as references ("W / 2" with a param W refers to W).
+    """
+    refs, reserved = _scan_references(expr)
+    if reserved and known:
+        found = frozenset(n for n in reserved if n in known)
+        if found: return refs | found
+    return refs
+
+
+@lru_cache(maxsize=REF_CACHE_SIZE)
+def _scan_references(expr: str):
+    """(plain names, unit / constant names) used by an expression."""
+    if not expr: return frozenset(), frozenset()
+    refs = set()
+    reserved = set()
+    for name, call in _REF_RE.findall(expr):
+        if not name: continue
+        if call and name in FUNCTIONS: continue
+        if name in RESERVED: reserved.add(name)
+        else: refs.add(name)
+    return frozenset(refs), frozenset(reserved)
+
+
+def reference_cache_info():
+    """Hit/miss statistics of the extract_references cache."""
+    return _scan_references.cache_info()
+
+
+def clear_reference_cache():
+    """Empties the extract_references cache (benchmarks time the cold scan)."""
+    _scan_references.cache_clear()
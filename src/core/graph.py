@@ -0,0 +1,197 @@
+class ParamGraph:
+    """
+    Directed parameter graph: Base -> Wall (= Base*2) -> d12 (sketch dim) -> owner entity.
+    Edges point downstream ("drives"). Closures are computed lazily and cached
+    until the graph is mutated, so "what does this drive" is a single lookup.
+    """
+    def __init__(self):
+        self._down = {} # { param_name: set(params that reference it) }
+        self._up = {} # { param_name: frozenset(names it references) }
+        self._owner = {} # { param_name: owner_token } (model params only)
+        self._owned = {} # { owner_token: set(param_names) }
+        self._drives_cache = {} # { param_name: frozenset(downstream params) }
+        self._owners_cache = {} # { param_name: frozenset(owner_tokens) }
+        self._ancestors_cache = {}
+        self._topo = None
+        self.cycles = set() # Params that could not be ordered (circular references)
+
+    def __contains__(self, name):
+        return name in self._up
+
+    def set_param(self, name, refs, owner_token=None):
+        """Adds or replaces a parameter node with its references and owning entity."""
+        self._unlink(name)
+        refs = frozenset(refs or ()) - {name}
+        self._up[name] = refs
+        for ref in refs:
+            self._down.setdefault(ref, set()).add(name)
+        if owner_token:
+            self._owner[name] = owner_token
+            self._owned.setdefault(owner_token, set()).add(name)
+        self._invalidate()
+
+    def load(self, entries):
+        """Bulk set_param for an empty graph: entries = [(name, refs, owner_token)] (no per-node unlinking)."""
+        for name, refs, owner_token in entries:
+            refs = frozenset(refs or ()) - {name}
+            self._up[name] = refs
+            for ref in refs:
+                self._down.setdefault(ref, set()).add(name)
+            if owner_token:
+                self._owner[name] = owner_token
+                self._owned.setdefault(owner_token, set()).add(name)
+        self._invalidate()
+
+    def remove_param(self, name):
+        if name not in self._up: return
+        self._unlink(name)
+        del self._up[name]
+        self._invalidate()
+
+    def clear(self):
+        self._down = {}
+        self._up = {}
+        self._owner = {}
+        self._owned = {}
+        self._invalidate()
+
+    def references(self, name):
+        """Names this parameter's expression refers to."""
+        return self._up.get(name, frozenset())
+
+    def owner(self, name):
+        """Entity token that created this parameter (model params), or None."""
+        return self._owner.get(name)
+
+    def owned_by(self, owner_token):
+        """Parameters created by one entity (sketch dims of a sketch, feature extents, ...)."""
+        return frozenset(self._owned.get(owner_token, ()))
+
+    def dependents(self, name):
+        """Parameters that reference this one directly (these block deletion)."""
+        return frozenset(p for p in self._down.get(name, ()) if p in self._up)
+
+    def can_delete(self, name):
+        return not self.dependents(name)
+
+    def drives(self, name):
+        """Every parameter downstream of this one (transitive, cached)."""
+        cached = self._drives_cache.get(name)
+        if cached is not None: return cached
+
+        seen = set()
+        stack = list(self._down.get(name, ()))
+        while stack:
+            node = stack.pop()
+            if node in seen or node == name: continue
+            seen.add(node)
+            stack.extend(self._down.get(node, ()))
+
+        result = frozenset(p for p in seen if p in self._up)
+        self._drives_cache[name] = result
+        return result
+
+    def owners(self, name):
+        """Owner entity tokens driven by this parameter directly or through other params (cached)."""
+        cached = self._owners_cache.get(name)
+        if cached is not None: return cached
+
+        tokens = set()
+        for node in self.drives(name) | {name}:
+            token = self._owner.get(node)
+            if token: tokens.add(token)
+
+        result = frozenset(tokens)
+        self._owners_cache[name] = result
+        return result
+
+    def ancestors(self, name):
+        """Every parameter upstream of this one (transitive, cached)."""
+        cached = self._ancestors_cache.get(name)
+        if cached is not None: return cached
+
+        seen = set()
+        stack = list(self._up.get(name, ()))
+        while stack:
+            node = stack.pop()
+            if node in seen or node == name: continue
+            seen.add(node)
+            stack.extend(self._up.get(node, ()))
+
+        result = frozenset(p for p in seen if p in self._up)
+        self._ancestors_cache[name] = result
+        return result
+
+    def topological_order(self):
+        """
+        Parameters ordered so every name comes after the names it references (Kahn).
+        Nodes caught in cycles are appended at the end and listed in self.cycles.
+        """
+        if self._topo is not None: return self._topo
+
+        pending = {}
+        for name, refs in self._up.items():
+            pending[name] = len([r for r in refs if r in self._up])
+
+        ready = [name for name, n in pending.items() if n == 0]
+        order = []
+        while ready:
+            node = ready.pop()
+            order.append(node)
+            for child in self._down.get(node, ()):
+                if child not in pending: continue
+                pending[child] -= 1
+                if pending[child] == 0:
+                    ready.append(child)
+
+        self.cycles = set(name for name, n in pending.items() if n > 0)
+        order.extend(sorted(self.cycles))
+        self._topo = order
+        return order
+
+    def _unlink(self, name):
+        for ref in self._up.get(name, ()):
+            users = self._down.get(ref)
+            if users is not None:
+                users.discard(name)
+                if not users: del self._down[ref]
+        owner_token = self._owner.pop(name, None)
+        if owner_token:
+            owned = self._owned.get(owner_token)
+            if owned is not None:
+                owned.discard(name)
+                if not owned: del self._owned[owner_token]
+
+    def _invalidate(self):
+        self._drives_cache = {}
+        self._owners_cache = {}
+        self._ancestors_cache = {}
+        self._topo = None
+
+
+def batch_order(refs_by_name, base=None):
+    """
+    Orders a batch of { name: refs } so every name comes after the names it references.
+    base (ParamGraph) supplies the existing edges, so a cycle that runs through
+    params outside the batch (Wall -> Lid -> Wall) is caught too.
+    Returns (order, cycles): batch names in apply order, names caught in cycles.
+    """
+    g = ParamGraph()
+    for name, refs in refs_by_name.items():
+        g.set_param(name, refs)
+
+    if base is not None:
+        # Pull in the existing upstream chain of every outside reference
+        pending = [r for refs in refs_by_name.values() for r in refs if r not in refs_by_name]
+        seen = set()
+        while pending:
+            node = pending.pop()
+            if node in seen or node in refs_by_name: continue
+            seen.add(node)
+            if node in base:
+                up = base.references(node)
+                g.set_param(node, up)
+                pending.extend(up)
+
+    order = [name for name in g.topological_order() if name in refs_by_name]
+    return order, set(g.cycles)
@@ -1,12 +1,22 @@
 import adsk.core
 import adsk.fusion
 import json
+import os
 import traceback
 import time
 import re
+from .. import config
 from .utils import log_diag, log_file, PresetManager, FitManager
-from .crawler import ZenDependencyCrawler
-from .storage import ZenStorage
+from .crawler import ZenDependencyCrawler, category_for, INDEX_KEY
+from .expressions import tokenize, extract_references, ExpressionSyntaxError
+from .graph import batch_order
+from .evaluator import evaluate_params, EvaluationError
+from .sweep import run_sweep, export as export_sweep, SweepError
+from .storage import ZenStorage, invalidate_cache as invalidate_storage_cache, cache_stats as storage_cache_stats
+from .scheduler import RefreshScheduler, LEVEL_SORT, LEVEL_MAP
+from .payload import encode_rows
+from .snapshot import ParamSnapshot
+from . import metrics, logger
 
 class ZenPaletteEventHandler(adsk.core.HTMLEventHandler):
     """Handles messages coming from the HTML Palette."""
@@ -16,8 +26,26 @@ class ZenPaletteEventHandler(adsk.core.HTMLEventHandler):
         self.palette_id = palette_id
         self.preset_manager = PresetManager(root_path)
         self.fit_manager = FitManager(root_path)
+        self.export_dir = os.path.join(root_path, config.SWEEP_EXPORT_DIR)
         self.crawler = None # Persistent Crawler Instance
-        self._data_version = 0 # Incremented when data changes (for JS polling)
+        self._data_version = 0 # Incremented when data changes (pushed as 'data_changed', see _bump_version)
+        
+        # Delta protocol: last table sent to the palette { name: row } + its sequence number
+        self._table_sent = {}
+        self._table_seq = 0
+        self._model_next = None # Offset of the next model-param page (None = all sent)
+        self._columnar = False # Palette capability: columnar row payloads (see payload.py)
+        self._snapshot = ParamSnapshot(_param_row) # Cached table rows (see snapshot.py)
+        self._open_started = None # perf_counter of the last palette open, until its first sort finished
+        
+        # Collapses bursts of command-terminated events into one refresh
+        self.scheduler = RefreshScheduler(self._run_scheduled_refresh)
+        self.scheduler.start()
+
+    def stop(self):
+        """Releases background resources (called from ZenParamsAddin.stop)."""
+        self.scheduler.stop()
+        self.preset_manager.shutdown() # Don't lose a coalesced preset save (or leave its timer running)
 
     # --- BACKGROUND HANDLERS ---
     
@@ -45,7 +73,6 @@ class ZenPaletteEventHandler(adsk.core.HTMLEventHandler):
 
         # Debug: See what commands are firing (SAFE)
         log_file(f"Cmd Terminated: {cmd_name} [{cmd_id}]")
-        log_diag(f"CMD: {cmd_name} [{cmd_id}]") # Visual Confirmation
         
         try:
             # TRG 1: GEOMETRY CREATION -> MAP REFRESH & SORT
@@ -59,122 +86,224 @@ class ZenPaletteEventHandler(adsk.core.HTMLEventHandler):
             is_geo = any(x in cmd_name or x in cmd_id for x in geometry_cmds)
             is_usage = any(x in cmd_name or x in cmd_id for x in usage_cmds)
             
-            if is_geo or is_usage:
-                log_file(f"Trigger: {cmd_name} (Refreshing Map)")
-                # ALWAYS refresh map to ensure new sketches/features are found
-                self._auto_sort_params(force_map_refresh=True)
-                self._send_all_params()
+            # Don't refresh per event: a burst (Sketch -> Finish -> Compute -> Update)
+            # is collapsed into one refresh once it settles. Geometry escalates to a map refresh.
+            if is_geo:
+                log_file(f"Trigger: {cmd_name} (Map Refresh queued)")
+                self.scheduler.request(LEVEL_MAP)
+            elif is_usage:
+                log_file(f"Trigger: {cmd_name} (Sort queued)")
+                self.scheduler.request(LEVEL_SORT)
 
         except Exception as e:
             log_diag(f"Trigger Error: {e}")
 
+    def _run_scheduled_refresh(self, level):
+        """Main-thread body of a coalesced refresh (see RefreshScheduler)."""
+        stats = self.scheduler.stats()
+        log_file(f"Refresh: level {level}, {stats['skipped']} skipped / {stats['requested']} requested")
+        # A Fusion command ran -> params (or attributes, e.g. undo) may have changed outside ZenParams
+        self._snapshot.invalidate()
+        invalidate_storage_cache()
+        # Incremental: only touched timeline items / params are re-crawled
+        with metrics.timed(f"refresh.level{level}"):
+            version = self._data_version
+            self._auto_sort_params(force_map_refresh=True, incremental=True, scan_timeline=(level >= LEVEL_MAP))
+            if level >= LEVEL_MAP and self._data_version == version:
+                self._bump_version('geometry') # One event per refresh: a sort that wrote comments already pushed it
+        if self._open_started is not None:
+            # Palette open -> categories in the table
+            metrics.record('palette.sorted', time.perf_counter() - self._open_started)
+            self._open_started = None
+        self._maybe_dump_metrics()
+
     # --- HELPERS ---
 
     def _get_crawler(self, design):
-        # Lazy Load / Persist
+        # Lazy Load / Persist (a saved index in the design replaces the first crawl)
         if self.crawler is None or self.crawler.design != design:
-             self.crawler = ZenDependencyCrawler(design)
+             state = ZenStorage(design).get_blob(INDEX_KEY) if config.PERSIST_INDEX else None
+             self.crawler = ZenDependencyCrawler(design, state=state)
         return self.crawler
 
-    def _auto_sort_params(self, data=None, args=None, force_map_refresh=False):
+    def _save_crawler_index(self, crawler) -> bool:
+        """Writes the crawler's maps into its design, unless the stored copy is already current."""
+        if not config.PERSIST_INDEX or not crawler.built_fingerprint: return False
+        if crawler.built_fingerprint == crawler.saved_fingerprint: return False
+        with metrics.timed('crawler.save_index'):
+            state = crawler.export_state()
+            ok = ZenStorage(crawler.design).set_blob(INDEX_KEY, state)
+        if ok: crawler.saved_fingerprint = state['fingerprint']
+        return ok
+
+    def on_document_saving(self, args):
+        """Called before Fusion saves a document: the index goes into the file with it."""
+        try:
+            crawler = self.crawler
+            if crawler is None: return
+            doc = getattr(args, 'document', None)
+            if doc is not None and crawler.design.parentDocument != doc: return
+            self._save_crawler_index(crawler)
+        except Exception as e:
+            log_diag(f"Index Save Error: {e}")
+
+    def _auto_sort_params(self, data=None, args=None, force_map_refresh=False, incremental=False, scan_timeline=True):
         """
         Uses ZenDependencyCrawler to find bodies associated with parameters.
+        Two phases: every new comment is computed in memory first (_plan_auto_sort),
+        then written in one batch with a single flush (_apply_comment_changes).
         args: force_map_refresh (bool) - specific optimization for background handler.
+              incremental (bool) - patch the crawler maps instead of rebuilding them.
+              scan_timeline (bool) - incremental only; False re-scans parameter usage alone.
+        Returns: { 'updated': [{name, category, comment}], 'count': int, 'errors': [...] }
         """
         # log_diag("--> Executing Auto-Sort...")
+        result = {'updated': [], 'count': 0, 'errors': []}
         try:
             app = adsk.core.Application.get()
             design = adsk.fusion.Design.cast(app.activeProduct)
-            if not design: return
+            if not design: return result
             
+            is_new = self.crawler is None or self.crawler.design != design
             crawler = self._get_crawler(design)
             
+            changed = set()
             if force_map_refresh:
-                crawler.refresh_map()
+                with metrics.timed('autosort.crawl'):
+                    if is_new:
+                        changed = crawler.changed_params # Just built (or restored + patched)
+                    elif incremental:
+                        changed = crawler.update_map(scan_timeline=scan_timeline)
+                    else:
+                        crawler.refresh_map()
                 
-            count = 0
+            # Phase 1: Plan (reads only)
+            with metrics.timed('autosort.plan'):
+                plan = self._plan_auto_sort(design, crawler, changed)
             
-            for param in design.userParameters:
-                if param.name == '_zen_current_preset': continue
-                
-                # Get current comment
-                comment = param.comment
-                
-                # Detect and clean various corrupted/outdated bracket formats:
-                # 1. List format: "[['body']]" or "['body', 'other']"
-                # 2. Old Shared format: "[Shared (2)]" "[Shared (4)]" etc.
-                needs_clean = False
-                
-                if comment.startswith("[['"): needs_clean = True
-                elif comment.startswith("['"): needs_clean = True
-                elif comment.startswith("[Shared ("): needs_clean = True  # Old shared format
-                
-                if needs_clean:
-                    try:
-                        end_bracket = comment.find(']')
-                        if end_bracket != -1 and end_bracket < len(comment) - 1:
-                            comment = comment[end_bracket + 1:].strip()
-                        else:
-                            comment = ""
-                        param.comment = comment
-                        log_diag(f"  Cleaned old bracket: {param.name}")
-                    except:
-                        comment = ""
-                
-                # Skip if already properly grouped with CURRENT format
-                # (clean single bracket like "[BodyName]" or "[Shared]" or "[Unused]")
-                if comment.startswith('[') and ']' in comment:
-                    continue
-                
-                # Crawl - crawler returns None or list of body names
-                body_list = crawler.get_param_body_name(param)
-                
-                # Determine category from body list
-                extra_info = ""  # Additional info to add to comment
-                
-                if body_list is None or len(body_list) == 0:
-                    # Unused - no references found
-                    category = "Unused"
-                elif len(body_list) == 1:
-                    # Body-specific: used by exactly one body
-                    category = body_list[0]
-                    # Clean up root component name
-                    if category == '(Unsaved)': 
-                        category = 'Main Design'
-                else:
-                    # Shared: used by multiple bodies - single folder
-                    category = "Shared"
-                    # Add body names to comment so user knows which bodies
-                    body_names = ', '.join(body_list[:6])  # Limit to 6 names
-                    if len(body_list) > 6:
-                        body_names += f', +{len(body_list) - 6} more'
-                    extra_info = f" (Used by: {body_names})"
-                
-                if category:
-                    # Update Comment: "[Category] Original Comment (Used by: ...)"
-                    new_comment = f"[{category}] {comment}{extra_info}"
-                    param.comment = new_comment
-                    count += 1
-                    adsk.doEvents() # Prevent race condition
-                    log_diag(f"  Sorted {param.name} -> {category}")
-                # else:
-                #     log_diag(f"  Unsorted: {param.name} (No usage found)")
+            # Phase 2: Apply (writes only, one flush)
+            with metrics.timed('autosort.apply'):
+                result = self._apply_comment_changes(plan)
+            count = result['count']
             
             if count > 0:
                 log_diag(f"Auto-Sort: {count} updated.")
-                self._data_version += 1 # Signal JS to refresh
-                adsk.doEvents()
-                time.sleep(0.25) # Wait for Fusion to commit changes
+                log_file("Auto-Sort: " + ", ".join(f"{u['name']} -> {u['category']}" for u in result['updated']))
+                self._bump_version('sorted') # Rows were patched into the snapshot during apply
                 self._send_notification(f"Auto-sorted {count} params", "success")
             elif data: # Only notify "No changes" if manually triggered (data is not None)
                 self._send_notification("No new associations found.", "info")
             
+            if result['errors']:
+                log_diag(f"Auto-Sort: {len(result['errors'])} comment writes failed.")
+            
         except Exception as e:
             log_diag(f"Auto-Sort Error: {str(e)}")
             if data: self._send_notification(f"Sort Error: {str(e)}", "error")
             
-        # ALWAYS Refresh Table
-        self._send_all_params()
+        if args:
+            args.returnData = json.dumps({'status': 'success', 'count': result['count'], 'updated': result['updated']})
+            
+        # ALWAYS Refresh Table (already flushed by the apply phase)
+        self._send_all_params(flush=False)
+        return result
+
+    def _plan_auto_sort(self, design, crawler, changed=frozenset()):
+        """
+        Phase 1 of auto-sort: computes every new comment without touching the model.
+        Returns a list of { 'param', 'name', 'category', 'comment' } changes.
+        """
+        plan = []
+        categories = None
+        for param in design.userParameters:
+            if param.name == '_zen_current_preset': continue
+            
+            # Get current comment
+            comment = original_comment = param.comment
+            
+            # Detect and clean various corrupted/outdated bracket formats:
+            # 1. List format: "[['body']]" or "['body', 'other']"
+            # 2. Old Shared format: "[Shared (2)]" "[Shared (4)]" etc.
+            needs_clean = False
+            
+            if comment.startswith("[['"): needs_clean = True
+            elif comment.startswith("['"): needs_clean = True
+            elif comment.startswith("[Shared ("): needs_clean = True  # Old shared format
+            
+            if needs_clean:
+                end_bracket = comment.find(']')
+                if end_bracket != -1 and end_bracket < len(comment) - 1:
+                    comment = comment[end_bracket + 1:].strip()
+                else:
+                    comment = ""
+            
+            # An "[Unused]" param whose owners just changed may be used now -> re-sort it
+            if comment.startswith('[Unused]') and param.name in changed:
+                comment = comment[len('[Unused]'):].strip()
+            
+            # Skip if already properly grouped with CURRENT format
+            # (clean single bracket like "[BodyName]" or "[Shared]" or "[Unused]")
+            if comment.startswith('[') and ']' in comment:
+                # Only the cleanup (if any) applies
+                category, new_comment = comment[1:comment.find(']')], comment
+            else:
+                if categories is None:
+                    categories = crawler.categorize_all() # One pass, only once something needs it
+                entry = categories.get(param.name)
+                category, new_comment = self._categorize(crawler, param, comment, entry['bodies'] if entry else None)
+            
+            if new_comment == original_comment: continue # Nothing to write
+            plan.append({'param': param, 'name': param.name, 'category': category, 'comment': new_comment})
+        return plan
+
+    def _categorize(self, crawler, param, comment, body_list=None):
+        """
+        Returns (category, "[Category] Original Comment (Used by: ...)") for one param.
+        body_list: precomputed bodies (crawler.categorize_all); looked up when None.
+        """
+        if body_list is None:
+            # Crawl - crawler returns None or list of body names
+            body_list = crawler.get_param_body_name(param)
+        
+        # Determine category from body list
+        category = category_for(body_list)
+        extra_info = ""  # Additional info to add to comment
+        
+        if category == "Shared":
+            # Shared: used by multiple bodies - single folder
+            # Add body names to comment so user knows which bodies
+            body_names = ', '.join(body_list[:6])  # Limit to 6 names
+            if len(body_list) > 6:
+                body_names += f', +{len(body_list) - 6} more'
+            extra_info = f" (Used by: {body_names})"
+        
+        return category, f"[{category}] {comment}{extra_info}"
+
+    def _apply_comment_changes(self, plan):
+        """
+        Phase 2 of auto-sort: writes all planned comments, then flushes ONCE.
+        No per-parameter doEvents and no blind sleep - the result says what changed.
+        Large plans are written in batches of config.SORT_STREAM_BATCH: each batch is
+        flushed and pushed as a table delta, so groups fill in while the rest is written.
+        """
+        result = {'updated': [], 'count': 0, 'errors': []}
+        batch = config.SORT_STREAM_BATCH
+        stream = batch and len(plan) > batch
+        for i, change in enumerate(plan):
+            try:
+                change['param'].comment = change['comment']
+                self._snapshot.update(change['param'], change['name'])
+                result['updated'].append({'name': change['name'], 'category': change['category'], 'comment': change['comment']})
+            except Exception as e:
+                result['errors'].append({'name': change['name'], 'msg': str(e)})
+            if stream and (i + 1) % batch == 0 and i + 1 < len(plan):
+                adsk.doEvents()
+                self._send_all_params(flush=False) # Delta: just this batch's rows
+        
+        result['count'] = len(result['updated'])
+        if result['count'] > 0:
+            adsk.doEvents() # Single flush for the whole batch
+        return result
 
     def notify(self, args):
         try:
@@ -185,47 +314,80 @@ class ZenPaletteEventHandler(adsk.core.HTMLEventHandler):
             
             if not action: return
 
-            if action == 'get_initial_data':
-                self._handle_get_initial_data(data, args)
-            elif action == 'save_preset':
-                self._handle_save_preset(data, args)
-            elif action == 'apply_preset':
-                self._handle_apply_preset(data, args) # Legacy support if needed
-            elif action == 'delete_preset':
-                self._handle_delete_preset(data, args)
-            elif action == 'set_current_preset':
-                self._handle_set_current_preset(data, args)
-            elif action == 'delete_param':
-                self._handle_delete_param(data, args)
-            elif action == 'batch_update':
-                self._handle_batch_update(data, args)
-            elif action == 'refresh':
-                self._handle_refresh(data, args)
-            elif action == 'close_palette':
-                self._handle_close_palette(data, args)
-            elif action == 'auto_sort':
-                self._auto_sort_params(data, args)
-            elif action == 'save_fit_defaults':
-                self._handle_save_fit_defaults(data, args)
-            elif action == 'get_active_doc_info':
-                self._handle_get_doc_info(data, args)
-            elif action == 'get_data_version':
-                args.returnData = json.dumps({'version': self._data_version})
+            with metrics.timed(f"action.{action}") as timer:
+                self._dispatch(action, data, args)
+                if args.returnData: timer.size = len(args.returnData)
+            self._maybe_dump_metrics()
                 
         except Exception as e:
             self._send_error(f"Event Handler Error: {e}")
             log_diag(traceback.format_exc())
 
+    def _dispatch(self, action, data, args):
+        """Routes one palette action to its handler."""
+        if action == 'get_initial_data':
+            self._handle_get_initial_data(data, args)
+        elif action == 'save_preset':
+            self._handle_save_preset(data, args)
+        elif action == 'apply_preset':
+            self._handle_apply_preset(data, args) # Legacy support if needed
+        elif action == 'delete_preset':
+            self._handle_delete_preset(data, args)
+        elif action == 'set_current_preset':
+            self._handle_set_current_preset(data, args)
+        elif action == 'delete_param':
+            self._handle_delete_param(data, args)
+        elif action == 'batch_update':
+            self._handle_batch_update(data, args)
+        elif action == 'refresh':
+            self._handle_refresh(data, args)
+        elif action == 'get_model_params':
+            self._handle_get_model_params(data, args)
+        elif action == 'preview_values':
+            self._handle_preview_values(data, args)
+        elif action == 'run_sweep':
+            self._handle_run_sweep(data, args)
+        elif action == 'resync_table':
+            self._send_all_params(flush=False, full=True)
+        elif action == 'close_palette':
+            self._handle_close_palette(data, args)
+        elif action == 'auto_sort':
+            self._auto_sort_params(data, args)
+        elif action == 'save_fit_defaults':
+            self._handle_save_fit_defaults(data, args)
+        elif action == 'get_active_doc_info':
+            self._handle_get_doc_info(data, args)
+        elif action == 'get_data_version':
+            # Heartbeat fallback - changes are normally pushed ('data_changed')
+            args.returnData = json.dumps({'version': self._data_version, 'table_seq': self._table_seq})
+        elif action == 'get_metrics':
+            self._handle_get_metrics(data, args)
+        elif action == 'get_categories':
+            self._handle_get_categories(data, args)
+        elif action == 'client_metric':
+            self._handle_client_metric(data, args)
+
     # --- HANDLERS ---
 
     def _handle_get_initial_data(self, data, args):
         try:
-            # Auto-Sort on Startup (User Request)
-            log_diag("Startup: Running Auto-Sort...")
-            self._auto_sort_params(force_map_refresh=True)
+            # Palette capabilities (older palettes send nothing -> row format)
+            caps = (data or {}).get('capabilities') or {}
+            self._columnar = bool(caps.get('columnar'))
+            self._snapshot.invalidate() # Palette (re)opened -> start from the real design
+            started = time.perf_counter()
             
+            # Table first (params as they are now), categories after: the auto-sort
+            # runs as a scheduled refresh once this returns and streams its groups
+            # in as table deltas (see _apply_comment_changes)
             payload = self._gather_payload_dict()
             args.returnData = json.dumps({'content': payload, 'type': 'init_all'})
+            metrics.record('palette.first_rows', time.perf_counter() - started, len(args.returnData))
+            
+            # Auto-Sort on Startup (User Request)
+            log_diag("Startup: Auto-Sort queued")
+            self._open_started = started
+            self.scheduler.request(LEVEL_MAP)
         except Exception as e:
             log_diag(f"Init Data Error: {e}")
             args.returnData = json.dumps({'content': {}, 'type': 'error', 'msg': str(e)})
@@ -266,67 +428,56 @@ class ZenPaletteEventHandler(adsk.core.HTMLEventHandler):
         self._send_initial_data()
 
     def _handle_batch_update(self, data, args):
+        """
+        Applies [{name, expression, comment, isUser}] in one go.
+        transactional (default): any failure rolls the whole batch back.
+        Expressions are set with one recompute where Fusion supports it (see _set_expressions).
+        Returns (args.returnData): { status, count, errors: [{name, msg}], rolled_back }
+        """
         items = []
         suppress = False
+        transactional = True
         
         if isinstance(data, list):
             items = data
         elif isinstance(data, dict):
             items = data.get('items', [])
             suppress = data.get('suppress_refresh', False)
+            transactional = data.get('transactional', True)
             
-        count = 0
+        result = {'status': 'success', 'count': 0, 'errors': [], 'rolled_back': False}
         new_param_created = False  # Track if we created any new parameters
         try:
             app = adsk.core.Application.get()
             design = adsk.fusion.Design.cast(app.activeProduct)
             if not design: return
             
-            for item in items:
-                try:
-                    name = item.get('name')
-                    expr = item.get('expression')
-                    comment = item.get('comment')
-                    is_user = item.get('isUser', True)
-                    
-                    if not name: continue
-                    
-                    # Try to find param
-                    param = design.userParameters.itemByName(name)
-                    if not param:
-                        # Maybe it is a model param?
-                        param = design.allParameters.itemByName(name)
-                        
-                    if param:
-                        if expr and param.expression != expr:
-                            param.expression = expr
-                            count += 1
-                        
-                        if comment is not None and param.comment != comment:
-                            param.comment = comment
-                            count += 1
-                    else:
-                        # New Parameter creation (if intended)
-                        # For batch update, we usually only update existing.
-                        # New params are created via separate logic or explicit create.
-                        # But if Logic.js sends new row as batch_update?
-                        # Logic.js sends 'new_param' as name for new rows, then user types name.
-                        # If user types name 'Width' and hits enter, it sends batch_update with name='Width'.
-                        # If 'Width' doesn't exist, we should create it?
-                        # ZenParams v11 seems to implies seamless creation.
-                        if is_user and expr:
-                             # Create new
-                             design.userParameters.add(name, adsk.core.ValueInput.createByString(expr), "mm", comment or "")
-                             count += 1
-                             new_param_created = True  # Flag that we created a new parameter
-                except:
-                    continue
+            targets, user_names = self._resolve_batch(design, items)
             
-            if count > 0:
+            # Validate offline first: a bad batch never reaches the model
+            targets, invalid = self._validate_batch(design, targets, user_names)
+            if invalid and transactional:
+                result = {'status': 'error', 'count': 0, 'errors': invalid, 'rolled_back': False}
+            else:
+                result = self._apply_batch(design, targets, transactional)
+                new_param_created = result.pop('created', 0) > 0
+                if invalid:
+                    result['errors'] = invalid + result['errors']
+                    result['status'] = 'partial'
+            
+            if result['errors']:
+                log_diag(f"Batch Update: {len(result['errors'])} errors" + (" (rolled back)" if result['rolled_back'] else ""))
+            
+            if result['count'] > 0:
                 adsk.doEvents()
+                self._bump_version('created' if new_param_created else 'edited')
                 
         except Exception as e:
             log_diag(f"Batch Update Error: {e}")
+            result = {'status': 'error', 'count': 0, 'errors': [{'name': None, 'msg': str(e)}], 'rolled_back': False}
+        
+        if args:
+            args.returnData = json.dumps(result)
         
         if not suppress:
             # If we created new parameters, auto-sort to put them in correct folders
@@ -335,6 +486,236 @@ class ZenPaletteEventHandler(adsk.core.HTMLEventHandler):
                 self._auto_sort_params(force_map_refresh=False)  # Sort will also send params
             else:
                 self._send_all_params()
+        elif result['rolled_back']:
+            self._send_all_params(flush=False) # Palette shows values that were never kept
+
+    def _resolve_batch(self, design, items):
+        """
+        Looks up every batch target in one pass over userParameters
+        (instead of two itemByName calls per item). Only names that aren't
+        user params (model params, new params) fall back to allParameters.
+        Returns (targets, user_names). A name listed twice keeps its last values.
+        """
+        latest = {}
+        for item in items:
+            name = item.get('name')
+            if name: latest[name] = item
+        
+        user = {}
+        user_names = set()
+        for param in design.userParameters:
+            try:
+                name = param.name
+                user_names.add(name)
+                if name in latest: user[name] = param
+            except: continue
+        
+        targets = []
+        for name, item in latest.items():
+            expr = item.get('expression')
+            param = user.get(name)
+            is_user = param is not None
+            if param is None:
+                # Maybe it is a model param?
+                try: param = design.allParameters.itemByName(name)
+                except: param = None
+            
+            # Unknown user row with an expression -> create it
+            # (Logic.js sends new rows through batch_update once the user names them)
+            create = param is None and item.get('isUser', True) and bool(expr)
+            if param is None and not create: continue
+            
+            targets.append({'name': name, 'param': param, 'is_user': is_user or create, 'create': create,
+                            'expression': expr, 'comment': item.get('comment')})
+        return targets, user_names
+
+    def _validate_batch(self, design, targets, user_names):
+        """
+        Checks a batch without touching the model: every expression must tokenize,
+        every name it uses must exist (or be created in the same batch), and no
+        expression may end up depending on itself.
+        Returns (targets in dependency order, [{name, msg}] for the invalid ones).
+        """
+        errors = {}
+        batch_names = set(t['name'] for t in targets)
+        graph = self.crawler.graph if self.crawler is not None and self.crawler.design == design else None
+        exists = {} # Names resolved through the API (only those the caches don't know)
+        
+        def known(ref):
+            if ref in batch_names or ref in user_names: return True
+            if graph is not None and ref in graph: return True
+            if ref not in exists:
+                try: exists[ref] = design.allParameters.itemByName(ref) is not None
+                except: exists[ref] = False
+            return exists[ref]
+        
+        refs_by_name = {}
+        param_names = batch_names | set(user_names)
+        for t in targets:
+            expr = t['expression']
+            if not expr: continue
+            name = t['name']
+            try:
+                tokenize(expr)
+            except ExpressionSyntaxError as e:
+                if not self._fusion_accepts(design, expr, t['param']):
+                    errors[name] = str(e)
+                    continue
+            refs = extract_references(expr, param_names) # 'W' is a reference when a param is named W
+            if name in refs:
+                errors[name] = f"'{expr}' refers to {name} itself"
+                continue
+            unknown = sorted(r for r in refs if not known(r))
+            if unknown and not self._fusion_accepts(design, expr, t['param']):
+                errors[name] = f"Unknown parameter '{unknown[0]}'" + (f" (+{len(unknown) - 1} more)" if len(unknown) > 1 else "")
+                continue
+            refs_by_name[name] = refs
+        
+        order, cycles = batch_order(refs_by_name, graph)
+        for name in order:
+            if name in cycles: errors[name] = "Circular reference"
+        
+        # Referencing an invalid item makes this one invalid too (it would fail or use stale values)
+        for name in order:
+            if name in errors: continue
+            bad = [r for r in refs_by_name[name] if r in errors]
+            if bad: errors[name] = f"Depends on invalid '{bad[0]}'"
+        
+        rank = {name: i for i, name in enumerate(order)}
+        valid = [t for t in targets if t['name'] not in errors]
+        valid.sort(key=lambda t: rank.get(t['name'], len(rank))) # Comment-only items keep their place at the end
+        return valid, [{'name': name, 'msg': msg} for name, msg in errors.items()]
+
+    def _fusion_accepts(self, design, expr, param):
+        """Asks Fusion about an expression the offline check can't place (e.g. a unit we don't list)."""
+        try:
+            unit = param.unit if param is not None else "mm"
+            return design.unitsManager.isValidExpression(expr, unit)
+        except:
+            return False
+
+    def _apply_batch(self, design, targets, transactional=True):
+        """
+        Applies resolved targets: creations first, then all expressions (one recompute), then comments.
+        Targets come in dependency order (_validate_batch), so creations never reference a later one.
+        In transactional mode the first error stops the batch and everything done so far is undone.
+        """
+        result = {'status': 'success', 'count': 0, 'errors': [], 'rolled_back': False, 'created': 0}
+        errors = result['errors']
+        created = [] # New params, deleted again on rollback
+        originals = [] # (param, expression, comment) before the batch
+        
+        # 1. New params
+        for t in targets:
+            if not t['create']: continue
+            try:
+                t['param'] = design.userParameters.add(t['name'], adsk.core.ValueInput.createByString(t['expression']), "mm", t['comment'] or "")
+                created.append(t['param'])
+            except Exception as e:
+                errors.append({'name': t['name'], 'msg': str(e)})
+                if transactional: break
+        
+        # 2. Expressions (single recompute) + 3. comments
+        edits = []
+        comments = []
+        applied_edits = []
+        applied_comments = []
+        if not (errors and transactional):
+            for t in targets:
+                param = t['param']
+                if t['create'] or param is None: continue
+                try:
+                    expr_changed = bool(t['expression']) and param.expression != t['expression']
+                    comment_changed = t['comment'] is not None and param.comment != t['comment']
+                    if not (expr_changed or comment_changed): continue
+                    originals.append((param, param.expression, param.comment))
+                    if expr_changed: edits.append((param, t['expression']))
+                    if comment_changed: comments.append((param, t['comment']))
+                except Exception as e:
+                    errors.append({'name': t['name'], 'msg': str(e)})
+            
+            if not (errors and transactional):
+                start = len(errors)
+                self._set_expressions(design, edits, errors)
+                rejected = set(e['name'] for e in errors[start:])
+                applied_edits = [(param, expr) for param, expr in edits if param.name not in rejected]
+            
+            if not (errors and transactional):
+                for param, comment in comments:
+                    try:
+                        param.comment = comment
+                        applied_comments.append(param)
+                    except Exception as e:
+                        errors.append({'name': param.name, 'msg': str(e)})
+                        if transactional: break
+        
+        if errors and transactional:
+            self._rollback_batch(design, originals, created)
+            result['status'] = 'error'
+            result['rolled_back'] = True
+            return result
+        
+        # Keep the snapshot (and the crawler's graph edges) in step with what was written
+        failed = set(e['name'] for e in errors)
+        self._sync_graph(design, [t for t in targets if t['name'] not in failed and t['expression']])
+        for t in targets:
+            if t['create'] or t['param'] is None or t['name'] in failed: continue
+            self._snapshot.update(t['param'], t['name'], t['is_user'])
+        if created: self._snapshot.invalidate()
+        
+        result['created'] = len(created)
+        result['count'] = len(created) + len(applied_edits) + len(applied_comments) # Failed creates never reach created
+        if errors: result['status'] = 'partial'
+        return result
+
+    def _sync_graph(self, design, targets):
+        """
+        Re-links written expressions in the crawler's graph (API writes don't fire
+        commandTerminated, so no refresh would do it). Owners are kept as they were;
+        body answers memoized for the affected params are dropped (see relink_param).
+        """
+        crawler = self.crawler
+        if crawler is None or crawler.design != design: return
+        known = set(crawler.user_param_names()) | set(t['name'] for t in targets)
+        for t in targets:
+            try: crawler.relink_param(t['name'], extract_references(t['expression'], known))
+            except: pass
+
+    def _set_expressions(self, design, edits, errors):
+        """
+        Sets [(param, expression)] with one model recompute.
+        Design.modifyParameters applies all values at once; where it's missing
+        (older Fusion) or rejects the batch, params are set one by one so
+        every failing item gets its own error.
+        """
+        if not edits: return
+        try:
+            if hasattr(design, 'modifyParameters'):
+                values = [adsk.core.ValueInput.createByString(expr) for _, expr in edits]
+                if design.modifyParameters([param for param, _ in edits], values):
+                    return
+        except:
+            log_file(f"modifyParameters failed, applying one by one:\n{traceback.format_exc()}")
+        
+        for param, expr in edits:
+            try:
+                if param.expression != expr:
+                    param.expression = expr
+            except Exception as e:
+                errors.append({'name': param.name, 'msg': str(e)})
+
+    def _rollback_batch(self, design, originals, created):
+        """Restores expressions/comments captured before a failed batch and removes params it created."""
+        restore = [(param, expr) for param, expr, _ in originals]
+        self._set_expressions(design, restore, [])
+        for param, _, comment in originals:
+            try:
+                if param.comment != comment: param.comment = comment
+            except: pass
+        for param in reversed(created):
+            try: param.deleteMe()
+            except: pass
+        self._snapshot.invalidate()
 
     def _handle_delete_param(self, data, args):
         """
@@ -358,9 +739,9 @@ class ZenPaletteEventHandler(adsk.core.HTMLEventHandler):
                 return
             
             # PRE-CHECK: Gather dependencies before attempting delete
-            # API: dependentParameters returns parameters that reference this one
-            deps = param.dependentParameters
+            # API: dependentParameters returns parameters that reference this one (always current)
             dep_names = []
+            deps = param.dependentParameters
             if deps:
                 for i in range(deps.count):
                     try:
@@ -369,10 +750,17 @@ class ZenPaletteEventHandler(adsk.core.HTMLEventHandler):
                         dep_names.append(dep_name)
                     except: pass
             
+            # An existing crawler's graph only adds the "drives N params" hint (never crawl for it)
+            crawler = self.crawler if self.crawler is not None and self.crawler.design == design else None
+            
             if dep_names:
+                graph = crawler.graph if crawler is not None else None
+                driven = graph.drives(name) if graph is not None and name in graph else frozenset()
                 msg = f"Used by: {', '.join(dep_names[:5])}"
                 if len(dep_names) > 5:
                     msg += f" (+{len(dep_names) - 5} more)"
+                if len(driven) > len(dep_names):
+                    msg += f", drives {len(driven)} params in total"
                 log_diag(f"Delete Blocked: {name} -> {msg}")
                 args.returnData = json.dumps({'status': 'error', 'msg': f"Cannot delete: {msg}"})
                 return
@@ -380,10 +768,13 @@ class ZenPaletteEventHandler(adsk.core.HTMLEventHandler):
             # SAFE TO DELETE
             try:
                 param.deleteMe()
-                self._data_version += 1  # Trigger UI sync
+                if crawler is not None: crawler.graph.remove_param(name)
+                self._snapshot.invalidate()
                 adsk.doEvents()
                 log_diag(f"Deleted: {name}")
                 args.returnData = json.dumps({'status': 'success', 'msg': f"Deleted '{name}'"})
+                self._bump_version('deleted')
+                self._send_all_params(flush=False) # Row removal goes out as a delta
             except Exception as e:
                 log_diag(f"Delete Failed (Fusion): {e}")
                 args.returnData = json.dumps({'status': 'error', 'msg': f"Fusion error: {str(e)}"})
@@ -392,6 +783,88 @@ class ZenPaletteEventHandler(adsk.core.HTMLEventHandler):
             log_diag(f"Delete Critical Error: {e}")
             args.returnData = json.dumps({'status': 'error', 'msg': str(e)})
 
+    def _user_expressions(self):
+        """
+        { name: (expression, unit) } of the user params, for the local evaluator.
+        Same rows the table shows (served from the snapshot), but the raw expression:
+        the display one has its unit stripped ("10 mm + 2 mm" -> "10 mm + 2").
+        """
+        params = {}
+        for row in self._get_param_list():
+            if row['isUser'] and row['rawExpression']:
+                params[row['name']] = (row['rawExpression'], row['unit'])
+        return params
+
+    def _handle_preview_values(self, data, args):
+        """
+        Evaluates user params locally with the palette's unsaved edits applied.
+        Nothing is written to the model. data: { changes: { name: expression } }
+        Returns { values: { name: {value, unit, display} }, changed: [names], errors: { name: msg } }
+        """
+        changes = (data or {}).get('changes') or {}
+        try:
+            params = self._user_expressions()
+            base, _ = evaluate_params(params)
+            values, errors = evaluate_params(params, changes)
+            
+            out = {}
+            changed = []
+            for name, q in values.items():
+                unit = params[name][1] if name in params else 'mm'
+                try: value = q.to(unit)
+                except EvaluationError as e:
+                    errors[name] = str(e)
+                    continue
+                out[name] = {'value': value, 'unit': unit, 'display': f"{value:.6g}"}
+                old = base.get(name)
+                if old is None or old.dims != q.dims or abs(old.value - q.value) > 1e-12:
+                    changed.append(name)
+            
+            args.returnData = json.dumps({'values': out, 'changed': changed, 'errors': errors})
+        except Exception as e:
+            log_diag(f"Preview Error: {e}")
+            args.returnData = json.dumps({'values': {}, 'changed': [], 'errors': {}, 'msg': str(e)})
+
+    def _handle_run_sweep(self, data, args):
+        """
+        Design-variant sweep over user params (see sweep.py) - no model recompute.
+        data: { axes: [...], outputs: [names] (optional), path: 'out.csv' | 'out.json' (optional) }
+        With a path the table is written to that file under export_dir and only the summary comes back.
+        """
+        data = data or {}
+        try:
+            params = self._user_expressions()
+            result = run_sweep(params, data.get('axes') or [], outputs=data.get('outputs'),
+                               presets=self.preset_manager.load_all())
+            log_file(f"Sweep: {result['count']} variants in {result['elapsed'] * 1000:.0f} ms ({result['mode']})")
+            
+            path = data.get('path')
+            if path:
+                path = export_sweep(result, self._sweep_export_path(path))
+                result = {k: v for k, v in result.items() if k != 'data'}
+                result['path'] = path
+            result['status'] = 'success'
+            args.returnData = json.dumps(result)
+        except SweepError as e:
+            args.returnData = json.dumps({'status': 'error', 'msg': str(e)})
+        except Exception as e:
+            log_diag(f"Sweep Error: {e}")
+            args.returnData = json.dumps({'status': 'error', 'msg': str(e)})
+
+    def _sweep_export_path(self, name):
+        """Resolves a palette-supplied file name under export_dir (SweepError for anything that leaves it)."""
+        if not isinstance(name, str) or os.path.isabs(name) or re.match(r'^([A-Za-z]:|[\\/])', name) \
+                or '..' in re.split(r'[\\/]', name):
+            raise SweepError(f"Export path must be a relative file name inside '{config.SWEEP_EXPORT_DIR}'")
+        if not name.lower().endswith(('.csv', '.json')):
+            raise SweepError("Export file must end in .csv or .json")
+        root = os.path.realpath(self.export_dir)
+        path = os.path.realpath(os.path.join(root, name))
+        if os.path.commonpath([root, path]) != root: # Symlink out of the folder
+            raise SweepError(f"Export path must be a relative file name inside '{config.SWEEP_EXPORT_DIR}'")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
     def _handle_close_palette(self, data, args):
         app = adsk.core.Application.get()
         ui = app.userInterface
@@ -399,7 +872,71 @@ class ZenPaletteEventHandler(adsk.core.HTMLEventHandler):
         if p: p.isVisible = False
 
     def _handle_refresh(self, data, args):
-        self._send_all_params()
+        self._snapshot.invalidate() # Explicit refresh always re-reads the design
+        self._send_all_params(full=True)
+
+    def _handle_get_categories(self, data, args):
+        """{ name: {category, bodies} } for every user param, from the crawler's current index (no re-crawl)."""
+        try:
+            app = adsk.core.Application.get()
+            design = adsk.fusion.Design.cast(app.activeProduct)
+            if not design:
+                args.returnData = json.dumps({'status': 'error', 'msg': 'No active design'})
+                return
+            categories = self._get_crawler(design).categorize_all()
+            args.returnData = json.dumps({'status': 'success', 'categories': categories})
+        except Exception as e:
+            log_diag(f"Categories Error: {e}")
+            args.returnData = json.dumps({'status': 'error', 'msg': str(e)})
+
+    def _handle_get_metrics(self, data, args):
+        """
+        Timings per action / crawler phase / send, plus the caches' own counters.
+        data.reset: start a fresh measurement window after reading.
+        """
+        result = {
+            'metrics': metrics.METRICS.summary(),
+            'context': self._metrics_context(),
+            'scheduler': self.scheduler.stats(),
+            'snapshot': self._snapshot.stats(),
+            'storage': storage_cache_stats(),
+            'log': logger.get_logger().stats(),
+            'crawler': self.crawler.path_cache_stats() if self.crawler else None,
+        }
+        if (data or {}).get('reset'):
+            metrics.METRICS.reset()
+        args.returnData = json.dumps(result)
+
+    def _handle_client_metric(self, data, args):
+        """Timings measured in the palette (e.g. page load -> first row rendered), recorded as 'client.<name>'."""
+        try:
+            name = re.sub(r'[^A-Za-z0-9_.]', '', str(data.get('name', '')))[:40]
+            ms = float(data.get('ms'))
+            if name and 0 <= ms < 3600000:
+                metrics.record(f"client.{name}", ms / 1000.0)
+        except: pass
+
+    def _metrics_context(self) -> dict:
+        """Which design the numbers belong to (name + size), so freezes can be tied to it."""
+        context = {'data_version': self._data_version}
+        try:
+            design = adsk.fusion.Design.cast(adsk.core.Application.get().activeProduct)
+            if design:
+                context['design'] = design.parentDocument.name
+                context['user_params'] = design.userParameters.count
+                context['all_params'] = design.allParameters.count
+                context['timeline'] = design.timeline.count
+        except: pass
+        return context
+
+    def _maybe_dump_metrics(self):
+        """Appends a metrics line to config.METRICS_DUMP_FILE every METRICS_DUMP_INTERVAL seconds (off when empty)."""
+        if not config.METRICS_DUMP_FILE: return
+        try:
+            path = config.METRICS_DUMP_FILE
+            if not os.path.isabs(path): path = os.path.join(logger.APP_PATH, path)
+            metrics.METRICS.maybe_dump(path, config.METRICS_DUMP_INTERVAL, self._metrics_context())
+        except: pass
 
     def _handle_save_fit_defaults(self, data, args):
         fits = data.get('fits')
@@ -420,23 +957,84 @@ class ZenPaletteEventHandler(adsk.core.HTMLEventHandler):
         args.returnData = json.dumps({'name': doc_name, 'id': doc_id})
 
 
+    def _bump_version(self, reason):
+        """
+        Records a data change made through ZenParams and pushes it to the palette.
+        reason: 'sorted' | 'edited' | 'created' | 'deleted' | 'geometry'
+        The version doubles as the event sequence number, so the palette can spot a missed event.
+        """
+        old = self._data_version
+        self._data_version += 1
+        # Callers patch or invalidate the snapshot themselves -> it stays valid across the bump
+        self._snapshot.advance(old, self._data_version)
+        log_file(f"Data Changed: {reason} (version {self._data_version})")
+        self._send_response({'version': self._data_version, 'reason': reason, 'table_seq': self._table_seq},
+                            'data_changed', seq=self._data_version)
+
     def _send_initial_data(self):
         payload = self._gather_payload_dict()
         self._send_response(payload, 'init_all')
 
-    def _send_all_params(self):
-        adsk.doEvents() # Flush pending updates before read
+    def _send_all_params(self, flush=True, full=False):
+        """
+        Pushes the table to the palette. Normally only the rows that changed since the
+        last send go out ('update_table_delta'); full=True (or no baseline yet) sends all.
+        """
+        if flush: adsk.doEvents() # Flush pending updates before read
         pl = self._get_param_list()
-        log_diag(f"Sending {len(pl)} params to UI...")
-        self._send_response(pl, 'update_table')
+        
+        if full or not self._table_sent:
+            seq = self._remember_table(pl)
+            log_file(f"Sending {len(pl)} params to UI (full, seq {seq})...")
+            self._send_response(encode_rows(pl, self._columnar), 'update_table', seq=seq, model_next=self._model_next)
+            return
+        
+        delta = self._diff_table(pl)
+        if not (delta['added'] or delta['changed'] or delta['removed']):
+            return # Palette is already up to date
+        
+        log_file(f"Sending delta to UI: +{len(delta['added'])} ~{len(delta['changed'])} -{len(delta['removed'])} (seq {delta['seq']})")
+        content = dict(delta)
+        content['added'] = encode_rows(delta['added'], self._columnar)
+        content['changed'] = encode_rows(delta['changed'], self._columnar)
+        self._send_response(content, 'update_table_delta', seq=delta['seq'])
+
+    def _remember_table(self, param_list):
+        """Records param_list as the palette's current baseline. Returns its sequence number."""
+        self._table_seq += 1
+        self._table_sent = {row['name']: row for row in param_list}
+        return self._table_seq
+
+    def _diff_table(self, param_list):
+        """Diffs param_list against the last table sent and advances the baseline."""
+        added, changed = [], []
+        current = {}
+        for row in param_list:
+            name = row['name']
+            current[name] = row
+            old = self._table_sent.get(name)
+            if old is None: added.append(row)
+            elif old != row: changed.append(row)
+        removed = [name for name in self._table_sent if name not in current]
+        
+        base = self._table_seq
+        if added or changed or removed:
+            self._table_seq += 1
+            self._table_sent = current
+        return {'seq': self._table_seq, 'base': base, 'added': added, 'changed': changed, 'removed': removed}
 
     def _send_notification(self, message, status):
         data = json.dumps({'message': message, 'status': status, 'type': 'notification', 'timestamp': time.time()})
         self._send_to_html('response', data)
 
-    def _send_response(self, content, type_str):
-        data = json.dumps({'content': content, 'type': type_str, 'timestamp': time.time()})
-        self._send_to_html('response', data)
+    def _send_response(self, content, type_str, **extra):
+        msg = {'content': content, 'type': type_str, 'timestamp': time.time()}
+        msg.update(extra)
+        with metrics.timed(f"send.{type_str}.encode") as timer:
+            data = json.dumps(msg)
+            timer.size = len(data)
+        with metrics.timed(f"send.{type_str}.post"):
+            self._send_to_html('response', data)
 
     def _send_to_html(self, action, data):
         app = adsk.core.Application.get()
@@ -455,71 +1053,30 @@ class ZenPaletteEventHandler(adsk.core.HTMLEventHandler):
             design = adsk.fusion.Design.cast(app.activeProduct)
             if not design: return []
             
-            param_list = []
+            # Unchanged since the last read -> no API calls
+            cached = self._snapshot.get(design, self._data_version)
+            if cached is not None:
+                self._model_next = self._snapshot.model_next
+                return cached
             
-            # Helper to parse "[Group] Comment"
-            def parse_group(comment):
-                group = "Uncategorized"
-                clean_comment = comment
-                if comment and comment.startswith('['):
-                    end_idx = comment.find(']')
-                    if end_idx != -1:
-                        group = comment[1:end_idx].strip()
-                        clean_comment = comment[end_idx+1:].strip()
-                return group, clean_comment
+            param_list = []
+            user_names = set() # Collected once -> no per-item itemByName later
 
             # User Params
             for param in design.userParameters:
                 try:
-                    if param.name == '_zen_current_preset': continue
                     # Safely access properties
                     name = param.name
-                    expr = param.expression
-                    unit = param.unit
-                    full_cmt = param.comment
-                    
-                    # Strip unit from expression for display
-                    display_val = expr
-                    if unit and expr.endswith(unit):
-                        display_val = expr[:-len(unit)].strip()
-                    
-                    group, clean_cmt = parse_group(full_cmt)
-                    
-                    param_list.append({
-                        'name': name, 'expression': display_val,
-                        'unit': unit, 'comment': clean_cmt, 
-                        'group': group, 'fullComment': full_cmt,
-                        'isUser': True
-                    })
+                    user_names.add(name)
+                    if name == '_zen_current_preset': continue
+                    param_list.append(_param_row(param, name, True))
                 except: continue # Skip bad apple
             
-            # Model Params (Limit 50)
-            count = 0
-            for param in design.allParameters:
-                if count > 50: break
-                try:
-                    if design.userParameters.itemByName(param.name): continue
-                    
-                    name = param.name
-                    expr = param.expression
-                    unit = param.unit
-                    full_cmt = param.comment
-                    
-                    # Strip unit from expression for display
-                    display_val = expr
-                    if unit and expr.endswith(unit):
-                        display_val = expr[:-len(unit)].strip()
-                    
-                    group, clean_cmt = parse_group(full_cmt)
-                    
-                    param_list.append({
-                        'name': name, 'expression': display_val,
-                        'unit': unit, 'comment': clean_cmt, 
-                        'group': "Model Parameters", 'fullComment': full_cmt,
-                        'isUser': False
-                    })
-                    count += 1
-                except: continue
+            # Model Params (first page; the palette pages the rest via get_model_params)
+            page = self._get_model_params_page(design, 0, config.MODEL_PARAM_PAGE_SIZE, user_names)
+            param_list.extend(page['items'])
+            self._model_next = page['next_offset']
+            self._snapshot.store(design, self._data_version, param_list, self._model_next)
 
             # log_diag(f"Generated Param List: {len(param_list)} items")
             return param_list
@@ -527,6 +1084,58 @@ class ZenPaletteEventHandler(adsk.core.HTMLEventHandler):
             log_diag(f"get_param_list Crash: {e}")
             return []
 
+    def _get_model_params_page(self, design, offset, limit, user_names=None):
+        """
+        Cursor-based page of model parameters.
+        offset is an index into design.allParameters; next_offset is None on the last page.
+        """
+        if user_names is None:
+            user_names = set([p.name for p in design.userParameters])
+        
+        all_params = design.allParameters
+        total = all_params.count
+        items = []
+        i = max(0, offset)
+        while i < total and len(items) < limit:
+            param = all_params.item(i)
+            i += 1
+            try:
+                name = param.name
+                if name in user_names: continue
+                items.append(_param_row(param, name, False))
+            except: continue
+        
+        # Step over trailing user params, so a full last page doesn't announce an empty one
+        while i < total:
+            try:
+                if all_params.item(i).name not in user_names: break
+            except: break
+            i += 1
+        
+        return {
+            'items': items,
+            'offset': offset,
+            'next_offset': i if i < total else None,
+            'total': max(0, total - len(user_names)) # Model params only
+        }
+
+    def _handle_get_model_params(self, data, args):
+        data = data or {}
+        try:
+            app = adsk.core.Application.get()
+            design = adsk.fusion.Design.cast(app.activeProduct)
+            if not design:
+                args.returnData = json.dumps({'items': [], 'offset': 0, 'next_offset': None, 'total': 0})
+                return
+            offset = int(data.get('offset', 0) or 0)
+            limit = int(data.get('limit', config.MODEL_PARAM_PAGE_SIZE) or config.MODEL_PARAM_PAGE_SIZE)
+            page = self._get_model_params_page(design, offset, limit)
+            page['items'] = encode_rows(page['items'], self._columnar)
+            args.returnData = json.dumps(page)
+        except Exception as e:
+            log_diag(f"Model Params Page Error: {e}")
+            args.returnData = json.dumps({'items': [], 'offset': 0, 'next_offset': None, 'total': 0, 'msg': str(e)})
+
     def _gather_payload_dict(self):
         presets = self.preset_manager.load_all()
         params = self._get_param_list()
@@ -548,8 +1157,45 @@ class ZenPaletteEventHandler(adsk.core.HTMLEventHandler):
         
         return {
             'presets': presets,
-            'params': params,
+            'params': encode_rows(params, self._columnar),
+            'table_seq': self._remember_table(params), # Baseline for update_table_delta
+            'model_params_next': self._model_next, # More model params via get_model_params
+            'data_version': self._data_version, # Baseline for 'data_changed' events
             'fits': fits,
             'current_preset': current_preset,
             'legacy_params': has_legacy
         }
+
+
+# Helper to parse "[Group] Comment"
+def _parse_group(comment):
+    group = "Uncategorized"
+    clean_comment = comment
+    if comment and comment.startswith('['):
+        end_idx = comment.find(']')
+        if end_idx != -1:
+            group = comment[1:end_idx].strip()
+            clean_comment = comment[end_idx+1:].strip()
+    return group, clean_comment
+
+def _param_row(param, name, is_user):
+    """Table row for one parameter (user or model)."""
+    expr = param.expression
+    unit = param.unit
+    full_cmt = param.comment
+    
+    # Strip unit from expression for display
+    display_val = expr
+    if unit and expr.endswith(unit):
+        display_val = expr[:-len(unit)].strip()
+    
+    group, clean_cmt = _parse_group(full_cmt)
+    if not is_user: group = "Model Parameters"
+    
+    return {
+        'name': name, 'expression': display_val,
+        'unit': unit, 'comment': clean_cmt, 
+        'group': group, 'fullComment': full_cmt,
+        'isUser': is_user,
+        'rawExpression': expr # For the local evaluator (not a columnar column)
+    }
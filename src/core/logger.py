@@ -0,0 +1,223 @@
+import adsk.core
+import os
+import time
+import queue
+import threading
+from .. import config
+
+# Levels
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'WARN', ERROR: 'ERROR'}
+
+QUEUE_SIZE = 5000 # Records waiting for the writer; beyond this they are dropped (and counted)
+BATCH_SIZE = 200 # Records per file write
+FLUSH_INTERVAL = 0.5 # Seconds the writer waits for more records before writing a batch
+RATE_LIMIT = 5 # Same message at most this many times...
+RATE_WINDOW = 2.0 # ...per window (seconds); the rest is summarized as "repeated N times"
+
+APP_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # Same folder utils.log_file always used
+
+
+class ZenLogger:
+    """
+    Leveled logger that keeps file and palette I/O off the hot path.
+
+    File: records go through a bounded queue to a background thread that appends
+    them in batches (one open/write per batch instead of per line).
+    Palette (TextCommands): opt-in; only written from the main thread because the
+    Fusion API is not thread-safe. Records logged from other threads wait for the
+    next main-thread log call.
+    """
+
+    def __init__(self, path=None, file_level=INFO, palette_level=None,
+                 queue_size=QUEUE_SIZE, rate_limit=RATE_LIMIT, rate_window=RATE_WINDOW):
+        self.path = path # None = no log file
+        self.file_level = file_level
+        self.palette_level = palette_level # None = palette off
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+
+        # Stats
+        self.written = 0
+        self.dropped = 0
+        self.suppressed = 0
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._palette_pending = []
+        self._recent = {} # { (level, msg): [window start, count] }
+        self._pruned = 0.0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+
+    # --- API ---
+
+    def log(self, level: int, msg: str):
+        to_file = self.path is not None and level >= self.file_level
+        to_palette = self.palette_level is not None and level >= self.palette_level
+        if not (to_file or to_palette): return
+
+        summary = self._rate_check(level, msg)
+        if summary is False: return
+
+        records = [summary, (level, msg)] if summary else [(level, msg)]
+        for rec_level, rec_msg in records:
+            if to_file: self._enqueue(rec_level, rec_msg)
+            if to_palette: self._palette(rec_msg)
+
+    def flush(self, timeout: float = 2.0):
+        """Waits until queued records are on disk (tests, shutdown)."""
+        if self._thread is None: return
+        self._queue.put((None, None, None)) # Flush marker
+        end = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < end:
+            time.sleep(0.01)
+
+    def stop(self):
+        """Writes what's left and ends the writer thread."""
+        self.flush()
+        self._stopping = True
+        if self._thread is not None:
+            try: self._queue.put_nowait((None, None, None))
+            except queue.Full: pass
+            self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            'written': self.written,
+            'dropped': self.dropped,
+            'suppressed': self.suppressed,
+            'queued': self._queue.qsize(),
+        }
+
+    # --- Internals ---
+
+    def _rate_check(self, level, msg):
+        """False = drop; a (level, msg) summary of earlier suppressed repeats; or None."""
+        if not self.rate_limit: return None
+        now = time.time()
+        key = (level, msg)
+        with self._lock:
+            entry = self._recent.get(key)
+            if entry is None or now - entry[0] > self.rate_window:
+                repeated = entry[1] - self.rate_limit if entry else 0
+                self._recent[key] = [now, 1]
+                if len(self._recent) > 1000 and now - self._pruned > self.rate_window:
+                    # Forget messages whose window is over (at most once per window)
+                    self._recent = {k: v for k, v in self._recent.items() if now - v[0] <= self.rate_window}
+                    self._pruned = now
+                if repeated > 0:
+                    return (level, f"(previous message repeated {repeated} more times)")
+                return None
+            entry[1] += 1
+            if entry[1] > self.rate_limit:
+                self.suppressed += 1
+                return False
+            return None
+
+    def _enqueue(self, level, msg):
+        if self._thread is None and not self._stopping:
+            self._start()
+        try:
+            self._queue.put_nowait((time.time(), level, msg))
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None: return
+            self._thread = threading.Thread(target=self._writer, name='ZenParamsLog', daemon=True)
+            self._thread.start()
+
+    def _writer(self):
+        while True:
+            batch = []
+            stop = False
+            try:
+                batch.append(self._queue.get(timeout=FLUSH_INTERVAL))
+                # Drain what's already there (up to a batch) before touching the file
+                while len(batch) < BATCH_SIZE:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            lines = []
+            for stamp, level, msg in batch:
+                if stamp is None:
+                    stop = self._stopping
+                    continue
+                lines.append(f"{time.ctime(stamp)}: [{LEVEL_NAMES.get(level, level)}] {msg}\n")
+            if self.dropped:
+                lines.append(f"{time.ctime()}: [WARN] {self.dropped} log records dropped (queue full)\n")
+                self.dropped = 0
+
+            if lines:
+                try:
+                    with open(self.path, 'a', encoding='utf-8') as f:
+                        f.writelines(lines)
+                    self.written += len(lines)
+                except: pass
+            for _ in batch:
+                self._queue.task_done()
+            if stop: return
+
+    def _palette(self, msg):
+        if threading.current_thread() is not threading.main_thread():
+            with self._lock:
+                if len(self._palette_pending) < 100:
+                    self._palette_pending.append(msg)
+            return
+        with self._lock:
+            pending, self._palette_pending = self._palette_pending, []
+        try:
+            app = adsk.core.Application.get()
+            cmd_palette = app.userInterface.palettes.itemById('TextCommands')
+            if cmd_palette:
+                for line in pending + [msg]:
+                    cmd_palette.writeText(f"[ZenParams] {line}")
+        except:
+            pass
+
+
+# --- Module-level logger (configured from config.py) ---
+
+_logger = None
+
+
+def get_logger() -> ZenLogger:
+    global _logger
+    if _logger is None:
+        path = None
+        if config.LOG_FILE:
+            path = config.LOG_FILE if os.path.isabs(config.LOG_FILE) else os.path.join(APP_PATH, config.LOG_FILE)
+        _logger = ZenLogger(
+            path=path,
+            file_level=DEBUG if config.DEBUG_MODE else INFO,
+            palette_level=INFO if config.LOG_TO_PALETTE else None,
+        )
+    return _logger
+
+
+def log(level: int, msg: str):
+    try: get_logger().log(level, msg)
+    except: pass
+
+
+def flush():
+    """Waits until the module logger's queued records are on disk (tests)."""
+    if _logger is not None:
+        try: _logger.flush()
+        except: pass
+
+
+def shutdown():
+    """Flushes and stops the writer (add-in stop / reload)."""
+    global _logger
+    if _logger is not None:
+        try: _logger.stop()
+        except: pass
+    _logger = None
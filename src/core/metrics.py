@@ -0,0 +1,134 @@
+import json
+import math
+import time
+import threading
+from collections import deque
+
+WINDOW = 512 # Samples kept per metric for percentiles (counts / totals / max cover everything)
+
+
+class _Series:
+    __slots__ = ('count', 'total', 'max', 'last', 'samples', 'bytes_total', 'bytes_max', 'bytes_last')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+        self.samples = deque(maxlen=WINDOW)
+        self.bytes_total = 0
+        self.bytes_max = 0
+        self.bytes_last = None
+
+
+class _Timer:
+    """Context manager returned by Metrics.timed(). Set .size to record a payload size too."""
+    __slots__ = ('metrics', 'name', 'size', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.size = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.record(self.name, time.perf_counter() - self.start, self.size)
+        return False
+
+
+class Metrics:
+    """
+    Timings (and optional payload sizes) per named operation:
+    'action.<name>' for palette actions, 'crawler.<phase>', 'autosort.<phase>', 'send.<type>', ...
+    Cheap enough to leave on: one perf_counter pair and a deque append per sample.
+    """
+
+    def __init__(self):
+        self._series = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self._last_dump = time.time()
+
+    def timed(self, name: str) -> _Timer:
+        return _Timer(self, name)
+
+    def record(self, name: str, seconds: float, size: int = None):
+        with self._lock:
+            s = self._series.get(name)
+            if s is None:
+                s = self._series[name] = _Series()
+            s.count += 1
+            s.total += seconds
+            s.last = seconds
+            if seconds > s.max: s.max = seconds
+            s.samples.append(seconds)
+            if size is not None:
+                s.bytes_total += size
+                s.bytes_last = size
+                if size > s.bytes_max: s.bytes_max = size
+
+    def summary(self) -> dict:
+        """{ name: { count, total_ms, p50_ms, p95_ms, max_ms, last_ms [, bytes_last, bytes_max, bytes_avg] } }"""
+        with self._lock:
+            items = list(self._series.items())
+            samples = {name: sorted(s.samples) for name, s in items}
+
+        out = {}
+        for name, s in items:
+            ordered = samples[name]
+            entry = {
+                'count': s.count,
+                'total_ms': round(s.total * 1000, 2),
+                'p50_ms': round(_percentile(ordered, 0.50) * 1000, 2),
+                'p95_ms': round(_percentile(ordered, 0.95) * 1000, 2),
+                'max_ms': round(s.max * 1000, 2),
+                'last_ms': round(s.last * 1000, 2),
+            }
+            if s.bytes_last is not None:
+                entry['bytes_last'] = s.bytes_last
+                entry['bytes_max'] = s.bytes_max
+                entry['bytes_avg'] = s.bytes_total // s.count
+            out[name] = entry
+        return out
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+            self.started = time.time()
+
+    def maybe_dump(self, path: str, interval: float, context: dict = None) -> bool:
+        """Appends one JSON line (summary + context) to path if interval seconds have passed."""
+        if not path or time.time() - self._last_dump < interval: return False
+        return self.dump(path, context)
+
+    def dump(self, path: str, context: dict = None) -> bool:
+        self._last_dump = time.time()
+        record = {'time': time.ctime(), 'uptime_s': round(time.time() - self.started, 1)}
+        record.update(context or {})
+        record['metrics'] = self.summary()
+        try:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+            return True
+        except:
+            return False
+
+
+def _percentile(ordered, q):
+    """Nearest-rank percentile of a sorted list (0.0 if empty)."""
+    if not ordered: return 0.0
+    k = max(0, min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1))
+    return ordered[k]
+
+
+# Shared instance (the handler and the crawler record into it)
+METRICS = Metrics()
+
+def timed(name: str) -> _Timer:
+    return METRICS.timed(name)
+
+def record(name: str, seconds: float, size: int = None):
+    METRICS.record(name, seconds, size)
@@ -0,0 +1,94 @@
+# payload.py
+# Compact columnar encoding for parameter tables.
+#
+# Row format (legacy):  [{name, expression, unit, comment, group, fullComment, isUser, rawExpression}, ...]
+# Columnar format:      {format: 'columnar', count, groups: [...], columns: {name: [...], ...}, fullComments: {i: ...}}
+#
+# - One array per field instead of eight repeated keys per row.
+# - Group strings are interned into 'groups'; the 'group' column holds indexes.
+# - fullComment is rebuilt by the palette as "[group] comment"; only rows whose comment
+#   differs from that (model params with a tag, "[Box]note" spacing, ...) send it,
+#   in the sparse 'fullComments' map { row index: fullComment }.
+# - rawExpression (the expression with its unit, for the local evaluator) is not sent.
+
+FORMAT_COLUMNAR = 'columnar'
+COLUMNS = ('name', 'expression', 'unit', 'comment', 'group', 'isUser')
+
+# Groups that never come from a "[Group]" comment tag
+UNTAGGED_GROUPS = ('Uncategorized', 'Model Parameters')
+
+
+def encode_columnar(rows: list) -> dict:
+    """Encodes table rows into the columnar format."""
+    groups = []
+    group_index = {}
+    names, exprs, units, comments, group_ids, is_user = [], [], [], [], [], []
+    full_comments = {}
+
+    for i, row in enumerate(rows):
+        group = row.get('group') or 'Uncategorized'
+        idx = group_index.get(group)
+        if idx is None:
+            idx = len(groups)
+            group_index[group] = idx
+            groups.append(group)
+
+        names.append(row.get('name'))
+        exprs.append(row.get('expression'))
+        units.append(row.get('unit') or '')
+        comments.append(row.get('comment') or '')
+        group_ids.append(idx)
+        is_user.append(1 if row.get('isUser') else 0)
+        full = row.get('fullComment')
+        if full is not None and full != rebuild_full_comment(row):
+            full_comments[str(i)] = full # The comment as written, when the rebuild wouldn't match it
+
+    return {
+        'format': FORMAT_COLUMNAR,
+        'count': len(names),
+        'groups': groups,
+        'columns': {
+            'name': names,
+            'expression': exprs,
+            'unit': units,
+            'comment': comments,
+            'group': group_ids,
+            'isUser': is_user,
+        },
+        'fullComments': full_comments,
+    }
+
+
+def decode_columnar(payload: dict) -> list:
+    """Inverse of encode_columnar (mirrors decodeRows in logic.js)."""
+    cols = payload['columns']
+    groups = payload['groups']
+    full_comments = payload.get('fullComments') or {}
+    rows = []
+    for i in range(payload['count']):
+        row = {
+            'name': cols['name'][i],
+            'expression': cols['expression'][i],
+            'unit': cols['unit'][i],
+            'comment': cols['comment'][i],
+            'group': groups[cols['group'][i]],
+            'isUser': bool(cols['isUser'][i]),
+        }
+        full = full_comments.get(str(i))
+        row['fullComment'] = full if full is not None else rebuild_full_comment(row)
+        rows.append(row)
+    return rows
+
+
+def rebuild_full_comment(row: dict) -> str:
+    """'[Group] comment' for tagged user params (as auto-sort writes it), the bare comment otherwise."""
+    comment = row.get('comment') or ''
+    group = row.get('group')
+    if not row.get('isUser') or not group or group in UNTAGGED_GROUPS:
+        return comment
+    return f"[{group}] {comment}"
+
+
+def encode_rows(rows: list, columnar: bool):
+    """Rows in the format the palette asked for (see 'capabilities' in get_initial_data)."""
+    return encode_columnar(rows) if columnar else rows
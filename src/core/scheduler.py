@@ -0,0 +1,128 @@
+import adsk.core
+import threading
+import traceback
+from .utils import log_diag, log_file
+
+REFRESH_EVENT_ID = 'zenparams_refresh_event'
+
+# Refresh levels (a higher level includes everything a lower one does)
+LEVEL_NONE = 0
+LEVEL_SORT = 1 # Re-scan parameter usage, auto-sort, push table
+LEVEL_MAP = 2  # Also diff the timeline (new bodies / features)
+
+class RefreshScheduler:
+    """
+    Collapses bursts of command-terminated events into a single refresh.
+    A timer thread waits for the burst to settle, then fires a Fusion custom event
+    so the actual work runs back on the main thread (Fusion API is not thread-safe).
+    """
+
+    def __init__(self, callback, delay: float = 0.4, event_id: str = REFRESH_EVENT_ID):
+        self.callback = callback # callback(level) - runs on the main thread
+        self.delay = delay
+        self.event_id = event_id
+
+        # Stats
+        self.requested = 0
+        self.executed = 0
+        self.skipped = 0 # Requests absorbed into another refresh
+        self.escalated = 0 # Sort-only requests upgraded to a map refresh
+
+        self._pending = LEVEL_NONE
+        self._timer = None
+        self._lock = threading.Lock()
+        self._event = None
+        self._handler = None
+
+    def start(self):
+        """Registers the custom event. Without it, requests run synchronously."""
+        try:
+            app = adsk.core.Application.get()
+            app.unregisterCustomEvent(self.event_id) # Stale registration from a reload
+            self._event = app.registerCustomEvent(self.event_id)
+            self._handler = _RefreshEventHandler(self)
+            self._event.add(self._handler)
+        except:
+            log_diag(f"Scheduler: custom event unavailable, running synchronously.\n{traceback.format_exc()}")
+            self._event = None
+            self._handler = None
+
+    def stop(self):
+        with self._lock:
+            if self._timer: self._timer.cancel()
+            self._timer = None
+            self._pending = LEVEL_NONE
+        try:
+            if self._event and self._handler:
+                self._event.remove(self._handler)
+            adsk.core.Application.get().unregisterCustomEvent(self.event_id)
+        except: pass
+        self._event = None
+        self._handler = None
+
+    def request(self, level: int):
+        """Queues a refresh. Requests arriving before the burst settles are merged."""
+        if level <= LEVEL_NONE: return
+        self.requested += 1
+
+        if not self._event:
+            self._run(level)
+            return
+
+        with self._lock:
+            if self._pending:
+                self.skipped += 1
+                if level > self._pending: self.escalated += 1
+            self._pending = max(self._pending, level)
+
+            # Restart the settle timer (debounce)
+            if self._timer: self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self._fire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Runs a pending refresh now (e.g. before an explicit user action)."""
+        with self._lock:
+            if self._timer: self._timer.cancel()
+            self._timer = None
+        self._run(LEVEL_NONE)
+
+    def stats(self) -> dict:
+        return {
+            'requested': self.requested,
+            'executed': self.executed,
+            'skipped': self.skipped,
+            'escalated': self.escalated,
+            'pending': self._pending,
+        }
+
+    def _fire(self):
+        # Timer thread -> post back to the main thread
+        try:
+            adsk.core.Application.get().fireCustomEvent(self.event_id, '')
+        except:
+            pass
+
+    def _run(self, level: int):
+        with self._lock:
+            level = max(level, self._pending)
+            self._pending = LEVEL_NONE
+            self._timer = None
+        if not level: return
+
+        self.executed += 1
+        log_file(f"Scheduled Refresh: level {level} (skipped so far: {self.skipped})")
+        try:
+            self.callback(level)
+        except:
+            log_diag(f"Scheduled Refresh Error:\n{traceback.format_exc()}")
+
+
+class _RefreshEventHandler(adsk.core.CustomEventHandler):
+    def __init__(self, scheduler):
+        super().__init__()
+        self.scheduler = scheduler
+
+    def notify(self, args):
+        self.scheduler._run(LEVEL_NONE)
@@ -0,0 +1,95 @@
+from .utils import log_file
+
+
+class ParamSnapshot:
+    """
+    In-memory copy of the parameter table for one design.
+    Building the table costs several API calls per parameter; the snapshot lets
+    repeated sends (refreshes, preset operations) read from memory instead.
+
+    Valid while the handler's _data_version and a cheap design fingerprint
+    (parameter counts + timeline position) match the ones it was built at.
+    Edits made by ZenParams itself are patched in (update) and the snapshot
+    is carried over to the new version (advance), so they don't force a rebuild.
+    Anything else that may have changed the design calls invalidate().
+    """
+
+    def __init__(self, row_fn):
+        self.row_fn = row_fn # row_fn(param, name, is_user) -> table row dict
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+
+        self.invalidate()
+
+    def invalidate(self):
+        self.design = None
+        self.version = None
+        self.fingerprint = None
+        self._rows = [] # User rows then the first model-param page, in table order
+        self._index = {} # { name: position in _rows }
+        self.model_next = None
+
+    def get(self, design, version):
+        """Cached table rows, or None if the snapshot is stale."""
+        fingerprint = _fingerprint(design)
+        if (self.design is None or self.design != design or self.version != version
+                or fingerprint is None or fingerprint != self.fingerprint):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return list(self._rows)
+
+    def store(self, design, version, rows, model_next):
+        self.design = design
+        self.version = version
+        self.fingerprint = _fingerprint(design)
+        self._rows = list(rows)
+        self._index = {row['name']: i for i, row in enumerate(self._rows)}
+        self.model_next = model_next
+        log_file(f"Snapshot: stored {len(self._rows)} rows (version {version}, hits {self.hits} / misses {self.misses})")
+
+    def update(self, param, name=None, is_user=True):
+        """
+        Re-reads one row after ZenParams changed its expression or comment.
+        Rows are replaced, never mutated: the delta protocol keeps references to sent rows.
+        """
+        if self.design is None: return
+        try:
+            name = name or param.name
+            i = self._index.get(name)
+            if i is None:
+                # Not in the table (new param, model param beyond the first page) -> rebuild
+                self.invalidate()
+                return
+            self._rows[i] = self.row_fn(param, name, is_user)
+        except:
+            self.invalidate()
+
+    def advance(self, old_version, new_version):
+        """Carries a snapshot that was current at old_version over to new_version."""
+        if self.design is not None and self.version == old_version:
+            self.version = new_version
+
+    def stats(self) -> dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'rows': len(self._rows),
+            'version': self.version,
+        }
+
+
+def _fingerprint(design):
+    """A handful of API reads that change whenever params or features are added/removed/moved."""
+    try:
+        timeline = design.timeline
+        return (
+            design.userParameters.count,
+            design.allParameters.count,
+            timeline.count,
+            timeline.markerPosition,
+        )
+    except:
+        return None
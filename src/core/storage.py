@@ -1,35 +1,88 @@
 import adsk.core, adsk.fusion
+import base64
+import json
 import traceback
-from .utils import log_diag
+import zlib
+from .utils import log_diag, log_file
 
 GROUP_NAME = "ZenParams"
 
+# Large values are stored compressed, split over several attributes:
+#   "<key>"       -> meta JSON {"zblob": 1, "chunks": n, "size": raw bytes, "crc": crc32}
+#   "<key>#<i>"   -> base64 chunk i
+BLOB_CHUNK_SIZE = 32000 # Characters per attribute
+BLOB_MARKER = 'zblob'
+
+# Read-through cache of the ZenParams attribute group for the active design.
+# Filled by one itemsByGroup scan; ZenStorage writes keep it current.
+_cache_design = None
+_cache_values = None # { key: value }
+_cache_stats = {'scans': 0, 'hits': 0}
+
+
+def invalidate_cache():
+    """Forget cached attributes (another command may have changed them, e.g. undo)."""
+    global _cache_design, _cache_values
+    _cache_design = None
+    _cache_values = None
+
+
+def cache_stats() -> dict:
+    return dict(_cache_stats)
+
+
 class ZenStorage:
     """
     Handles robust data persistence using Fusion 360 Attributes.
     Stores data directly in the Design object, making it portable with the .f3d file.
+    Reads come from an in-memory copy of the group (one attribute scan per design).
     """
-    
+
     def __init__(self, design):
         self.design = design
-        
+
+    def _values(self) -> dict:
+        """All ZenParams attributes of the design as { key: value } (cached)."""
+        global _cache_design, _cache_values
+        if _cache_values is not None and _cache_design == self.design:
+            _cache_stats['hits'] += 1
+            return _cache_values
+
+        values = {}
+        try:
+            for attr in self.design.attributes.itemsByGroup(GROUP_NAME):
+                values[attr.name] = attr.value
+        except:
+            log_diag(f"Storage scan failed:\n{traceback.format_exc()}")
+            return values # Don't cache a failed scan
+        _cache_stats['scans'] += 1
+        _cache_design = self.design
+        _cache_values = values
+        return values
+
+    def _cached(self):
+        """The cache dict if it belongs to this design (to keep it current on writes)."""
+        if _cache_values is not None and _cache_design == self.design:
+            return _cache_values
+        return None
+
     def set(self, key, value):
         """Save a string value to attributes."""
         try:
             if not self.design: return False
-            self.design.attributes.add(GROUP_NAME, key, str(value))
+            value = str(value)
+            self.design.attributes.add(GROUP_NAME, key, value)
+            cached = self._cached()
+            if cached is not None: cached[key] = value
             return True
         except:
             return False
-            
+
     def get(self, key, default=None):
         """Retrieve a string value from attributes."""
         try:
             if not self.design: return default
-            attr = self.design.attributes.itemByName(GROUP_NAME, key)
-            if attr:
-                return attr.value
-            return default
+            return self._values().get(key, default)
         except:
             return default
 
@@ -40,22 +93,106 @@ class ZenStorage:
             attr = self.design.attributes.itemByName(GROUP_NAME, key)
             if attr:
                 attr.deleteMe()
+            cached = self._cached()
+            if cached is not None: cached.pop(key, None)
         except: pass
 
+    # --- BULK ---
+
+    def get_many(self, keys, default=None) -> dict:
+        """{ key: value } for several keys, from a single attribute scan."""
+        try:
+            if not self.design: return {k: default for k in keys}
+            values = self._values()
+            return {k: values.get(k, default) for k in keys}
+        except:
+            return {k: default for k in keys}
+
+    def set_many(self, items: dict) -> bool:
+        """Saves several string values; values equal to the stored ones are skipped."""
+        try:
+            if not self.design: return False
+            values = self._values()
+            for key, value in items.items():
+                value = str(value)
+                if values.get(key) == value: continue
+                self.design.attributes.add(GROUP_NAME, key, value)
+                values[key] = value
+            return True
+        except:
+            log_diag(f"Storage set_many failed:\n{traceback.format_exc()}")
+            invalidate_cache()
+            return False
+
+    # --- BLOBS (compressed JSON, chunked) ---
+
+    def set_blob(self, key, obj) -> bool:
+        """Stores any JSON-serializable value, compressed and split over as many attributes as needed."""
+        try:
+            if not self.design: return False
+            raw = json.dumps(obj, separators=(',', ':')).encode('utf-8')
+            text = base64.b64encode(zlib.compress(raw, 6)).decode('ascii')
+            chunks = [text[i:i + BLOB_CHUNK_SIZE] for i in range(0, len(text), BLOB_CHUNK_SIZE)] or ['']
+            old_count = self._blob_meta(key).get('chunks', 0)
+
+            items = {f"{key}#{i}": chunk for i, chunk in enumerate(chunks)}
+            # Meta last: a half-written blob still has the old meta -> CRC check fails -> treated as missing
+            items[key] = json.dumps({BLOB_MARKER: 1, 'chunks': len(chunks), 'size': len(raw), 'crc': zlib.crc32(raw)})
+            if not self.set_many(items): return False
+
+            for i in range(len(chunks), old_count):
+                self.delete(f"{key}#{i}")
+            log_file(f"Storage: blob '{key}' {len(raw)} -> {len(text)} bytes in {len(chunks)} chunk(s)")
+            return True
+        except:
+            log_diag(f"Storage set_blob failed:\n{traceback.format_exc()}")
+            return False
+
+    def get_blob(self, key, default=None):
+        """Inverse of set_blob; default if missing or damaged."""
+        try:
+            if not self.design: return default
+            meta = self._blob_meta(key)
+            if not meta: return default
+            values = self._values()
+            parts = [values.get(f"{key}#{i}") for i in range(meta['chunks'])]
+            if any(p is None for p in parts): return default
+            raw = zlib.decompress(base64.b64decode(''.join(parts)))
+            if zlib.crc32(raw) != meta.get('crc'):
+                log_diag(f"Storage: blob '{key}' failed its checksum, ignoring it")
+                return default
+            return json.loads(raw.decode('utf-8'))
+        except:
+            log_diag(f"Storage get_blob failed ('{key}'):\n{traceback.format_exc()}")
+            return default
+
+    def delete_blob(self, key):
+        count = self._blob_meta(key).get('chunks', 0)
+        self.delete(key)
+        for i in range(count):
+            self.delete(f"{key}#{i}")
+
+    def _blob_meta(self, key) -> dict:
+        try:
+            meta = json.loads(self._values().get(key) or '{}')
+            return meta if isinstance(meta, dict) and meta.get(BLOB_MARKER) else {}
+        except ValueError:
+            return {}
+
     @staticmethod
     def get_current_preset_name(design):
         """Static helper for quick access."""
         try:
-            attr = design.attributes.itemByName(GROUP_NAME, "current_preset")
-            if attr: return attr.value
-            
+            value = ZenStorage(design).get("current_preset")
+            if value is not None: return value
+
             # FALLBACK: Check for legacy parameter
             p_legacy = design.userParameters.itemByName('_zen_current_preset')
             if p_legacy:
                 val = p_legacy.comment
                 # Auto-migrate? Maybe not yet.
                 return val
-            
+
             return None
         except:
             return None
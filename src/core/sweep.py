@@ -0,0 +1,337 @@
+import csv
+import io
+import json
+import math
+import time
+import itertools
+from .expressions import extract_references, shadowed
+from .graph import ParamGraph
+from .evaluator import evaluate, evaluate_params, unit_info, Quantity, EvaluationError, SCALAR_OPS
+
+# NumPy is optional (Fusion's bundled Python doesn't ship it).
+# Without it the same sweep runs variant by variant in pure Python.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAX_VARIANTS = 1000000 # Refuse grids bigger than this
+ROUND_DIGITS = 9 # Decimals kept in results (in the param's unit)
+
+if np is not None:
+    VECTOR_OPS = {
+        'sin': np.sin, 'cos': np.cos, 'tan': np.tan,
+        'asin': np.arcsin, 'acos': np.arccos, 'atan': np.arctan,
+        'sinh': np.sinh, 'cosh': np.cosh, 'tanh': np.tanh,
+        'asinh': np.arcsinh, 'acosh': np.arccosh, 'atanh': np.arctanh,
+        'exp': np.exp, 'ln': np.log, 'log': np.log10,
+        'floor': np.floor, 'ceil': np.ceil, 'round': np.round,
+        'sign': np.sign,
+        'max': np.maximum, 'min': np.minimum,
+        'random': np.random.random,
+    }
+else:
+    VECTOR_OPS = None
+
+
+class SweepError(ValueError):
+    """Raised for sweep definitions that can't be run (unknown params, bad ranges, too many variants)."""
+    pass
+
+
+class Axis:
+    """
+    One dimension of the sweep grid.
+    columns: { param_name: [Quantity per point] } - one param for a value axis,
+    several for a preset axis (each preset sets them together).
+    """
+    def __init__(self, label, columns, labels=None):
+        self.label = label
+        self.columns = columns
+        self.labels = labels # Point names (preset axis)
+        self.size = len(next(iter(columns.values()))) if columns else 0
+
+
+def build_axis(spec, params, presets=None, exclude=()):
+    """
+    Axis from a spec:
+      {'param': 'pvc_od', 'values': [110, 125, '5 in']}  (numbers are in the param's unit)
+      {'param': 'pvc_od', 'range': {'start': 100, 'stop': 200, 'step': 0.5}}  (or 'count')
+      {'presets': ['Tzaki_valve', ...]}  (or '*' for all presets)
+    exclude: params another axis sweeps explicitly (a preset axis leaves them alone).
+    """
+    if 'presets' in spec:
+        return _preset_axis(spec['presets'], params, presets or {}, exclude)
+
+    name = spec.get('param')
+    if name not in params:
+        raise SweepError(f"Unknown parameter '{name}'")
+    unit = params[name][1]
+
+    if 'values' in spec:
+        points = [_axis_value(v, unit) for v in spec['values']]
+    elif 'range' in spec:
+        points = _range_points(spec['range'], unit)
+    else:
+        raise SweepError(f"Axis '{name}' needs 'values' or 'range'")
+
+    if not points:
+        raise SweepError(f"Axis '{name}' is empty")
+    return Axis(name, {name: points})
+
+
+def _axis_value(v, unit):
+    if isinstance(v, (int, float)):
+        factor, dims = unit_info(unit)
+        return Quantity(v * factor, dims)
+    try:
+        return evaluate(str(v), {}, unit)
+    except EvaluationError as e:
+        raise SweepError(f"Bad axis value '{v}': {e}")
+
+
+def _range_points(rng, unit):
+    start = _axis_value(rng.get('start'), unit)
+    stop = _axis_value(rng.get('stop'), unit)
+    if start.dims != stop.dims:
+        raise SweepError("Range start and stop have different units")
+
+    if rng.get('count'):
+        count = int(rng['count'])
+        if count == 1: return [start]
+        step = (stop.value - start.value) / (count - 1)
+    elif rng.get('step'):
+        step = _axis_value(rng['step'], unit).value
+        if step == 0 or (stop.value - start.value) / step < 0:
+            raise SweepError("Range step doesn't lead from start to stop")
+        count = int(math.floor((stop.value - start.value) / step + 1e-9)) + 1
+    else:
+        raise SweepError("Range needs 'step' or 'count'")
+
+    if count > MAX_VARIANTS:
+        raise SweepError(f"Range has {count} points (max {MAX_VARIANTS})")
+    return [Quantity(start.value + i * step, start.dims) for i in range(count)]
+
+
+def _preset_axis(names, params, presets, exclude=()):
+    if names == '*': names = list(presets)
+    missing = [n for n in names if n not in presets]
+    if missing:
+        raise SweepError(f"Unknown preset '{missing[0]}'")
+
+    # Params any chosen preset sets; presets that skip one keep its current expression
+    swept = []
+    for n in names:
+        for p in presets[n]:
+            if p in params and p not in swept and p not in exclude: swept.append(p)
+    if not swept:
+        raise SweepError("Presets don't set any parameter of this design")
+
+    columns = {}
+    for p in swept:
+        expr, unit = params[p]
+        columns[p] = [_axis_value(presets[n].get(p, expr), unit) for n in names]
+    return Axis('preset', columns, labels=list(names))
+
+
+def run_sweep(params, axes, outputs=None, presets=None, use_numpy=None):
+    """
+    Evaluates every dependent user param over the full grid of axes (cartesian product).
+    params: { name: (expression, unit) } - the design's user params.
+    axes: list of axis specs (see build_axis).
+    outputs: names to report (default: swept params + everything they drive).
+    use_numpy: None = when available.
+    Returns { mode, count, elapsed, columns, units, data: { name: [values in its unit] }, errors }
+    No model recompute: this only reads the expressions.
+    """
+    start = time.perf_counter()
+    explicit = set(spec.get('param') for spec in axes if 'presets' not in spec)
+    axis_list = [build_axis(spec, params, presets, explicit) for spec in axes]
+    if not axis_list:
+        raise SweepError("No axes")
+
+    count = 1
+    for axis in axis_list: count *= axis.size
+    if count > MAX_VARIANTS:
+        raise SweepError(f"{count} variants (max {MAX_VARIANTS})")
+
+    swept = []
+    for axis in axis_list:
+        for p in axis.columns:
+            if p in swept:
+                raise SweepError(f"'{p}' is swept by two axes")
+            swept.append(p)
+
+    # Everything downstream of a swept param changes per variant; the rest is evaluated once
+    graph = ParamGraph()
+    for name, (expr, unit) in params.items():
+        graph.set_param(name, extract_references(expr, params))
+    affected = set()
+    for p in swept: affected |= graph.drives(p)
+    affected -= set(swept)
+    order = [n for n in graph.topological_order() if n in affected]
+
+    # Base values of everything outside the sweep; affected params are re-evaluated per variant
+    base, base_errors = evaluate_params(params)
+    errors = {n: msg for n, msg in base_errors.items() if n not in affected}
+    for name in order:
+        if name in graph.cycles:
+            errors[name] = "Circular reference"
+            continue
+        bad = [r for r in graph.references(name) if r in errors]
+        if bad: errors[name] = f"Depends on invalid '{bad[0]}'"
+
+    if outputs is None:
+        outputs = swept + order
+    unknown = [n for n in outputs if n not in params]
+    if unknown:
+        raise SweepError(f"Unknown output '{unknown[0]}'")
+
+    if use_numpy and np is None:
+        raise SweepError("NumPy is not installed")
+    vector = np is not None and use_numpy is not False
+
+    if vector:
+        columns = _sweep_numpy(params, axis_list, order, base, errors, count)
+    else:
+        columns = _sweep_python(params, axis_list, order, base, errors, count)
+
+    data = {}
+    labeled = [a for a in axis_list if a.labels]
+    for axis in labeled:
+        data[axis.label] = _label_column(axis, axis_list)
+    for name in outputs:
+        if name in columns:
+            data[name] = columns[name]
+        elif name in base and name not in errors:
+            # Not driven by the sweep -> same value in every variant
+            try: data[name] = [_clean(base[name].to(params[name][1]))] * count
+            except EvaluationError as e: errors[name] = str(e)
+
+    names = [a.label for a in labeled] + [n for n in outputs if n in data]
+    return {
+        'mode': 'numpy' if vector else 'python',
+        'count': count,
+        'elapsed': time.perf_counter() - start,
+        'columns': names,
+        'units': {n: params[n][1] for n in names if n in params},
+        'data': data,
+        'errors': {n: msg for n, msg in errors.items() if n in outputs},
+    }
+
+
+def _grid_indices(axis_list):
+    """Point index of every axis for every variant (last axis varies fastest)."""
+    return itertools.product(*[range(a.size) for a in axis_list])
+
+
+def _sweep_numpy(params, axis_list, order, base, errors, count):
+    """Whole grid at once: every swept param is an array of length count."""
+    env = dict(base)
+    swept = []
+    idx = np.indices([a.size for a in axis_list]).reshape(len(axis_list), -1)
+    for k, axis in enumerate(axis_list):
+        for p, points in axis.columns.items():
+            dims = points[0].dims
+            if any(q.dims != dims for q in points):
+                raise SweepError(f"Values of '{p}' have different units")
+            env[p] = Quantity(np.array([q.value for q in points])[idx[k]], dims)
+            swept.append(p)
+
+    with np.errstate(all='ignore'): # Out-of-domain variants become NaN -> empty cells
+        for name in order:
+            if name in errors: continue
+            expr, unit = params[name]
+            try:
+                env[name] = evaluate(expr, env, unit, VECTOR_OPS, known=shadowed(params))
+            except EvaluationError as e:
+                errors[name] = str(e)
+            except (ArithmeticError, ValueError) as e:
+                errors[name] = f"Math error: {e}"
+
+    columns = {}
+    for name in swept + order:
+        if name not in env or name in errors: continue
+        try:
+            values = np.asarray(env[name].to(params[name][1]), dtype=float)
+        except EvaluationError as e:
+            errors[name] = str(e)
+            continue
+        values = np.round(np.broadcast_to(values, (count,)), ROUND_DIGITS)
+        values[~np.isfinite(values)] = np.nan
+        columns[name] = [v if v == v else None for v in values.tolist()] # NaN -> empty cell
+    return columns
+
+
+def _sweep_python(params, axis_list, order, base, errors, count):
+    """Variant by variant; a variant that fails for one param leaves empty cells downstream."""
+    columns = {}
+    for axis in axis_list:
+        for p in axis.columns: columns[p] = [None] * count
+    order = [n for n in order if n not in errors]
+    for name in order: columns[name] = [None] * count
+    first_error = {}
+    known = shadowed(params)
+
+    for i, point in enumerate(_grid_indices(axis_list)):
+        env = dict(base)
+        for k, axis in enumerate(axis_list):
+            for p, points in axis.columns.items():
+                env[p] = points[point[k]]
+                columns[p][i] = _clean(env[p].to(params[p][1]))
+
+        for name in order:
+            expr, unit = params[name]
+            try:
+                q = evaluate(expr, env, unit, SCALAR_OPS, known=known)
+                columns[name][i] = _clean(q.to(unit))
+                env[name] = q
+            except (EvaluationError, ArithmeticError, ValueError) as e:
+                env.pop(name, None) # Dependents fail for this variant too
+                first_error.setdefault(name, str(e))
+
+    # A param that failed in every variant is an error, not a column of blanks
+    for name in order:
+        if all(v is None for v in columns[name]):
+            errors[name] = first_error.get(name, "No value")
+            del columns[name]
+    return columns
+
+
+def _clean(v):
+    """Drops unit-conversion noise (1.5000000000000002 -> 1.5)."""
+    return round(v, ROUND_DIGITS)
+
+
+def _label_column(axis, axis_list):
+    k = axis_list.index(axis)
+    return [axis.labels[point[k]] for point in _grid_indices(axis_list)]
+
+
+# --- EXPORT ---
+
+def to_csv(result):
+    """CSV text: one row per variant, headers 'name [unit]'."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    units = result['units']
+    writer.writerow([f"{n} [{units[n]}]" if units.get(n) else n for n in result['columns']])
+    cols = [result['data'][n] for n in result['columns']]
+    for i in range(result['count']):
+        writer.writerow(['' if c[i] is None else c[i] for c in cols])
+    return out.getvalue()
+
+
+def to_json(result):
+    """JSON text: { columns, units, rows: [[...], ...] } (compact row form)."""
+    cols = [result['data'][n] for n in result['columns']]
+    rows = [[c[i] for c in cols] for i in range(result['count'])]
+    return json.dumps({'columns': result['columns'], 'units': result['units'], 'rows': rows})
+
+
+def export(result, path):
+    """Writes the result as CSV or JSON depending on the file extension."""
+    text = to_json(result) if path.lower().endswith('.json') else to_csv(result)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(text)
+    return path
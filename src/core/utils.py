@@ -2,57 +2,91 @@ import adsk.core
 import os
 import json
 import time
+import tempfile
+import threading
+from .. import config
+from . import logger
 
 # Global reference for logging
 _app = None
 _ui = None
 APP_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-def log_diag(msg: str):
-    """Writes to the Fusion 360 Text Commands palette."""
-    try:
-        app = adsk.core.Application.get()
-        ui = app.userInterface
-        cmd_palette = ui.palettes.itemById('TextCommands')
-        if cmd_palette:
-            cmd_palette.writeText(f"[ZenParams] {msg}")
-    except:
-        pass
-
-def log_file(msg: str):
-    """Writes to a log file to avoid Event Loop Freezes."""
-    try:
-        log_path = os.path.join(APP_PATH, 'zen_debug.log')
-        with open(log_path, 'a', encoding='utf-8') as f:
-            f.write(f"{time.ctime()}: {msg}\n")
-    except: pass
+def log_diag(msg: str, level: int = logger.INFO):
+    """Log record shown in the Text Commands palette (when config.LOG_TO_PALETTE) and the log file."""
+    logger.log(level, msg)
+
+def log_file(msg: str, level: int = logger.DEBUG):
+    """Log-file-only record (DEBUG unless given). Queued; written by a background thread."""
+    logger.log(level, msg)
 
 class BaseJsonManager:
-    """Base class for JSON file management."""
+    """
+    Base class for JSON file management.
+    The parsed file is kept in memory and only re-read when its mtime or size changes
+    (someone edited it by hand, another Fusion instance saved it).
+    """
     def __init__(self, root_path: str, filename: str):
         self.file_path = os.path.join(root_path, filename)
+        self._cache = None
+        self._cache_stat = None # (mtime_ns, size) the cache was read/written at
+
+    def _file_stat(self):
+        try:
+            st = os.stat(self.file_path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
 
     def _read_json(self) -> dict:
-        if os.path.exists(self.file_path):
+        """Parsed file contents (cached). Callers that change it must _write_json it back."""
+        stat = self._file_stat()
+        if self._cache is not None and stat == self._cache_stat:
+            return self._cache
+
+        data = {}
+        if stat is not None:
             try:
                 with open(self.file_path, 'r') as f:
-                    return json.load(f)
+                    data = json.load(f)
             except Exception as e:
                 log_diag(f"JSON Read Error ({self.file_path}): {e}")
-        return {}
+        self._cache = data
+        self._cache_stat = stat
+        return data
         
     def _write_json(self, data: dict):
+        """Atomic write: temp file in the same folder, then rename over the original."""
+        tmp_path = None
         try:
-            with open(self.file_path, 'w') as f:
+            folder = os.path.dirname(self.file_path)
+            fd, tmp_path = tempfile.mkstemp(prefix='.tmp_', suffix='.json', dir=folder)
+            with os.fdopen(fd, 'w') as f:
                 json.dump(data, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.file_path)
+            tmp_path = None
+            self._cache = data
+            self._cache_stat = self._file_stat()
         except Exception as e:
             log_diag(f"JSON Write Error ({self.file_path}): {e}")
+        finally:
+            if tmp_path:
+                try: os.remove(tmp_path)
+                except OSError: pass
 
 class PresetManager(BaseJsonManager):
     """Handles loading, saving, and deleting parameter presets."""
     
-    def __init__(self, root_path: str):
+    def __init__(self, root_path: str, save_delay: float = None):
         super().__init__(root_path, 'user_presets.json')
+        self.save_delay = config.PRESET_SAVE_DELAY if save_delay is None else save_delay
+        self._lock = threading.RLock()
+        self._pending = None # Saved presets not yet written to disk
+        self._timer = None
+        self._merged = {}
+        self._merged_from = None # The user-preset dict _merged was built from
     
     def get_defaults(self) -> dict:
         """Returns built-in factory presets (3D Printing Optimized)."""
@@ -70,34 +104,77 @@ class PresetManager(BaseJsonManager):
     
     def load_all(self) -> dict:
         """Loads both default and user presets."""
-        presets = self.get_defaults().copy()
-        user_presets = self._read_json()
-        presets.update(user_presets)
-        return presets
+        with self._lock:
+            user_presets = self._pending if self._pending is not None else self._read_json()
+            if user_presets is not self._merged_from:
+                # File changed (or a save happened) -> rebuild the merged view
+                self._merged = self.get_defaults()
+                self._merged.update(user_presets)
+                self._merged_from = user_presets
+            return dict(self._merged)
     
     def save_preset(self, name: str, params: dict) -> bool:
         try:
-            current = self._read_json()
-            current[name] = params
-            self._write_json(current)
+            with self._lock:
+                current = dict(self._current())
+                current[name] = params
+                self._queue_write(current)
             return True
         except: return False
 
     def delete_preset(self, name: str) -> bool:
         try:
-            current = self._read_json()
-            if name in current:
+            with self._lock:
+                current = self._current()
+                if name not in current:
+                    return False
+                current = dict(current)
                 del current[name]
-                self._write_json(current)
-                return True
-            return False
+                self._queue_write(current)
+            return True
         except: return False
 
+    def flush(self):
+        """Writes a pending save now (called on stop)."""
+        with self._lock:
+            if self._timer: self._timer.cancel()
+            self._timer = None
+            pending, self._pending = self._pending, None
+            if pending is not None:
+                self._write_json(pending)
+                self._merged_from = None
+
+    def shutdown(self, timeout: float = 2.0):
+        """Writes a pending save and waits for a save timer that already fired (add-in stop, tests)."""
+        with self._lock:
+            timer = self._timer
+        self.flush()
+        if timer is not None and timer is not threading.current_thread():
+            timer.join(timeout)
+
+    # --- Coalesced saves ---
+    # A save updates memory right away; the file is written once the saves stop
+    # coming for PRESET_SAVE_DELAY seconds (bulk imports, repeated "Save" clicks).
+
+    def _current(self) -> dict:
+        return self._pending if self._pending is not None else self._read_json()
+
+    def _queue_write(self, data: dict):
+        self._pending = data
+        if self._timer: self._timer.cancel()
+        self._timer = threading.Timer(self.save_delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
 class FitManager(BaseJsonManager):
     """Handles Smart Fit default tolerances with categorization and customization."""
     
     def __init__(self, root_path: str):
         super().__init__(root_path, 'smart_fits.json')
+        self._table = None # Merged { 'standards', 'customs' } payload
+        self._table_from = None # The file data _table was built from
+        self._by_id = {}
+        self._by_group = {}
 
     def get_defaults(self) -> list:
         """Returns structured default fits."""
@@ -119,11 +196,33 @@ class FitManager(BaseJsonManager):
     def load_fits(self) -> dict:
         """
         Loads all fits.
-        Returns a dict: { 'groups': [...], 'custom': [...] }
-        Handles migration of legacy flat files.
+        Returns a dict: { 'standards': [...], 'customs': [...] }
+        Built once; rebuilt only after a save or when the file changes on disk.
         """
-        defaults = self.get_defaults()
         user_data = self._read_json()
+        if self._table is None or user_data is not self._table_from:
+            self._build(user_data)
+        return self._table
+
+    def get_fit(self, fit_id: str):
+        """Fit dict by id (customs win over standards, like the palette), or None."""
+        self.load_fits()
+        return self._by_id.get(fit_id)
+
+    def get_tolerance(self, fit_id: str, default=None):
+        """Tolerance for a fit id, e.g. get_tolerance('bolt') -> 0.2"""
+        fit = self.get_fit(fit_id)
+        return fit['tol'] if fit else default
+
+    def get_group(self, group: str) -> list:
+        """All fits of one group ('3D Printing', 'Mechanical', 'Custom', ...)."""
+        self.load_fits()
+        return list(self._by_group.get(group, []))
+
+    def _build(self, user_data: dict):
+        """Merges defaults with the user file and indexes the result. Handles migration of legacy flat files."""
+        defaults = self.get_defaults()
+        self._table_from = user_data # Before migration replaces it
         
         # Data Structure V2: { "overrides": {id: tol}, "custom": [{id, label, group, tol}] }
         
@@ -158,8 +257,14 @@ class FitManager(BaseJsonManager):
                 new_fit['tol'] = overrides[d['id']]
             final_defaults.append(new_fit)
             
-        # 2. Return payload
-        return {
+        # 2. Index (ids and groups)
+        self._by_id = {}
+        self._by_group = {}
+        for fit in final_defaults + customs:
+            self._by_id[fit.get('id')] = fit
+            self._by_group.setdefault(fit.get('group', 'Custom'), []).append(fit)
+
+        self._table = {
             "standards": final_defaults,
             "customs": customs
         }
@@ -6,6 +6,11 @@ var GLOBAL_PRESETS = {};
 var GLOBAL_PARAMS = [];
 var FIT_DATA = { standards: [], customs: [] };
 var FIT_LOOKUP = {}; // ID -> Tol
+var TABLE_SEQ = -1; // Sequence of the last table state received (delta protocol)
+var MODEL_NEXT = null; // Offset of the next model-parameter page (null = all loaded)
+var DATA_VERSION = -1; // Python's _data_version (pushed with 'data_changed')
+var VERSION_HEARTBEAT_MS = 15000; // Fallback poll in case a push was missed
+var FIRST_ROW_REPORTED = false; // Time-to-first-row goes to Python's metrics once per load
 
 // --- GLOBAL EVENT LISTENER (PUSH FROM PYTHON) ---
 // Defined at top-level to be immediately available when Fusion calls
@@ -20,10 +25,16 @@ window.response = function (dataStr) {
     if (type === "update_table") {
       console.log(
         "[ZP] Event: update_table -> fillTable with " +
-          (content ? content.length : "null") +
+          (content ? content.count || content.length : "null") +
           " items"
       );
-      fillTable(content);
+      if (typeof data.seq === "number") TABLE_SEQ = data.seq;
+      if (data.model_next !== undefined) MODEL_NEXT = data.model_next;
+      fillTable(decodeRows(content));
+    } else if (type === "update_table_delta") {
+      applyTableDelta(content);
+    } else if (type === "data_changed") {
+      onDataChanged(data.seq, content || {});
     } else if (type === "notification") {
       var msg = data.message || content;
       var status = data.status || "info";
@@ -31,7 +42,13 @@ window.response = function (dataStr) {
     } else if (type === "init_all") {
       console.log("[ZP] Event: init_all (Push)");
       fillPresets(content.presets || {});
-      fillTable(content.params || []);
+      if (typeof content.table_seq === "number") TABLE_SEQ = content.table_seq;
+      if (content.model_params_next !== undefined)
+        MODEL_NEXT = content.model_params_next;
+      if (typeof content.data_version === "number")
+        DATA_VERSION = content.data_version;
+      fillTable(decodeRows(content.params));
+      reportFirstRow();
       updateCurrentPreset(content.current_preset);
       // 1. Fresh Structure (Backwards Compatible check)
       if (content.fits && content.fits.standards) {
@@ -211,6 +228,7 @@ function fillTable(params) {
       var tr = document.createElement("tr");
       tr.className = "group-row hidden-row"; // Default Hidden
       tr.dataset.group = gName;
+      tr.dataset.name = p.name;
 
       if (p.isUser) {
         tr.dataset.user = "true";
@@ -247,6 +265,11 @@ function fillTable(params) {
       }
       tbody.appendChild(tr);
     });
+
+    // Paging: more model parameters available on demand
+    if (gName === "Model Parameters" && MODEL_NEXT !== null) {
+      tbody.appendChild(createLoadMoreRow(gName));
+    }
   });
 
   // Attach delete handlers
@@ -261,6 +284,203 @@ function fillTable(params) {
   }
 }
 
+// --- MODEL PARAMETER PAGING ---
+function createLoadMoreRow(gName) {
+  var tr = document.createElement("tr");
+  tr.className = "group-row hidden-row load-more-row";
+  tr.dataset.group = gName;
+  tr.innerHTML =
+    '<td colspan="5" style="text-align:center; color:#888; cursor:pointer; padding:6px;">' +
+    "Load more model parameters...</td>";
+  tr.onclick = function () {
+    loadMoreModelParams();
+  };
+  return tr;
+}
+
+function loadMoreModelParams() {
+  if (MODEL_NEXT === null) return;
+  setStatus("Loading model parameters...", "info");
+  sendToFusion("get_model_params", { offset: MODEL_NEXT, limit: 200 }).then(
+    function (resp) {
+      try {
+        var page = JSON.parse(resp);
+        MODEL_NEXT = page.next_offset;
+        var known = {};
+        GLOBAL_PARAMS.forEach(function (p) {
+          known[p.name] = true;
+        });
+        var fresh = decodeRows(page.items).filter(function (p) {
+          return !known[p.name];
+        });
+        var modelCount = 0;
+        GLOBAL_PARAMS.concat(fresh).forEach(function (p) {
+          if (!p.isUser) modelCount++;
+        });
+        fillTable(GLOBAL_PARAMS.concat(fresh));
+        // Keep the group open after the re-render
+        var header = document.querySelector(
+          '.group-header[data-category="Model Parameters"]'
+        );
+        if (header) header.click();
+        setStatus(
+          "Model parameters: " + modelCount + " of " + page.total,
+          "success"
+        );
+      } catch (e) {
+        console.error("[ZP] Model page parse error:", e);
+        setStatus("Err: " + e, "error");
+      }
+    }
+  );
+}
+
+// --- COLUMNAR PAYLOAD ---
+// Python sends {format: "columnar", groups, columns: {name: [...], ...}} once we
+// advertise the capability (see payload.py). Plain row arrays pass through.
+var UNTAGGED_GROUPS = { Uncategorized: true, "Model Parameters": true };
+
+function decodeRows(x) {
+  if (!x) return [];
+  if (Array.isArray(x)) return x;
+  if (x.format !== "columnar" || !x.columns) return [];
+
+  var c = x.columns;
+  var fullComments = x.fullComments || {}; // Only rows the rebuild below wouldn't match
+  var rows = new Array(x.count);
+  for (var i = 0; i < x.count; i++) {
+    var group = x.groups[c.group[i]];
+    var comment = c.comment[i] || "";
+    var isUser = !!c.isUser[i];
+    var full = comment;
+    if (fullComments[i] !== undefined) {
+      full = fullComments[i];
+    } else if (isUser && group && !UNTAGGED_GROUPS[group]) {
+      full = "[" + group + "] " + comment;
+    }
+    rows[i] = {
+      name: c.name[i],
+      expression: c.expression[i],
+      unit: c.unit[i],
+      comment: comment,
+      group: group,
+      fullComment: full,
+      isUser: isUser,
+    };
+  }
+  return rows;
+}
+
+// --- CHANGE EVENTS ---
+// Python pushes 'data_changed' {version, reason, table_seq} whenever _data_version moves
+// (reason: sorted / edited / created / deleted / geometry). The table itself arrives
+// as update_table(_delta); we only resync if we missed an event or a table update.
+function onDataChanged(seq, info) {
+  var missed = DATA_VERSION >= 0 && seq !== DATA_VERSION + 1;
+  console.log(
+    "[ZP] Data changed: " +
+      info.reason +
+      " (v" +
+      seq +
+      (missed ? ", gap" : "") +
+      ")"
+  );
+  DATA_VERSION = seq;
+  var behind =
+    TABLE_SEQ >= 0 &&
+    typeof info.table_seq === "number" &&
+    info.table_seq > TABLE_SEQ;
+  if (missed || behind) {
+    TABLE_SEQ = -1;
+    sendToFusion("resync_table", {});
+  }
+}
+
+// --- DELTA PROTOCOL ---
+// Python sends only added/changed/removed rows with a sequence number.
+// If a delta doesn't build on the state we have (gap), ask for a full resync.
+function applyTableDelta(delta) {
+  if (!delta) return;
+  if (TABLE_SEQ < 0 || delta.base !== TABLE_SEQ) {
+    console.log(
+      "[ZP] Delta gap (have " + TABLE_SEQ + ", base " + delta.base + ") -> resync"
+    );
+    TABLE_SEQ = -1;
+    sendToFusion("resync_table", {});
+    return;
+  }
+
+  var added = decodeRows(delta.added);
+  var removedList = delta.removed || [];
+  var changedList = decodeRows(delta.changed);
+
+  var removed = {};
+  removedList.forEach(function (name) {
+    removed[name] = true;
+  });
+  var changed = {};
+  changedList.forEach(function (p) {
+    changed[p.name] = p;
+  });
+
+  var needsRender = added.length > 0 || removedList.length > 0;
+  var next = [];
+  (GLOBAL_PARAMS || []).forEach(function (p) {
+    if (removed[p.name]) return;
+    var c = changed[p.name];
+    if (c) {
+      // Group moves (and rows we can't patch in place) need a re-render
+      if (c.group !== p.group || !patchRow(c)) needsRender = true;
+      next.push(c);
+    } else {
+      next.push(p);
+    }
+  });
+  added.forEach(function (p) {
+    next.push(p);
+  });
+
+  TABLE_SEQ = delta.seq;
+  if (needsRender) {
+    fillTable(next);
+  } else {
+    GLOBAL_PARAMS = next;
+  }
+  console.log(
+    "[ZP] Delta applied (seq " + delta.seq + "): +" + added.length +
+      " ~" + changedList.length + " -" + removedList.length
+  );
+}
+
+// Updates one rendered row in place. Returns false if the row isn't on screen.
+function patchRow(p) {
+  var rows = document.querySelectorAll("#param-table tbody tr.group-row");
+  var tr = null;
+  for (var i = 0; i < rows.length; i++) {
+    if (rows[i].dataset.name === p.name) {
+      tr = rows[i];
+      break;
+    }
+  }
+  if (!tr) return false;
+
+  var cells = tr.querySelectorAll("td");
+  if (cells.length < 4) return false;
+  cells[2].textContent = p.unit || "";
+
+  if (p.isUser) {
+    var expr = tr.querySelector(".expr");
+    var cmt = tr.querySelector(".comment");
+    // Never clobber a cell the user is editing
+    if (expr && expr !== document.activeElement) expr.value = p.expression;
+    if (cmt && cmt !== document.activeElement) cmt.value = p.comment || "";
+  } else {
+    cells[1].textContent = p.expression;
+    cells[3].textContent = p.comment || "";
+  }
+  return true;
+}
+
 // --- AUTO-SIZE COLUMNS LOGIC (ADAPTIVE) ---
 function autoSizeColumns(params) {
   if (!params || params.length === 0) return;
@@ -432,14 +652,22 @@ function attachEnterHandlers(context) {
     // Auto-Sync on Change (Seamless Save) and Lock on Blur
     inp.onchange = function () {
       var changes = gatherTableData();
-      sendToFusion("batch_update", { items: changes, suppress_refresh: true });
       setStatus("Synced.", "success");
+      sendToFusion("batch_update", {
+        items: changes,
+        suppress_refresh: true,
+      }).then(reportBatchResult);
     };
 
     inp.onblur = function () {
       inp.readOnly = true;
     };
 
+    // Live preview of derived values while typing an expression
+    if (inp.classList.contains("expr")) {
+      inp.oninput = schedulePreview;
+    }
+
     // Unlock on Double Click
     inp.ondblclick = function () {
       inp.readOnly = false;
@@ -461,20 +689,101 @@ function attachEnterHandlers(context) {
         // If Editable -> Save and exit edit mode
         // (Double-Enter is handled globally)
         var changes = gatherTableData();
+        setStatus("Saved.", "success");
         sendToFusion("batch_update", {
           items: changes,
           suppress_refresh: true,
-        });
+        }).then(reportBatchResult);
 
         // Exit edit mode
         inp.readOnly = true;
         inp.blur();
-        setStatus("Saved.", "success");
       }
     };
   });
 }
 
+// --- LIVE PREVIEW ---
+// Python evaluates the edited expressions locally (no model recompute) and
+// returns the new values of every param they affect, plus errors.
+var PREVIEW_TIMER = null;
+
+function schedulePreview() {
+  clearTimeout(PREVIEW_TIMER);
+  PREVIEW_TIMER = setTimeout(runPreview, 200);
+}
+
+function runPreview() {
+  var known = {};
+  (GLOBAL_PARAMS || []).forEach(function (p) {
+    known[p.name] = p;
+  });
+
+  var changes = {};
+  var count = 0;
+  document
+    .querySelectorAll('#param-table tr[data-user="true"]')
+    .forEach(function (tr) {
+      var nameInp = tr.querySelector(".name");
+      var exprInp = tr.querySelector(".expr");
+      if (!nameInp || !exprInp) return;
+      var name = nameInp.value.trim();
+      var expr = exprInp.value.trim();
+      if (!name || !expr) return;
+      if (!known[name] || known[name].expression !== expr) {
+        changes[name] = expr;
+        count++;
+      }
+    });
+
+  if (!count) {
+    showPreview(null);
+    return;
+  }
+  sendToFusion("preview_values", { changes: changes }).then(function (resp) {
+    try {
+      showPreview(JSON.parse(resp));
+    } catch (e) {
+      console.error("[ZP] Preview parse error:", e);
+    }
+  });
+}
+
+function showPreview(res) {
+  var changed = {};
+  ((res && res.changed) || []).forEach(function (name) {
+    changed[name] = true;
+  });
+
+  document
+    .querySelectorAll('#param-table tr[data-user="true"]')
+    .forEach(function (tr) {
+      var nameInp = tr.querySelector(".name");
+      var exprInp = tr.querySelector(".expr");
+      var unitCell = tr.children[2];
+      if (!nameInp || !exprInp || !unitCell) return;
+      var name = nameInp.value.trim();
+
+      exprInp.classList.remove("expr-error");
+      exprInp.title = "";
+      var old = unitCell.querySelector(".preview-value");
+      if (old) old.remove();
+      if (!res) return;
+
+      var err = res.errors && res.errors[name];
+      var val = res.values && res.values[name];
+      if (err) {
+        exprInp.classList.add("expr-error");
+        exprInp.title = err;
+      } else if (val && changed[name]) {
+        var span = document.createElement("span");
+        span.className = "preview-value";
+        span.textContent = "→ " + val.display;
+        unitCell.appendChild(span);
+      }
+    });
+}
+
 function addNewRow() {
   var tbody = document.querySelector("#param-table tbody");
   // Remove empty message if present
@@ -557,6 +866,24 @@ function sendToFusion(action, data) {
   }
 }
 
+// batch_update is transactional: on error nothing was applied (rolled_back)
+function reportBatchResult(resp) {
+  var r;
+  try {
+    r = JSON.parse(resp);
+  } catch (e) {
+    return;
+  }
+  if (!r || !r.errors || !r.errors.length) return;
+  var first = r.errors[0];
+  var msg =
+    (r.rolled_back ? "Not applied - " : "Partly applied - ") +
+    (first.name ? first.name + ": " : "") +
+    first.msg;
+  if (r.errors.length > 1) msg += " (+" + (r.errors.length - 1) + " more)";
+  setStatus(msg, "error");
+}
+
 function setStatus(msg, type) {
   var el = document.getElementById("status-bar");
   if (el) {
@@ -572,6 +899,17 @@ function updateCurrentPreset(name) {
   }
 }
 
+// Page load -> first table rows rendered ('client.first_row' in get_metrics)
+function reportFirstRow() {
+  if (FIRST_ROW_REPORTED || !window.performance) return;
+  FIRST_ROW_REPORTED = true;
+  var p = sendToFusion("client_metric", {
+    name: "first_row",
+    ms: Math.round(performance.now()),
+  });
+  if (p && p.catch) p.catch(function () {});
+}
+
 // Request data from Python
 function requestData() {
   console.log("[ZP] Requesting initial data...");
@@ -579,7 +917,10 @@ function requestData() {
   try {
     var promise = adsk.fusionSendData(
       "send",
-      JSON.stringify({ action: "get_initial_data", data: {} })
+      JSON.stringify({
+        action: "get_initial_data",
+        data: { capabilities: { columnar: true } },
+      })
     );
 
     if (promise && promise.then) {
@@ -590,7 +931,14 @@ function requestData() {
               var parsed = JSON.parse(response);
               if (parsed.type === "init_all" && parsed.content) {
                 fillPresets(parsed.content.presets || {});
-                fillTable(parsed.content.params || []);
+                if (typeof parsed.content.table_seq === "number")
+                  TABLE_SEQ = parsed.content.table_seq;
+                if (parsed.content.model_params_next !== undefined)
+                  MODEL_NEXT = parsed.content.model_params_next;
+                if (typeof parsed.content.data_version === "number")
+                  DATA_VERSION = parsed.content.data_version;
+                fillTable(decodeRows(parsed.content.params));
+                reportFirstRow();
                 updateCurrentPreset(parsed.content.current_preset);
 
                 // Update Fits
@@ -1013,7 +1361,6 @@ document.addEventListener("DOMContentLoaded", function () {
   // WATCHDOG LOOP removed - window.response now at global scope (top of file)
 
   var lastDocId = "";
-  var lastDataVersion = -1; // Track Python's _data_version
 
   // Tab Change Detection (every 2.5s)
   setInterval(function () {
@@ -1033,7 +1380,7 @@ document.addEventListener("DOMContentLoaded", function () {
                   console.log("[ZP] Tab Change Detected! Refreshing...");
                   setStatus("Syncing...", "info");
                   requestData();
-                  lastDataVersion = -1; // Reset version on tab change
+                  DATA_VERSION = -1; // Reset version on tab change
                 }
                 lastDocId = info.id;
               }
@@ -1044,8 +1391,8 @@ document.addEventListener("DOMContentLoaded", function () {
     } catch (e) {}
   }, 2500);
 
-  // DATA VERSION POLLING (fast sync using request/response pattern)
-  // Python increments _data_version when auto-sort runs. We poll for changes.
+  // DATA VERSION HEARTBEAT (fallback only)
+  // Changes are pushed as 'data_changed' events; this slow poll catches a lost push.
   setInterval(function () {
     try {
       var promise = adsk.fusionSendData(
@@ -1058,19 +1405,20 @@ document.addEventListener("DOMContentLoaded", function () {
             try {
               var info = JSON.parse(resp);
               if (info && typeof info.version === "number") {
-                // If version changed, refresh the table!
-                if (lastDataVersion >= 0 && info.version !== lastDataVersion) {
-                  console.log("[ZP] Data Version Changed! Refreshing...");
-                  requestData();
+                // Version moved without us hearing about it -> resync the table
+                if (DATA_VERSION >= 0 && info.version !== DATA_VERSION) {
+                  console.log("[ZP] Missed data change (heartbeat). Resyncing...");
+                  TABLE_SEQ = -1;
+                  sendToFusion("resync_table", {});
                 }
-                lastDataVersion = info.version;
+                DATA_VERSION = info.version;
               }
             } catch (e) {}
           }
         });
       }
     } catch (e) {}
-  }, 1000); // Check every 1s for fast sync
+  }, VERSION_HEARTBEAT_MS);
 
   // Preset Selection
 
@@ -1155,10 +1503,10 @@ document.addEventListener("DOMContentLoaded", function () {
 
       // Apply to Fusion
       var changes = gatherTableData();
-      sendToFusion("batch_update", changes);
+      setStatus("Applied: " + selected, "success");
+      sendToFusion("batch_update", changes).then(reportBatchResult);
       sendToFusion("set_current_preset", { name: selected });
       updateCurrentPreset(selected);
-      setStatus("Applied: " + selected, "success");
     };
   }
 
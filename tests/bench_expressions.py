@@ -0,0 +1,71 @@
+"""
+Benchmark: expression reference extraction.
+Compares the legacy regex scan against the Fusion tokenizer (cold + cached)
+on tens of thousands of synthetic expressions. Runs without Fusion:
+
+    python tests/bench_expressions.py [count]
+"""
+import os
+import sys
+import re
+import time
+import random
+
+APP_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_PATH not in sys.path:
+    sys.path.insert(0, APP_PATH)
+
+from src.core import expressions
+
+_LEGACY_RE = re.compile(r'[a-zA-Z_][a-zA-Z0-9_]*')
+
+
+def make_expressions(count, user_params=500, seed=42):
+    """Mix of literals, unit math, functions and references - like real designs."""
+    rng = random.Random(seed)
+    names = [f"Param_{i}" for i in range(user_params)]
+    templates = [
+        "{v} mm",
+        "{a}",
+        "{a} + {v} mm",
+        "{a} * 2 - {b} / 3",
+        "sqrt({a} ^ 2 + {b} ^ 2)",
+        "max({a}; {b}) + {v} in",
+        "{a} * sin({v} deg)",
+        "({a} + {b}) / 2 + {c}",
+        "{v}.5 mm + 1e-3 m",
+    ]
+    out = []
+    for _ in range(count):
+        t = rng.choice(templates)
+        out.append(t.format(a=rng.choice(names), b=rng.choice(names), c=rng.choice(names),
+                            v=rng.randint(1, 300)).replace(';', ','))
+    return out, set(names)
+
+
+def _time(fn, exprs, user_names):
+    start = time.perf_counter()
+    for e in exprs:
+        fn(e) & user_names
+    return time.perf_counter() - start
+
+
+def run(count=50000):
+    exprs, user_names = make_expressions(count)
+    expressions.clear_reference_cache()
+
+    legacy = _time(lambda e: set(_LEGACY_RE.findall(e)), exprs, user_names)
+    cold = _time(expressions.extract_references, exprs, user_names)
+    warm = _time(expressions.extract_references, exprs, user_names)
+    info = expressions.reference_cache_info()
+
+    print(f"Expressions:          {count} ({len(set(exprs))} distinct)")
+    print(f"Legacy regex scan:    {legacy * 1000:8.1f} ms")
+    print(f"Tokenizer (1st scan): {cold * 1000:8.1f} ms")
+    print(f"Tokenizer (refresh):  {warm * 1000:8.1f} ms  (cached)")
+    print(f"Cache: hits={info.hits} misses={info.misses} size={info.currsize}/{info.maxsize}")
+    return {'legacy': legacy, 'cold': cold, 'warm': warm}
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
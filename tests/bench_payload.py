@@ -0,0 +1,71 @@
+"""
+Benchmark: parameter table payloads.
+Compares the legacy row format against the columnar format (encode time,
+JSON size, decode time) for a large synthetic table. Runs without Fusion:
+
+    python tests/bench_payload.py [rows]
+"""
+import os
+import sys
+import json
+import time
+import random
+
+APP_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_PATH not in sys.path:
+    sys.path.insert(0, APP_PATH)
+
+from src.core import payload
+
+
+def make_rows(count, seed=42):
+    """User params spread over a few tagged groups, plus untagged model params."""
+    rng = random.Random(seed)
+    groups = ["Enclosure", "Lid", "Fasteners", "Tolerances", "Uncategorized"]
+    rows = []
+    for i in range(count):
+        is_user = i % 4 != 0
+        if is_user:
+            group = rng.choice(groups)
+            comment = rng.choice(["", "Wall thickness", "Auto: Body1", "Clearance for M3"])
+            full = comment if group == "Uncategorized" else f"[{group}] {comment}".rstrip()
+            name = f"Param_{i}"
+        else:
+            group, comment, full, name = "Model Parameters", "", "", f"d{i}"
+        rows.append({
+            'name': name, 'expression': f"{rng.randint(1, 300)}",
+            'unit': 'mm', 'comment': comment, 'group': group,
+            'fullComment': full, 'isUser': is_user
+        })
+    return rows
+
+
+def _time(fn, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run(count=5000):
+    rows = make_rows(count)
+
+    row_t, row_json = _time(lambda: json.dumps(rows))
+    col_t, col_json = _time(lambda: json.dumps(payload.encode_columnar(rows)))
+    dec_t, decoded = _time(lambda: payload.decode_columnar(json.loads(col_json)))
+
+    assert [r['name'] for r in decoded] == [r['name'] for r in rows]
+
+    print(f"Rows:                 {count}")
+    print(f"Row format:           {len(row_json) / 1024:8.1f} KB  {row_t * 1000:6.1f} ms (encode)")
+    print(f"Columnar format:      {len(col_json) / 1024:8.1f} KB  {col_t * 1000:6.1f} ms (encode)")
+    print(f"Columnar decode:      {dec_t * 1000:6.1f} ms")
+    print(f"Size ratio:           {len(col_json) / len(row_json):.2f}")
+    return {'row_bytes': len(row_json), 'col_bytes': len(col_json), 'row': row_t, 'col': col_t}
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,176 @@
+"""
+Benchmark runner: times the hot paths on synthetic designs, without Fusion
+(uses the adsk stand-in in tests/stubs), and fails on regressions.
+
+    python tests/bench_runner.py                      # small + medium, compare to the baseline
+    python tests/bench_runner.py --size medium
+    python tests/bench_runner.py --update-baseline    # after an intended change
+
+Benchmarks (best of --repeat runs, milliseconds):
+    crawler.refresh_map     full reverse map + dependency index
+    crawler.categorize_all  every user param's category in one pass
+    crawler.restore         crawler from a saved index (export_state) on an unchanged design
+    handler.auto_sort       _auto_sort_params(force_map_refresh=True) on an unsorted design
+    handler.param_list      _get_param_list with a cold snapshot
+    payload.rows_json       json.dumps of the init payload (row format)
+    payload.columnar_json   json.dumps of the init payload (columnar format)
+
+Every timed run is paired with a short fixed pure-Python calibration loop run
+right before it; the comparison with tests/bench_baseline.json uses the ratio
+run / calibration, so a slower (or throttled) machine doesn't read as a regression.
+Exit code 1 when any benchmark is more than --tolerance slower than its baseline.
+"""
+import gc
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+TESTS_PATH = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.dirname(TESTS_PATH)
+STUBS_PATH = os.path.join(TESTS_PATH, 'stubs')
+BASELINE_PATH = os.path.join(TESTS_PATH, 'bench_baseline.json')
+
+# Stand-in adsk first (the generator builds stand-in designs)
+for path in (STUBS_PATH, APP_PATH, TESTS_PATH):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from src import config
+config.LOG_FILE = '' # Keep benchmark runs out of zen_debug.log
+config.DEBUG_MODE = False
+
+from src.core import crawler, handler
+from synthetic import SIZES, make_design
+
+
+def calibrate():
+    """Fixed dict/str workload (~10 ms); its time stands for 'how fast is this machine right now'."""
+    start = time.perf_counter()
+    d = {}
+    for i in range(20000):
+        d[f"k{i % 500}"] = d.get(f"k{i % 500}", 0) + i
+    return (time.perf_counter() - start) * 1000
+
+
+def _best(fn, repeat, setup=None):
+    """(best ms, best ms / calibration ms) over repeat runs."""
+    best = ratio = None
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        gc.collect()
+        gc.disable() # Like timeit: a collection of the setup's garbage isn't the benchmark's cost
+        try:
+            cal = calibrate()
+            start = time.perf_counter()
+            fn(arg) if setup else fn()
+            elapsed = (time.perf_counter() - start) * 1000
+        finally:
+            gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+        ratio = elapsed / cal if ratio is None else min(ratio, elapsed / cal)
+    return best, ratio
+
+
+def run_size(size, repeat):
+    spec = SIZES[size]
+    root = tempfile.mkdtemp()
+    results = {}
+
+    def fresh_handler():
+        make_design(**spec)
+        hdlr = handler.ZenPaletteEventHandler('ZP_BENCH', root)
+        hdlr.scheduler.stop()
+        return hdlr
+
+    # Crawler (refresh_map rebuilds everything from scratch)
+    results['crawler.refresh_map'] = _best(lambda c: c.refresh_map(), repeat,
+                                           lambda: crawler.ZenDependencyCrawler(make_design(**spec)))
+
+    results['crawler.categorize_all'] = _best(lambda c: c.categorize_all(), repeat,
+                                              lambda: crawler.ZenDependencyCrawler(make_design(**spec)))
+
+    def saved_state():
+        design = make_design(**spec)
+        state = json.loads(json.dumps(crawler.ZenDependencyCrawler(design).export_state())) # As read back from storage
+        return design, state
+    results['crawler.restore'] = _best(lambda ds: crawler.ZenDependencyCrawler(ds[0], state=ds[1]), repeat, saved_state)
+
+    # Auto-sort (every param gets its first comment)
+    results['handler.auto_sort'] = _best(lambda h: h._auto_sort_params(force_map_refresh=True), repeat, fresh_handler)
+
+    # Param list (cold snapshot)
+    hdlr = fresh_handler()
+    def param_list(_):
+        hdlr._snapshot.invalidate()
+        hdlr._get_param_list()
+    results['handler.param_list'] = _best(param_list, repeat, lambda: None)
+
+    # Payload serialization
+    for columnar, key in ((False, 'payload.rows_json'), (True, 'payload.columnar_json')):
+        hdlr._columnar = columnar
+        payload = hdlr._gather_payload_dict()
+        results[key] = _best(lambda: json.dumps({'content': payload, 'type': 'init_all'}), repeat)
+    hdlr.stop()
+    return results
+
+
+def compare(current, baseline, tolerance):
+    """Returns [(size, name, ratio, allowed ratio)] for every regression."""
+    failures = []
+    for size, benches in current.items():
+        for name, (ms, ratio) in benches.items():
+            base = baseline.get('ratios', {}).get(size, {}).get(name)
+            if base is None: continue
+            allowed = base * (1 + tolerance)
+            if ratio > allowed and ms > 1.0: # Ignore sub-millisecond noise
+                failures.append((size, name, ratio, allowed))
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', choices=sorted(SIZES), action='append', help="Design size (repeatable; default: small + medium)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--tolerance', type=float, default=0.5, help="Allowed slowdown vs. baseline (0.5 = +50%%)")
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args(argv)
+    sizes = args.size or ['small', 'medium']
+
+    current = {}
+    for size in sizes:
+        current[size] = run_size(size, args.repeat)
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+
+    print("ms = best run; x = best run / calibration run (what is compared)")
+    for size in sizes:
+        print(f"\n{size}: {SIZES[size]}")
+        for name, (ms, ratio) in current[size].items():
+            base = baseline.get('ratios', {}).get(size, {}).get(name)
+            ref = f"baseline x{base:7.3f}" if base is not None else "no baseline"
+            print(f"  {name:24s} {ms:8.2f} ms  x{ratio:7.3f}   ({ref})")
+
+    if args.update_baseline:
+        for key, idx in (('results', 0), ('ratios', 1)):
+            table = baseline.setdefault(key, {})
+            for size, benches in current.items():
+                table[size] = {name: round(v[idx], 4) for name, v in benches.items()}
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(baseline, f, indent=4)
+        print(f"\nBaseline written: {BASELINE_PATH}")
+        return 0
+
+    failures = compare(current, baseline, args.tolerance)
+    for size, name, ratio, allowed in failures:
+        print(f"REGRESSION {size} {name}: x{ratio:.3f} > x{allowed:.3f} allowed")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
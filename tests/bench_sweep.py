@@ -0,0 +1,53 @@
+"""
+Benchmark: design-variant sweep.
+pvc_od (200 values) x wall thickness (10 values) over a pipe-fitting style
+parameter set, evaluated with NumPy (if installed) and in pure Python.
+Runs without Fusion:
+
+    python tests/bench_sweep.py [od_points] [wall_points]
+"""
+import os
+import sys
+
+APP_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_PATH not in sys.path:
+    sys.path.insert(0, APP_PATH)
+
+from src.core import sweep
+
+PARAMS = {
+    'pvc_od': ('126.2', 'mm'),
+    'pvc_wall_thickness': ('4', 'mm'),
+    'Tol_Snug': ('0.15', 'mm'),
+    'Tol_Slide': ('0.25', 'mm'),
+    'WallThick': ('1.2', 'mm'),
+    'pvc_id': ('pvc_od - 2 * pvc_wall_thickness', 'mm'),
+    'lid_id': ('pvc_od + 2 * Tol_Snug', 'mm'),
+    'lid_od': ('lid_id + 2 * WallThick', 'mm'),
+    'lid_h': ('max(pvc_wall_thickness * 3; 10 mm)', 'mm'),
+    'flap_od': ('pvc_id - 2 * Tol_Slide', 'mm'),
+    'flap_area': ('PI * (flap_od / 2) ^ 2', 'mm^2'),
+    'ring_h': ('ceil(lid_h / 2)', 'mm'),
+    'chamfer': ('pvc_wall_thickness * tan(30 deg)', 'mm'),
+}
+
+
+def run(od_points=200, wall_points=10):
+    axes = [
+        {'param': 'pvc_od', 'range': {'start': 100, 'stop': 200, 'count': od_points}},
+        {'param': 'pvc_wall_thickness', 'range': {'start': 1.5, 'stop': 6, 'count': wall_points}},
+    ]
+    results = {}
+    modes = [False] + ([True] if sweep.np is not None else [])
+    for use_numpy in modes:
+        r = sweep.run_sweep(PARAMS, axes, use_numpy=use_numpy)
+        results[r['mode']] = r
+        print(f"{r['mode']:<8} {r['count']:>8} variants  {r['elapsed'] * 1000:8.1f} ms  ({len(r['columns'])} columns)")
+    if sweep.np is None:
+        print("numpy    not installed (pure-Python fallback only)")
+    return results
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*args)
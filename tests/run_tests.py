@@ -1,4 +1,4 @@
-import adsk.core, adsk.fusion, traceback
+import traceback
 import unittest
 import os
 import sys
@@ -6,20 +6,35 @@ import shutil
 import tempfile
 import json
 import math
+import io
+import contextlib
 
 # --- SETUP PATHS ---
 # --- SETUP PATHS ---
 APP_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # Go up one level to root
-TEST_DIR = os.path.join(APP_PATH, 'tests', 'output')
+TESTS_PATH = os.path.join(APP_PATH, 'tests')
+TEST_DIR = os.path.join(TESTS_PATH, 'output')
 
-if APP_PATH not in sys.path:
-    sys.path.insert(0, APP_PATH)
+for path in (APP_PATH, TESTS_PATH): # Root for src, tests for the benchmark modules
+    if path not in sys.path:
+        sys.path.insert(0, path)
 
-# Import ZenParams Tests
+# Inside Fusion the real adsk; anywhere else (CI, Linux) the stand-in in tests/stubs
 try:
-    from src.core import utils, crawler, handler
+    import adsk.core, adsk.fusion
 except ImportError:
-    pass
+    sys.path.insert(0, os.path.join(TESTS_PATH, 'stubs'))
+    import adsk.core, adsk.fusion
+STUBBED = hasattr(adsk.fusion.Design, 'add_timeline') # Stand-in only builder
+
+# Import ZenParams Tests (a broken import fails the run)
+from src import config
+from src.core import logger, metrics, utils, crawler, handler, expressions, graph, scheduler, payload, snapshot, evaluator, sweep, storage
+config.LOG_FILE = '' # Keep test runs out of zen_debug.log (as bench_runner does)
+logger.shutdown() # Next log call builds the logger from the setting above
+
+# Tests that build real geometry (sketch curves, extrudes, units) only run inside Fusion
+fusion_only = unittest.skipIf(STUBBED, "needs Fusion geometry (stand-in adsk)")
 
 # --- CONTEXT MANAGERS ---
 
@@ -28,12 +43,20 @@ class TestContext:
     Creates a temporary Fusion Document for "Clean Room" testing.
     Ensures teardown even if tests fail.
     """
+    __test__ = False # Not a test case (keeps pytest from collecting it)
+
     def __init__(self):
         self.app = adsk.core.Application.get()
         self.doc = None
         self.design = None
 
     def __enter__(self):
+        if STUBBED:
+            # Stand-in: a blank design made active (no documents / geometry API)
+            self.design = adsk.fusion.Design('ZenParams Test')
+            self.app.activeProduct = self.design
+            return self
+
         # Create new document
         self.doc = self.app.documents.add(adsk.core.DocumentTypes.FusionDesignDocumentType)
         self.design = adsk.fusion.Design.cast(self.app.activeProduct)
@@ -47,6 +70,8 @@ class TestContext:
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.doc:
             self.doc.close(False) # Close without saving
+        elif STUBBED:
+            self.app.activeProduct = None
 
 
 # --- TEST CLASSES ---
@@ -62,12 +87,18 @@ class TestPureLogic(unittest.TestCase):
         self.test_dir = tempfile.mkdtemp()
     
     def tearDown(self):
+        logger.flush() # Nothing queued for the writer thread outlives the test
         shutil.rmtree(self.test_dir)
 
     def test_preset_manager_io(self):
         """Verify Presets can be saved and loaded."""
         mgr = utils.PresetManager(self.test_dir)
-        
+        try:
+            self._check_preset_manager(mgr)
+        finally:
+            mgr.shutdown() # No save timer left running into tearDown
+
+    def _check_preset_manager(self, mgr):
         # 1. Test Default Load
         defaults = mgr.get_defaults()
         self.assertIn("3DP Tolerances (Global)", defaults)
@@ -86,6 +117,27 @@ class TestPureLogic(unittest.TestCase):
         reloaded = mgr.load_all()
         self.assertNotIn("TestPreset", reloaded)
 
+        # 5. Coalesced saves reach the disk on flush, and a fresh manager sees them
+        mgr.save_preset("A", {"p": "1 mm"})
+        mgr.save_preset("B", {"p": "2 mm"})
+        mgr.flush()
+        other = utils.PresetManager(self.test_dir)
+        self.assertIn("A", other.load_all())
+        self.assertIn("B", other.load_all())
+
+        # 6. A hand edit of the file is picked up (mtime/size changed)
+        with open(mgr.file_path, 'w') as f:
+            json.dump({"Hand": {"p": "3 mm"}}, f)
+        self.assertIn("Hand", mgr.load_all())
+        self.assertNotIn("A", mgr.load_all())
+
+        # 7. shutdown writes a pending save and leaves no timer thread behind
+        mgr.save_preset("C", {"p": "4 mm"})
+        timer = mgr._timer
+        mgr.shutdown()
+        self.assertFalse(timer.is_alive())
+        self.assertIn("C", utils.PresetManager(self.test_dir).load_all())
+
     def test_fit_manager_migration(self):
         """Verify FitManager correctly migrates legacy flat files."""
         mgr = utils.FitManager(self.test_dir)
@@ -108,12 +160,304 @@ class TestPureLogic(unittest.TestCase):
         self.assertIsNotNone(custom_fit)
         self.assertAlmostEqual(custom_fit['tol'], 0.15)
 
+        # 4. Indexed lookups, and a save invalidates the cached table
+        self.assertAlmostEqual(mgr.get_tolerance('bolt'), 0.5)
+        self.assertIsNone(mgr.get_fit('nope'))
+        self.assertEqual(len(mgr.get_group('Mechanical')), 3)
+        mgr.save_fits({"overrides": {"bolt": 0.3}, "custom": []})
+        self.assertAlmostEqual(mgr.get_tolerance('bolt'), 0.3)
+        self.assertEqual(mgr.get_group('Custom'), [])
+
+    def test_logger_batches_and_rate_limits(self):
+        """Verify records reach the file via the writer thread, below-level ones don't, and repeats are capped."""
+        path = os.path.join(self.test_dir, 'test.log')
+        log = logger.ZenLogger(path=path, file_level=logger.INFO, rate_limit=3, rate_window=60)
+        try:
+            log.log(logger.DEBUG, "hidden")
+            for i in range(10):
+                log.log(logger.INFO, "same")
+            log.log(logger.ERROR, "boom")
+            log.flush()
+            with open(path) as f:
+                text = f.read()
+            self.assertNotIn("hidden", text)
+            self.assertEqual(text.count("[INFO] same"), 3)
+            self.assertIn("[ERROR] boom", text)
+            self.assertEqual(log.stats()['suppressed'], 7)
+        finally:
+            log.stop()
+
+    def test_metrics_percentiles(self):
+        """Verify counts, nearest-rank percentiles and payload sizes."""
+        m = metrics.Metrics()
+        for ms in range(1, 101):
+            m.record("op", ms / 1000.0, size=ms)
+        with m.timed("other") as t:
+            t.size = 10
+        s = m.summary()
+        self.assertEqual(s["op"]["count"], 100)
+        self.assertAlmostEqual(s["op"]["p50_ms"], 50)
+        self.assertAlmostEqual(s["op"]["p95_ms"], 95)
+        self.assertAlmostEqual(s["op"]["max_ms"], 100)
+        self.assertEqual(s["op"]["bytes_max"], 100)
+        self.assertEqual(s["other"]["bytes_last"], 10)
+
+    def test_expression_references(self):
+        """Verify the tokenizer skips units, functions and literals."""
+        refs = expressions.extract_references("sqrt(Base ^ 2 + Wall_2 * 2 mm) + 1e-3 in + max(Lid, 3 deg) * PI")
+        self.assertEqual(refs, frozenset(["Base", "Wall_2", "Lid"]))
+        self.assertEqual(expressions.extract_references("10 mm"), frozenset())
+
+        kinds = [k for k, _ in expressions.tokenize("sin(Angle) * 2 mm")]
+        self.assertEqual(kinds, ['func', 'op', 'name', 'op', 'op', 'number', 'unit'])
+        with self.assertRaises(expressions.ExpressionSyntaxError):
+            expressions.tokenize("Base $ 2")
+
+        # Unit / constant spellings are references when a parameter has that name
+        self.assertEqual(expressions.extract_references("W/2"), frozenset())
+        self.assertEqual(expressions.extract_references("W/2", {"W", "Base"}), frozenset(["W"]))
+        self.assertEqual(expressions.extract_references("N*3 mm", {"N"}), frozenset(["N"]))
+        values, errors = evaluator.evaluate_params({"W": ("4 mm", "mm"), "Half": ("W / 2", "mm")})
+        self.assertEqual(errors, {})
+        self.assertAlmostEqual(values["Half"].to("mm"), 2.0)
+
+    def test_expression_benchmark_runs(self):
+        """Verify bench_expressions still runs against the current expressions API (small count)."""
+        import bench_expressions
+        with contextlib.redirect_stdout(io.StringIO()):
+            times = bench_expressions.run(500)
+        self.assertEqual(set(times), {'legacy', 'cold', 'warm'})
+        self.assertGreater(expressions.reference_cache_info().hits, 0)
+
+    def test_param_graph_closures(self):
+        """Verify transitive 'drives' / owners and topological order."""
+        g = graph.ParamGraph()
+        g.set_param("Base", [])
+        g.set_param("Wall", ["Base"])
+        g.set_param("d12", ["Wall"], owner_token="sketch_1")
+        g.set_param("d13", ["d12", "Base"], owner_token="extrude_1")
+
+        self.assertEqual(g.drives("Base"), frozenset(["Wall", "d12", "d13"]))
+        self.assertEqual(g.owners("Base"), frozenset(["sketch_1", "extrude_1"]))
+        self.assertEqual(g.dependents("Base"), frozenset(["Wall", "d13"]))
+        self.assertFalse(g.can_delete("Wall"))
+
+        order = g.topological_order()
+        self.assertLess(order.index("Base"), order.index("Wall"))
+        self.assertLess(order.index("d12"), order.index("d13"))
+
+        # Mutation invalidates cached closures
+        g.set_param("d12", [], owner_token="sketch_1")
+        self.assertEqual(g.owners("Wall"), frozenset())
+        self.assertTrue(g.can_delete("Wall"))
+
+    def test_prune_body_paths(self):
+        """Verify component paths covered by one of their bodies are dropped, and the result is stable."""
+        paths = {"Comp", "Comp/Body", "Comp/Body2", "Other", "Oth/x"}
+        self.assertEqual(crawler._prune_paths(paths), ("Comp/Body", "Comp/Body2", "Oth/x", "Other"))
+        self.assertEqual(crawler._prune_paths({"Solo"}), ("Solo",))
+
+    def test_refresh_scheduler_coalesces(self):
+        """Verify a burst of requests collapses into one refresh at the highest level."""
+        runs = []
+        sched = scheduler.RefreshScheduler(runs.append, delay=5.0, event_id='zenparams_test_event')
+        sched.start()
+        try:
+            for level in [scheduler.LEVEL_SORT, scheduler.LEVEL_SORT, scheduler.LEVEL_MAP, scheduler.LEVEL_SORT]:
+                sched.request(level)
+            sched.flush() # Don't wait for the settle timer
+        finally:
+            sched.stop()
+
+        self.assertEqual(runs, [scheduler.LEVEL_MAP])
+        self.assertEqual(sched.stats()['skipped'], 3)
+        self.assertEqual(sched.stats()['escalated'], 1)
+
+    def test_table_delta_diff(self):
+        """Verify the update_table_delta diff (added / changed / removed + sequence)."""
+        hdlr = handler.ZenPaletteEventHandler("TEST_PALETTE", self.test_dir)
+        try:
+            row = lambda n, e: {'name': n, 'expression': e, 'unit': 'mm', 'comment': '', 'group': 'G', 'fullComment': '', 'isUser': True}
+            seq = hdlr._remember_table([row("A", "1"), row("B", "2")])
+
+            delta = hdlr._diff_table([row("A", "5"), row("C", "3")])
+            self.assertEqual(delta['base'], seq)
+            self.assertEqual(delta['seq'], seq + 1)
+            self.assertEqual([r['name'] for r in delta['added']], ["C"])
+            self.assertEqual([r['name'] for r in delta['changed']], ["A"])
+            self.assertEqual(delta['removed'], ["B"])
+
+            # No changes -> sequence does not move
+            self.assertEqual(hdlr._diff_table([row("A", "5"), row("C", "3")])['seq'], seq + 1)
+        finally:
+            hdlr.stop()
+
+    def test_auto_sort_plan_and_streamed_apply(self):
+        """Verify the plan phase writes nothing and the apply phase writes in SORT_STREAM_BATCH batches."""
+        class FakeParam:
+            def __init__(self, name, comment=''):
+                self.name = name
+                self._comment = comment
+                self.writes = 0
+            @property
+            def comment(self): return self._comment
+            @comment.setter
+            def comment(self, value):
+                self.writes += 1
+                self._comment = value
+
+        class FakeCrawler:
+            calls = 0
+            def categorize_all(self):
+                FakeCrawler.calls += 1
+                cats = {f"P{i}": {'bodies': ["Comp/Lid"] if i % 2 else []} for i in range(5)}
+                cats["Legacy"] = {'bodies': ["Comp/Lid", "Comp/Base"]}
+                return cats
+
+        class FakeDesign:
+            userParameters = [FakeParam(f"P{i}", "note" if i == 0 else "") for i in range(5)] + [
+                FakeParam("Sorted", "[Box] kept"), FakeParam("Legacy", "[Shared (2)] old")]
+
+        design = FakeDesign()
+        hdlr = handler.ZenPaletteEventHandler("TEST_PALETTE", self.test_dir)
+        sends = []
+        hdlr._send_all_params = lambda flush=True, full=False: sends.append(sum(p.writes for p in design.userParameters))
+        saved_batch = config.SORT_STREAM_BATCH
+        config.SORT_STREAM_BATCH = 2
+        try:
+            plan = hdlr._plan_auto_sort(design, FakeCrawler())
+            self.assertEqual(sum(p.writes for p in design.userParameters), 0) # Planning writes nothing
+            self.assertEqual(FakeCrawler.calls, 1) # One categorize_all pass for the whole plan
+            comments = {c['name']: c['comment'] for c in plan}
+            self.assertEqual(comments, {
+                'P0': "[Unused] note", 'P1': "[Comp/Lid] ", 'P2': "[Unused] ", 'P3': "[Comp/Lid] ", 'P4': "[Unused] ",
+                'Legacy': "[Shared] old (Used by: Comp/Lid, Comp/Base)", # Old tag cleaned, then re-sorted
+                # "Sorted" is already tagged: nothing to write
+            })
+
+            result = hdlr._apply_comment_changes(plan)
+            self.assertEqual(result['count'], 6)
+            self.assertEqual(result['errors'], [])
+            self.assertEqual(sends, [2, 4]) # A delta after each full batch but the last
+            self.assertEqual({p.name: p.writes for p in design.userParameters if p.writes}, {n: 1 for n in comments})
+        finally:
+            config.SORT_STREAM_BATCH = saved_batch
+            hdlr.stop()
+
+    def test_batch_order(self):
+        """Verify batch items are ordered by their references and cycles are reported."""
+        order, cycles = graph.batch_order({'Top': {'Mid'}, 'Mid': {'Wall'}, 'Wall': set()})
+        self.assertEqual(order, ['Wall', 'Mid', 'Top'])
+        self.assertEqual(cycles, set())
+
+        # Cycle through a param outside the batch (existing Lid = Wall * 3)
+        base = graph.ParamGraph()
+        base.set_param('Lid', {'Wall'})
+        order, cycles = graph.batch_order({'Wall': {'Lid'}}, base)
+        self.assertIn('Wall', cycles)
+
+    def test_expression_evaluator(self):
+        """Verify local evaluation: units, bare numbers, functions, dependency order, errors."""
+        values, errors = evaluator.evaluate_params({
+            'Wall': ('2', 'mm'),
+            'Lid': ('Wall * 3 + 1 cm', 'mm'),
+            'Diag': ('sqrt(Wall^2 + Wall^2)', 'mm'),
+            'Tilt': ('atan(1)', 'deg'),
+            'Bad': ('Wall + 30 deg', 'mm'),
+            'Loop': ('Loop2', 'mm'), 'Loop2': ('Loop', 'mm'),
+        }, overrides={'Wall': '4 mm'})
+
+        self.assertAlmostEqual(values['Lid'].to('mm'), 22.0)
+        self.assertAlmostEqual(values['Diag'].to('mm'), math.sqrt(32))
+        self.assertAlmostEqual(values['Tilt'].to('deg'), 45.0)
+        self.assertIn('Bad', errors)
+        self.assertEqual(errors['Loop'], "Circular reference")
+
+    def test_evaluator_rounding(self):
+        """Verify floor/ceil/round act on displayed mm / deg values without float noise."""
+        values, errors = evaluator.evaluate_params({
+            'a': ('12 mm', 'mm'), 'ang': ('39 deg', 'deg'),
+            'F': ('floor(9 mm / 3)', 'mm'), 'C': ('ceil(a / 3)', 'mm'),
+            'Fd': ('floor(ang / 3)', 'deg'), 'Cd': ('ceil(33 deg / 3)', 'deg'),
+            'R': ('round(a / 5)', 'mm'), 'Rd': ('round(ang / 4)', 'deg'),
+            'Up': ('ceil(10.2 mm)', 'mm'), 'Down': ('floor(10.8 mm)', 'mm'),
+        })
+        self.assertEqual(errors, {})
+        self.assertAlmostEqual(values['F'].to('mm'), 3.0)
+        self.assertAlmostEqual(values['C'].to('mm'), 4.0)
+        self.assertAlmostEqual(values['Fd'].to('deg'), 13.0)
+        self.assertAlmostEqual(values['Cd'].to('deg'), 11.0)
+        self.assertAlmostEqual(values['R'].to('mm'), 2.0)
+        self.assertAlmostEqual(values['Rd'].to('deg'), 10.0)
+        self.assertAlmostEqual(values['Up'].to('mm'), 11.0)
+        self.assertAlmostEqual(values['Down'].to('mm'), 10.0)
+
+    def test_sweep_grid(self):
+        """Verify a 2-axis sweep evaluates dependents for every variant (pure-Python path)."""
+        params = {
+            'od': ('100', 'mm'), 'wall': ('2', 'mm'), 'tol': ('0.2', 'mm'),
+            'id': ('od - 2 * wall', 'mm'), 'lid': ('od + 2 * tol', 'mm'),
+        }
+        r = sweep.run_sweep(params, [
+            {'param': 'od', 'values': [100, '12 cm']},
+            {'param': 'wall', 'range': {'start': 1, 'stop': 3, 'step': 1}},
+        ], use_numpy=False)
+
+        self.assertEqual(r['count'], 6)
+        self.assertEqual(r['data']['od'], [100.0] * 3 + [120.0] * 3)
+        self.assertEqual(r['data']['id'], [98.0, 96.0, 94.0, 118.0, 116.0, 114.0])
+        self.assertEqual(r['data']['lid'], [100.4] * 3 + [120.4] * 3)
+        self.assertTrue(sweep.to_csv(r).startswith("od [mm],wall [mm]"))
+
+    def test_sweep_export_path(self):
+        """Verify sweep exports stay inside the export folder."""
+        hdlr = handler.ZenPaletteEventHandler("TEST_PALETTE", self.test_dir)
+        try:
+            export_dir = os.path.realpath(os.path.join(self.test_dir, config.SWEEP_EXPORT_DIR))
+            self.assertEqual(hdlr._sweep_export_path("run1.csv"), os.path.join(export_dir, "run1.csv"))
+            self.assertEqual(hdlr._sweep_export_path("lids/run2.json"), os.path.join(export_dir, "lids", "run2.json"))
+            self.assertTrue(os.path.isdir(os.path.join(export_dir, "lids")))
+            for bad in ["/tmp/x.csv", "../x.csv", "a/../../x.csv", "..\\x.csv", "C:x.csv", "\\\\srv\\x.csv", "x.py", None]:
+                with self.assertRaises(sweep.SweepError, msg=bad):
+                    hdlr._sweep_export_path(bad)
+        finally:
+            hdlr.stop()
+
+    def test_columnar_payload_roundtrip(self):
+        """Verify columnar table encoding decodes back to the row format."""
+        rows = [
+            {'name': 'Wall', 'expression': '2', 'unit': 'mm', 'comment': 'Thick', 'group': 'Box', 'fullComment': '[Box] Thick', 'isUser': True},
+            {'name': 'Gap', 'expression': '0.2', 'unit': 'mm', 'comment': '', 'group': 'Uncategorized', 'fullComment': '', 'isUser': True},
+            {'name': 'd1', 'expression': 'Wall * 2', 'unit': 'mm', 'comment': '', 'group': 'Model Parameters', 'fullComment': '', 'isUser': False},
+        ]
+        enc = payload.encode_columnar(rows)
+        self.assertEqual(enc['count'], 3)
+        self.assertEqual(enc['groups'], ['Box', 'Uncategorized', 'Model Parameters'])
+        self.assertEqual(payload.decode_columnar(json.loads(json.dumps(enc))), rows)
+
+        # Old palettes (no capability) keep the row format
+        self.assertIs(payload.encode_rows(rows, False), rows)
+
+        # Comments as users (and Fusion) write them come back unchanged; only those send fullComment
+        class P:
+            def __init__(self, comment): self.expression, self.unit, self.comment = "2 mm", "mm", comment
+        comments = ["[Box] Thick", "[Box]Thick", "[ Box ]  two  spaces ", "[Unused] ", "[Box]", "plain",
+                    "", "[Uncategorized] x", "[Shared] a (Used by: A, B)"]
+        real = [handler._param_row(P(c), f"U{i}", True) for i, c in enumerate(comments)]
+        real.append(handler._param_row(P("[Tag] model note"), "d1", False)) # Model param: tag is not its group
+        enc = payload.encode_columnar(real)
+        self.assertEqual(sorted(enc['fullComments'], key=int), ['1', '2', '4', '7', '9'])
+        decoded = payload.decode_columnar(json.loads(json.dumps(enc)))
+        self.assertEqual([r['fullComment'] for r in decoded], comments + ["[Tag] model note"])
+        self.assertEqual(decoded, [{k: v for k, v in r.items() if k != 'rawExpression'} for r in real])
+
 
 class TestFusionIntegration(unittest.TestCase):
     """
     Tests that interact with the Fusion 360 Design.
     """
     
+    @fusion_only
     def test_dependency_crawler(self):
         """
         Verify ZenCrawler correctly identifies what body a parameter drives.
@@ -170,6 +514,246 @@ class TestFusionIntegration(unittest.TestCase):
             found = any(expected_name in b for b in driven_bodies)
             self.assertTrue(found, f"Expected {expected_name} in {driven_bodies}")
 
+    @fusion_only
+    def test_incremental_crawler_update(self):
+        """
+        Verify update_map() patches the maps to the same result as a full rebuild.
+        Workflow: Box -> Crawl -> Second Box driven by a new Param -> update_map -> Compare.
+        """
+        with TestContext() as ctx:
+            design = ctx.design
+            root = design.rootComponent
+
+            # 1. First Box + Crawl
+            sk = root.sketches.add(root.xYConstructionPlane)
+            sk.sketchCurves.sketchLines.addTwoPointRectangle(adsk.core.Point3D.create(0,0,0), adsk.core.Point3D.create(5,5,0))
+            root.features.extrudeFeatures.addSimple(sk.profiles.item(0), adsk.core.ValueInput.createByReal(1.0), adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
+            craw = crawler.ZenDependencyCrawler(design)
+
+            # 2. Second Box driven by a new parameter
+            param = design.userParameters.add("LidHeight", adsk.core.ValueInput.createByString("3mm"), "mm", "")
+            sk2 = root.sketches.add(root.xZConstructionPlane)
+            sk2.sketchCurves.sketchLines.addTwoPointRectangle(adsk.core.Point3D.create(0,0,0), adsk.core.Point3D.create(2,2,0))
+            ext = root.features.extrudeFeatures.addSimple(sk2.profiles.item(0), adsk.core.ValueInput.createByReal(1.0), adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
+            ext.bodies.item(0).name = "Lid"
+            adsk.fusion.DistanceExtentDefinition.cast(ext.extentOne).distance.expression = "LidHeight"
+
+            # 3. Incremental update must report the param and match a full crawl
+            changed = craw.update_map()
+            self.assertIn("LidHeight", changed)
+
+            full = crawler.ZenDependencyCrawler(design)
+            self.assertEqual(craw.dependency_index, full.dependency_index)
+            self.assertEqual(craw.entity_map, full.entity_map)
+            self.assertTrue(any("Lid" in b for b in craw.get_param_body_name(param)))
+
+    def test_param_snapshot_cache(self):
+        """
+        Verify repeated table reads hit the snapshot and ZenParams edits are patched in.
+        Workflow: Param -> Read x2 -> batch_update -> Read -> Add param outside ZenParams -> Read.
+        """
+        with TestContext() as ctx:
+            design = ctx.design
+            design.userParameters.add("Wall", adsk.core.ValueInput.createByString("2mm"), "mm", "")
+            hdlr = handler.ZenPaletteEventHandler("TEST_PALETTE", APP_PATH)
+            try:
+                hdlr._get_param_list()
+                hdlr._get_param_list()
+                self.assertEqual(hdlr._snapshot.hits, 1)
+
+                # Own edit -> patched in place, still a hit
+                hdlr._handle_batch_update({'items': [{'name': 'Wall', 'expression': '3 mm'}], 'suppress_refresh': True}, None)
+                rows = {r['name']: r for r in hdlr._get_param_list()}
+                self.assertEqual(rows['Wall']['expression'], '3')
+                self.assertEqual(hdlr._snapshot.hits, 2)
+
+                # Outside edit changes the fingerprint -> rebuilt
+                design.userParameters.add("Gap", adsk.core.ValueInput.createByString("1mm"), "mm", "")
+                self.assertIn("Gap", [r['name'] for r in hdlr._get_param_list()])
+            finally:
+                hdlr.stop()
+
+    def test_data_changed_pushed_once_per_change(self):
+        """
+        Verify edits push one 'data_changed' event each (a batch or a burst of refreshes is one event), with consecutive versions.
+        """
+        with TestContext() as ctx:
+            design = ctx.design
+            design.userParameters.add("Wall", adsk.core.ValueInput.createByString("2 mm"), "mm", "")
+            design.userParameters.add("Gap", adsk.core.ValueInput.createByString("1 mm"), "mm", "")
+            hdlr = handler.ZenPaletteEventHandler("TEST_PALETTE", APP_PATH)
+            sent = []
+            send = hdlr._send_response
+            def capture(content, type_str, **extra):
+                if type_str == 'data_changed': sent.append((content, extra))
+                send(content, type_str, **extra)
+            hdlr._send_response = capture
+            try:
+                batch = lambda items: hdlr._handle_batch_update({'items': items, 'suppress_refresh': True}, None)
+                batch([{'name': 'Wall', 'expression': '3 mm'}, {'name': 'Gap', 'expression': '2 mm'}])
+                self.assertEqual(len(sent), 1) # Two edits, one event
+                content, extra = sent[0]
+                self.assertEqual((content['version'], content['reason'], extra['seq']), (1, 'edited', 1))
+                self.assertIn('table_seq', content)
+
+                batch([{'name': 'Wall', 'expression': '3 mm'}]) # No change -> no event
+                self.assertEqual(len(sent), 1)
+
+                # A burst of geometry commands -> one refresh, one event (the sort tags both params)
+                for _ in range(3):
+                    hdlr.scheduler.request(scheduler.LEVEL_MAP)
+                hdlr.scheduler.flush()
+                self.assertEqual([(c['version'], c['reason']) for c, _ in sent[1:]], [(2, 'sorted')])
+
+                hdlr.scheduler.request(scheduler.LEVEL_MAP) # Nothing left to sort
+                hdlr.scheduler.flush()
+                self.assertEqual([(c['version'], c['reason']) for c, _ in sent[2:]], [(3, 'geometry')])
+            finally:
+                hdlr.stop()
+
+    def test_initial_data_before_sort(self):
+        """
+        Verify palette open returns the table without waiting for auto-sort, which runs as a queued refresh.
+        """
+        with TestContext() as ctx:
+            design = ctx.design
+            param = design.userParameters.add("Loose", adsk.core.ValueInput.createByString("2mm"), "mm", "")
+            hdlr = handler.ZenPaletteEventHandler("TEST_PALETTE", APP_PATH)
+            try:
+                class Args: returnData = None
+                args = Args()
+                hdlr._handle_get_initial_data({}, args)
+                res = json.loads(args.returnData)
+                self.assertEqual(res['type'], 'init_all')
+                self.assertIn("Loose", [r['name'] for r in res['content']['params']])
+                self.assertEqual(param.comment, "") # Not sorted yet
+
+                hdlr.scheduler.flush()
+                self.assertEqual(param.comment, "[Unused] ")
+                self.assertIn('palette.first_rows', metrics.METRICS.summary())
+            finally:
+                hdlr.stop()
+
+    def test_preview_uses_raw_expressions(self):
+        """
+        Verify preview and sweep evaluate the expression with its unit, not the table's unit-stripped display form.
+        """
+        with TestContext() as ctx:
+            design = ctx.design
+            design.userParameters.add("Wall", adsk.core.ValueInput.createByString("8 mm"), "mm", "")
+            design.userParameters.add("Lid", adsk.core.ValueInput.createByString("Wall * Wall / 4 mm"), "mm", "")
+            hdlr = handler.ZenPaletteEventHandler("TEST_PALETTE", APP_PATH)
+            try:
+                class Args: returnData = None
+                args = Args()
+                hdlr._handle_preview_values({'changes': {}}, args)
+                res = json.loads(args.returnData)
+                self.assertEqual(res['errors'], {}) # "Wall * Wall / 4" would be an area
+                self.assertAlmostEqual(res['values']['Lid']['value'], 16.0)
+
+                hdlr._handle_run_sweep({'axes': [{'param': 'Wall', 'values': [8, 12]}], 'outputs': ['Lid']}, args)
+                self.assertEqual(json.loads(args.returnData)['data']['Lid'], [16.0, 36.0])
+            finally:
+                hdlr.stop()
+
+    def test_storage_bulk_and_blobs(self):
+        """
+        Verify get_many/set_many and that a blob bigger than one attribute round-trips.
+        """
+        with TestContext() as ctx:
+            design = ctx.design
+            store = storage.ZenStorage(design)
+            store.set_many({'a': '1', 'b': '2'})
+            self.assertEqual(store.get_many(['a', 'b', 'c']), {'a': '1', 'b': '2', 'c': None})
+
+            # Incompressible payload -> several chunks
+            blob = {'rows': [format(i * 2654435761 % 4294967296, 'x') for i in range(20000)]}
+            self.assertTrue(store.set_blob('index', blob))
+            self.assertGreater(json.loads(store.get('index'))['chunks'], 1)
+            storage.invalidate_cache() # Read back from the design, not the cache
+            self.assertEqual(storage.ZenStorage(design).get_blob('index'), blob)
+
+            # Shrinking the blob drops the extra chunks
+            store.set_blob('index', {'rows': []})
+            self.assertIsNone(design.attributes.itemByName(storage.GROUP_NAME, 'index#1'))
+            store.delete_blob('index')
+            self.assertIsNone(store.get_blob('index'))
+
+    def test_batch_update_rollback(self):
+        """
+        Verify a transactional batch_update with one bad expression changes nothing.
+        """
+        with TestContext() as ctx:
+            design = ctx.design
+            design.userParameters.add("Wall", adsk.core.ValueInput.createByString("2 mm"), "mm", "")
+            design.userParameters.add("Gap", adsk.core.ValueInput.createByString("1 mm"), "mm", "")
+            hdlr = handler.ZenPaletteEventHandler("TEST_PALETTE", APP_PATH)
+            try:
+                class Args: returnData = None
+                args = Args()
+                hdlr._handle_batch_update({'items': [
+                    {'name': 'Wall', 'expression': '3 mm'},
+                    {'name': 'Gap', 'expression': 'NoSuchParam * 2'},
+                    {'name': 'Lid', 'expression': '4 mm'},
+                ], 'suppress_refresh': True}, args)
+
+                res = json.loads(args.returnData)
+                self.assertEqual(res['status'], 'error') # Caught by validation, model untouched
+                self.assertEqual([e['name'] for e in res['errors']], ['Gap'])
+                self.assertEqual(design.userParameters.itemByName("Wall").expression, "2 mm")
+                self.assertIsNone(design.userParameters.itemByName("Lid"))
+            finally:
+                hdlr.stop()
+
+    def test_batch_update_partial_count(self):
+        """
+        Verify a non-transactional batch with one failing create reports only the operations that went through.
+        """
+        with TestContext() as ctx:
+            design = ctx.design
+            wall = design.userParameters.add("Wall", adsk.core.ValueInput.createByString("2 mm"), "mm", "")
+            hdlr = handler.ZenPaletteEventHandler("TEST_PALETTE", APP_PATH)
+            try:
+                target = lambda name, expr, param=None, comment=None: {
+                    'name': name, 'expression': expr, 'comment': comment, 'create': param is None, 'param': param, 'is_user': True}
+                res = hdlr._apply_batch(design, [
+                    target('Good', '4 mm'),
+                    target('Bad', 'NoSuchParam * 2'), # Rejected by Fusion (the offline check is bypassed here)
+                    target('Wall', '3 mm', wall, comment='Outer'),
+                ], transactional=False)
+
+                self.assertEqual(res['status'], 'partial')
+                self.assertEqual([e['name'] for e in res['errors']], ['Bad'])
+                self.assertEqual(res['created'], 1)
+                self.assertEqual(res['count'], 3) # Good + Wall expression + Wall comment
+                self.assertIsNone(design.userParameters.itemByName('Bad'))
+            finally:
+                hdlr.stop()
+
+    def test_delete_param_checks(self):
+        """
+        Verify deletes are blocked by dependentParameters and never build a crawler on a cold handler.
+        """
+        with TestContext() as ctx:
+            design = ctx.design
+            design.userParameters.add("Base", adsk.core.ValueInput.createByString("10 mm"), "mm", "")
+            design.userParameters.add("Wall", adsk.core.ValueInput.createByString("Base * 2"), "mm", "")
+            design.userParameters.add("Spare", adsk.core.ValueInput.createByString("1 mm"), "mm", "")
+            hdlr = handler.ZenPaletteEventHandler("TEST_PALETTE", APP_PATH)
+            try:
+                class Args: returnData = None
+                args = Args()
+                hdlr._handle_delete_param({'name': 'Base'}, args)
+                self.assertIn("Used by: Wall", json.loads(args.returnData)['msg'])
+
+                hdlr._handle_delete_param({'name': 'Spare'}, args)
+                self.assertEqual(json.loads(args.returnData)['status'], 'success')
+                self.assertIsNone(design.userParameters.itemByName('Spare'))
+                self.assertIsNone(hdlr.crawler) # No dependency crawl just for the hint
+            finally:
+                hdlr.stop()
+
+    @fusion_only
     def test_auto_sort_logic(self):
         """
         Verify that _auto_sort_params in the handler updates comments.
@@ -215,6 +799,104 @@ class TestFusionIntegration(unittest.TestCase):
             print(f"DEBUG: Param Comment after sort: {param.comment}")
             self.assertTrue("[SortingBody]" in param.comment, f"Expected '[SortingBody]' in comment, but got: '{param.comment}'")
 
+    @fusion_only
+    def test_categorize_all_matches_lookup(self):
+        """
+        Verify the one-pass categorize_all agrees with per-param lookups (chained + unused params).
+        """
+        with TestContext() as ctx:
+            design = ctx.design
+            root = design.rootComponent
+            sk = root.sketches.add(root.xYConstructionPlane)
+            lines = sk.sketchCurves.sketchLines
+            lines.addTwoPointRectangle(adsk.core.Point3D.create(0,0,0), adsk.core.Point3D.create(5,5,0))
+            ext = root.features.extrudeFeatures.addSimple(sk.profiles.item(0), adsk.core.ValueInput.createByReal(1.0), adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
+            ext.bodies.item(0).name = "CatBody"
+
+            design.userParameters.add("Base", adsk.core.ValueInput.createByString("10mm"), "mm", "")
+            design.userParameters.add("Wall", adsk.core.ValueInput.createByString("Base * 2"), "mm", "")
+            design.userParameters.add("Spare", adsk.core.ValueInput.createByString("1mm"), "mm", "")
+            adsk.fusion.DistanceExtentDefinition.cast(ext.extentOne).distance.expression = "Wall"
+            adsk.doEvents()
+
+            craw = crawler.ZenDependencyCrawler(design)
+            cats = craw.categorize_all()
+            self.assertEqual(cats["Spare"]["category"], "Unused")
+            self.assertTrue(cats["Base"]["category"].endswith("CatBody")) # Through Wall
+            for param in design.userParameters:
+                self.assertEqual(cats[param.name]["bodies"], craw.get_param_body_name(param) or [])
+
+    @fusion_only
+    def test_body_path_cache_survives_refresh(self):
+        """
+        Verify body paths are reused across refresh_map and dropped when their component or body is renamed.
+        """
+        with TestContext() as ctx:
+            design = ctx.design
+            occ = design.rootComponent.occurrences.addNewComponent(adsk.core.Matrix3D.create())
+            comp = occ.component
+            comp.name = "CacheComp"
+            sk = comp.sketches.add(comp.xYConstructionPlane)
+            lines = sk.sketchCurves.sketchLines
+            lines.addTwoPointRectangle(adsk.core.Point3D.create(0,0,0), adsk.core.Point3D.create(5,5,0))
+            ext = comp.features.extrudeFeatures.addSimple(sk.profiles.item(0), adsk.core.ValueInput.createByReal(1.0), adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
+            ext.bodies.item(0).name = "CacheBody"
+            adsk.doEvents()
+
+            craw = crawler.ZenDependencyCrawler(design)
+            craw.refresh_map()
+            stats = craw.path_cache_stats()['last']
+            self.assertEqual(stats['misses'], 0)
+            self.assertEqual(stats['hit_rate'], 1.0)
+
+            comp.name = "CacheComp2"
+            craw.refresh_map()
+            paths = set().union(*craw.entity_map.values())
+            self.assertIn("CacheComp2/CacheBody", paths)
+            self.assertNotIn("CacheComp/CacheBody", paths)
+
+            ext.bodies.item(0).name = "CacheLid" # Body rename: no timeline change
+            craw.refresh_map()
+            paths = set().union(*craw.entity_map.values())
+            self.assertIn("CacheComp2/CacheLid", paths)
+            self.assertNotIn("CacheComp2/CacheBody", paths)
+
+    @fusion_only
+    def test_crawler_index_restore(self):
+        """
+        Verify a saved crawler index restores to the same maps, and is patched after an edit or a body rename.
+        """
+        with TestContext() as ctx:
+            design = ctx.design
+            root = design.rootComponent
+            sk = root.sketches.add(root.xYConstructionPlane)
+            lines = sk.sketchCurves.sketchLines
+            lines.addTwoPointRectangle(adsk.core.Point3D.create(0,0,0), adsk.core.Point3D.create(5,5,0))
+            ext = root.features.extrudeFeatures.addSimple(sk.profiles.item(0), adsk.core.ValueInput.createByReal(1.0), adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
+            design.userParameters.add("Depth", adsk.core.ValueInput.createByString("10mm"), "mm", "")
+            design.userParameters.add("Spare", adsk.core.ValueInput.createByString("1mm"), "mm", "")
+            adsk.fusion.DistanceExtentDefinition.cast(ext.extentOne).distance.expression = "Depth"
+            adsk.doEvents()
+
+            craw = crawler.ZenDependencyCrawler(design)
+            state = json.loads(json.dumps(craw.export_state())) # As it comes back from storage
+
+            restored = crawler.ZenDependencyCrawler(design, state=state)
+            self.assertEqual(restored.entity_map, craw.entity_map)
+            self.assertEqual(restored.dependency_index, craw.dependency_index)
+            self.assertEqual(restored.built_fingerprint, restored.saved_fingerprint)
+
+            adsk.fusion.DistanceExtentDefinition.cast(ext.extentOne).distance.expression = "Spare"
+            adsk.doEvents()
+            patched = crawler.ZenDependencyCrawler(design, state=state)
+            self.assertEqual(patched.dependency_index, crawler.ZenDependencyCrawler(design).dependency_index)
+            self.assertNotEqual(patched.built_fingerprint, patched.saved_fingerprint)
+
+            ext.bodies.item(0).name = "RenamedBody" # Changes no timeline item / parameter
+            renamed = crawler.ZenDependencyCrawler(design, state=state)
+            self.assertIn("RenamedBody", " ".join(set().union(*renamed.entity_map.values())))
+
+    @fusion_only
     def test_units_handling(self):
         """
         Verify that creating parameters respects units (mm vs in).
@@ -234,6 +916,7 @@ class TestFusionIntegration(unittest.TestCase):
             # 1 inch = 2.54 cm
             self.assertAlmostEqual(p.value, 2.54, places=4)
 
+    @fusion_only
     def test_auto_sort_after_creation(self):
         """
         Verify that auto-sort triggers automatically after creating a new parameter via batch_update.
@@ -290,6 +973,156 @@ class TestFusionIntegration(unittest.TestCase):
             created_param.deleteMe()
 
 
+@unittest.skipUnless(STUBBED, "stand-in designs (tests/stubs) only")
+class TestStandInDesigns(unittest.TestCase):
+    """
+    Crawler and handler tests on stand-in designs (tests/stubs), the CI counterpart
+    of the geometry tests above: bodies, sketches, extrudes and model parameters
+    are built directly.
+    """
+
+    def setUp(self):
+        from synthetic import SIZES, make_design
+        self.design = make_design(**SIZES['small'])
+
+    def tearDown(self):
+        adsk.core.Application.get().activeProduct = None
+
+    def _add_body(self, name, comp=None):
+        """Sketch + extrude making a new body at the end of the timeline."""
+        comp = comp or self.design.rootComponent
+        body = adsk.fusion.BRepBody(name, comp)
+        sketch = adsk.fusion.Sketch(comp)
+        ext = adsk.fusion.ExtrudeFeature(bodies=[body], profile=adsk.fusion.Profile(sketch))
+        self.design.add_timeline(sketch)
+        self.design.add_timeline(ext)
+        return body, ext
+
+    def _body(self, name):
+        for comp in self.design.allComponents:
+            for body in comp.bRepBodies:
+                if body.name == name: return body
+
+    def _paths(self, craw):
+        return set().union(*craw.entity_map.values())
+
+    def test_incremental_update_matches_full(self):
+        """Verify update_map() patches the maps to the same result as a full rebuild."""
+        craw = crawler.ZenDependencyCrawler(self.design)
+        param = self.design.userParameters.add("LidHeight", adsk.core.ValueInput.createByString("3 mm"), "mm", "")
+        _, ext = self._add_body("Lid")
+        self.design.add_model_parameter("d9001", "LidHeight", ext)
+
+        self.assertIn("LidHeight", craw.update_map())
+        full = crawler.ZenDependencyCrawler(self.design)
+        self.assertEqual(craw.dependency_index, full.dependency_index)
+        self.assertEqual(craw.entity_map, full.entity_map)
+        self.assertIn("(Unsaved)/Lid", craw.get_param_body_name(param))
+
+    def test_categorize_all_matches_lookup(self):
+        """Verify the one-pass categorize_all agrees with per-param lookups."""
+        self.design.userParameters.add("Spare", adsk.core.ValueInput.createByString("1 mm"), "mm", "")
+        craw = crawler.ZenDependencyCrawler(self.design)
+        cats = craw.categorize_all()
+        self.assertEqual(cats["Spare"]["category"], "Unused")
+        for param in self.design.userParameters:
+            self.assertEqual(cats[param.name]["bodies"], craw.get_param_body_name(param) or [])
+
+    def test_body_path_cache_renames(self):
+        """Verify refresh_map reuses cached body paths and picks up component and body renames."""
+        craw = crawler.ZenDependencyCrawler(self.design)
+        craw.refresh_map()
+        self.assertEqual(craw.path_cache_stats()['last']['misses'], 0)
+
+        body = self._body("Body1")
+        body.parentComponent.name = "Renamed"
+        body.name = "Lid"
+        craw.refresh_map()
+        paths = self._paths(craw)
+        self.assertIn("Renamed/Lid", paths)
+        self.assertFalse(any(p.endswith("/Body1") for p in paths))
+
+    def test_batch_update_relinks_body_answers(self):
+        """Verify a batch edit re-links the graph and drops stale body answers without an update_map."""
+        add = lambda name, expr: self.design.userParameters.add(name, adsk.core.ValueInput.createByString(expr), "mm", "")
+        base, gap = add("SyncBase", "10 mm"), add("SyncGap", "1 mm")
+        add("SyncWall", "SyncBase * 2")
+        _, ext = self._add_body("SyncBody")
+        self.design.add_model_parameter("d9002", "SyncWall", ext)
+
+        hdlr = handler.ZenPaletteEventHandler("TEST_PALETTE", APP_PATH)
+        try:
+            craw = hdlr._get_crawler(self.design)
+            self.assertEqual(craw.get_param_body_name(base), ["(Unsaved)/SyncBody"])
+            self.assertIsNone(craw.get_param_body_name(gap))
+
+            class Args: returnData = None
+            hdlr._handle_batch_update({'items': [{'name': 'SyncWall', 'expression': 'SyncGap * 2'}], 'suppress_refresh': True}, Args())
+            self.assertIsNone(craw.get_param_body_name(base))
+            self.assertEqual(craw.get_param_body_name(gap), ["(Unsaved)/SyncBody"])
+        finally:
+            hdlr.stop()
+
+    def test_model_param_pages(self):
+        """Verify model-param paging: offset / limit boundaries, user params skipped, next_offset only while more remain."""
+        design = adsk.fusion.Design('Paging')
+        for i in range(5):
+            design.add_model_parameter(f"d{i + 1}", f"{i + 1} mm")
+            if i % 2: design.userParameters.add(f"U{i}", adsk.core.ValueInput.createByString("1 mm"), "mm", "")
+        design.userParameters.add("Last", adsk.core.ValueInput.createByString("1 mm"), "mm", "") # Trailing user param
+        hdlr = handler.ZenPaletteEventHandler("TEST_PALETTE", APP_PATH)
+        try:
+            names = lambda page: [r['name'] for r in page['items']]
+            first = hdlr._get_model_params_page(design, 0, 2)
+            self.assertEqual(names(first), ["d1", "d2"])
+            self.assertEqual(first['total'], 5)
+            second = hdlr._get_model_params_page(design, first['next_offset'], 2)
+            self.assertEqual(names(second), ["d3", "d4"]) # U1 skipped
+            last = hdlr._get_model_params_page(design, second['next_offset'], 2)
+            self.assertEqual(names(last), ["d5"])
+            self.assertIsNone(last['next_offset'])
+
+            # A page that ends exactly on the last model param (only user params after it) is the last one
+            exact = hdlr._get_model_params_page(design, 0, 5)
+            self.assertEqual(len(exact['items']), 5)
+            self.assertIsNone(exact['next_offset'])
+            self.assertIsNotNone(hdlr._get_model_params_page(design, 0, 4)['next_offset'])
+            past = hdlr._get_model_params_page(design, 99, 2)
+            self.assertEqual((past['items'], past['next_offset']), ([], None))
+
+            class Args: returnData = None
+            args = Args()
+            adsk.core.Application.get().activeProduct = design
+            hdlr._handle_get_model_params({'offset': 0, 'limit': 3}, args)
+            res = json.loads(args.returnData)
+            self.assertEqual(names(res), ["d1", "d2", "d3"])
+            self.assertIsNotNone(res['next_offset'])
+        finally:
+            hdlr.stop()
+
+    def test_index_restore(self):
+        """Verify a saved index restores to the same maps and is patched after an edit or a body rename."""
+        craw = crawler.ZenDependencyCrawler(self.design)
+        state = json.loads(json.dumps(craw.export_state())) # As it comes back from storage
+
+        restored = crawler.ZenDependencyCrawler(self.design, state=state)
+        self.assertEqual(restored.entity_map, craw.entity_map)
+        self.assertEqual(restored.dependency_index, craw.dependency_index)
+        self.assertEqual(restored.built_fingerprint, restored.saved_fingerprint)
+
+        self.design.allParameters.itemByName("d1").expression = "U0 + 1 mm"
+        patched = crawler.ZenDependencyCrawler(self.design, state=state)
+        self.assertEqual(patched.dependency_index, crawler.ZenDependencyCrawler(self.design).dependency_index)
+
+        self._body("Body1").name = "Lid" # Changes no timeline item / parameter
+        renamed = crawler.ZenDependencyCrawler(self.design, state=state)
+        self.assertTrue(any(p.endswith("/Lid") for p in self._paths(renamed)))
+
+
+def tearDownModule():
+    logger.shutdown() # Ends the writer thread (the add-in does this on stop)
+
+
 # --- TEST RUNNER ---
 
 def run(context):
@@ -328,3 +1161,7 @@ def run(context):
         if ui:
             ui.messageBox('Test Failed:\n{}'.format(traceback.format_exc()))
 
+
+if __name__ == '__main__':
+    # Outside Fusion: python tests/run_tests.py (geometry tests skip on the stand-in adsk)
+    unittest.main()
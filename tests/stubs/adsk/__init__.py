@@ -0,0 +1,12 @@
+"""
+Fusion-free stand-in for the parts of the adsk API ZenParams uses.
+Lets the crawler / handler / benchmarks run on plain Python (CI, Linux).
+Put tests/stubs first on sys.path; inside Fusion the real adsk is used instead.
+"""
+from . import core, fusion
+
+def autoTerminate(value):
+    pass
+
+def doEvents():
+    core._DO_EVENTS[0] += 1
@@ -0,0 +1,73 @@
+"""adsk.core stand-in: Application (singleton), palettes, custom events, ValueInput."""
+_DO_EVENTS = [0]
+
+class Base:
+    isValid = True
+
+class _Handler:
+    def __init__(self): pass
+class HTMLEventHandler(_Handler): pass
+class CommandCreatedEventHandler(_Handler): pass
+class ApplicationEventHandler(_Handler): pass
+class DocumentEventHandler(_Handler): pass
+class CustomEventHandler(_Handler): pass
+class ApplicationCommandEventHandler(_Handler): pass
+
+class _Event:
+    def __init__(self): self.handlers = []
+    def add(self, h): self.handlers.append(h); return True
+    def remove(self, h): self.handlers.remove(h); return True
+
+class ValueInput:
+    def __init__(self, s): self.stringValue = s
+    @staticmethod
+    def createByString(s): return ValueInput(s)
+    @staticmethod
+    def createByReal(v): return ValueInput(str(v))
+
+class PaletteDockingStates:
+    PaletteDockStateRight = 'right'
+
+class Palette:
+    def __init__(self, pid):
+        self.id = pid; self.isVisible = True; self.sent = []; self.lines = []
+    def sendInfoToHTML(self, action, data): self.sent.append((action, data))
+    def writeText(self, t): self.lines.append(t)
+    def deleteMe(self): pass
+
+class _Palettes:
+    def __init__(self): self._items = {'TextCommands': Palette('TextCommands')}
+    def itemById(self, pid): return self._items.get(pid)
+    def add(self, pid, *a):
+        self._items[pid] = Palette(pid); return self._items[pid]
+
+class _UI:
+    def __init__(self): self.palettes = _Palettes()
+
+class CustomEventArgs:
+    def __init__(self, data): self.additionalInfo = data
+
+class Application:
+    _instance = None
+    def __init__(self):
+        self.activeProduct = None
+        self.userInterface = _UI()
+        self._custom = {}
+        self.fired = []
+    @staticmethod
+    def get():
+        if Application._instance is None: Application._instance = Application()
+        return Application._instance
+    def registerCustomEvent(self, eid):
+        self._custom[eid] = _Event(); return self._custom[eid]
+    def unregisterCustomEvent(self, eid):
+        self._custom.pop(eid, None); return True
+    def fireCustomEvent(self, eid, data=''):
+        self.fired.append((eid, data)); return True
+    def pump(self):
+        """Delivers fired custom events (stands in for Fusion's main loop)."""
+        fired, self.fired = self.fired, []
+        for eid, data in fired:
+            ev = self._custom.get(eid)
+            if ev:
+                for h in list(ev.handlers): h.notify(CustomEventArgs(data))
@@ -0,0 +1,187 @@
+"""
+adsk.fusion stand-in: Design with parameters, timeline, attributes and the entity
+types the crawler inspects (bodies, sketches, profiles, features).
+Expressions are checked for unknown names only; nothing is evaluated.
+"""
+import itertools, re
+from .core import Base
+
+_ids = itertools.count(1)
+_NAME = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+class _Collection(Base):
+    def __init__(self, items=None): self._items = list(items or [])
+    @property
+    def count(self): return len(self._items)
+    def item(self, i): return self._items[i] if 0 <= i < len(self._items) else None
+    def __iter__(self): return iter(list(self._items))
+    def __len__(self): return len(self._items)
+
+class Entity(Base):
+    def __init__(self):
+        self.entityToken = f"tok{next(_ids)}"
+
+class Component(Entity):
+    def __init__(self, name):
+        super().__init__(); self.name = name; self.bRepBodies = _Collection()
+
+class BRepBody(Entity):
+    def __init__(self, name, component):
+        super().__init__(); self.name = name; self.parentComponent = component
+        if component is not None: component.bRepBodies._items.append(self)
+
+class BRepFace(Entity):
+    def __init__(self, body):
+        super().__init__(); self.body = body
+
+class Sketch(Entity):
+    def __init__(self, component, plane=None):
+        super().__init__(); self.parentComponent = component; self.referencePlane = plane
+
+class Profile(Entity):
+    def __init__(self, sketch):
+        super().__init__(); self.parentSketch = sketch
+
+class SketchPoint(Entity):
+    def __init__(self, sketch):
+        super().__init__(); self.parentSketch = sketch
+
+class SketchDimension(Entity):
+    def __init__(self, sketch):
+        super().__init__(); self.parentSketch = sketch
+
+class Feature(Entity):
+    def __init__(self, bodies=(), profile=None):
+        super().__init__(); self.bodies = _Collection(bodies); self.profile = profile
+
+class ExtrudeFeature(Feature): pass
+
+class HoleFeature(Feature):
+    def __init__(self, bodies=(), points=()):
+        super().__init__(bodies); self.sketchPoints = _Collection(points)
+
+class EmbossFeature(Feature):
+    def __init__(self, bodies=(), profiles=()):
+        super().__init__(bodies); self.sketchProfiles = _Collection(profiles)
+
+class Parameter(Entity):
+    def __init__(self, design, name, expression, unit='mm', comment='', created_by=None):
+        super().__init__()
+        self._design = design; self.name = name; self._expression = expression
+        self.unit = unit; self.comment = comment; self.createdBy = created_by
+    @property
+    def expression(self): return self._expression
+    @expression.setter
+    def expression(self, value):
+        for ref in _NAME.findall(value):
+            if ref in self._design._reserved: continue
+            if ref not in self._design._by_name: raise RuntimeError(f"Unknown name '{ref}'")
+        self._expression = value
+        self._design.computeCount += 0 if self._design.isComputeDeferred else 1
+    @property
+    def dependentParameters(self):
+        return _Collection([p for p in self._design._params if self.name in _NAME.findall(p.expression or '')])
+    def deleteMe(self):
+        if self.dependentParameters.count: raise RuntimeError('Parameter is in use')
+        self._design._remove(self); self.isValid = False
+        return True
+
+class UserParameter(Parameter): pass
+class ModelParameter(Parameter): pass
+
+class UserParameters(_Collection):
+    def __init__(self, design):
+        super().__init__(); self._design = design
+    def itemByName(self, name):
+        p = self._design._by_name.get(name)
+        return p if isinstance(p, UserParameter) else None
+    def add(self, name, value, unit, comment):
+        p = UserParameter(self._design, name, '0', unit, comment)
+        self._design._add(p)
+        try: p.expression = value.stringValue
+        except:
+            self._design._remove(p) # Fusion adds nothing when the expression is rejected
+            raise
+        return p
+
+class ParameterList(_Collection):
+    def __init__(self, design):
+        super().__init__(); self._design = design
+    def itemByName(self, name): return self._design._by_name.get(name)
+
+class TimelineObject(Base):
+    def __init__(self, entity, index):
+        self.entity = entity; self.index = index
+        self.isSuppressed = False; self.isRolledBack = False
+
+class Timeline(_Collection):
+    def __init__(self):
+        super().__init__(); self.markerPosition = 0
+
+class Attribute(Base):
+    def __init__(self, owner, group, name, value):
+        self._owner = owner; self.groupName = group; self.name = name; self.value = value
+    def deleteMe(self):
+        self._owner._items.pop((self.groupName, self.name), None); return True
+
+class Attributes(Base):
+    def __init__(self): self._items = {}
+    @property
+    def count(self): return len(self._items)
+    def add(self, group, name, value):
+        a = Attribute(self, group, name, value); self._items[(group, name)] = a; return a
+    def itemByName(self, group, name): return self._items.get((group, name))
+    def itemsByGroup(self, group): return [a for (g, _), a in self._items.items() if g == group]
+
+class _Document(Base):
+    def __init__(self, name):
+        self.name = name; self.creationId = f"doc{next(_ids)}"
+
+class Design(Base):
+    def __init__(self, name='Untitled'):
+        self._params = []; self._by_name = {}
+        self._reserved = {'mm', 'cm', 'm', 'in', 'ft', 'deg', 'rad', 'sin', 'cos', 'tan', 'sqrt', 'abs', 'PI', 'floor', 'ceil', 'round', 'max', 'min', 'e', 'E'}
+        self.userParameters = UserParameters(self)
+        self.allParameters = ParameterList(self)
+        self.timeline = Timeline()
+        self.attributes = Attributes()
+        self.rootComponent = Component('(Unsaved)')
+        self.allComponents = _Collection([self.rootComponent])
+        self.parentDocument = _Document(name)
+        self.isComputeDeferred = False
+        self.computeCount = 0
+    @staticmethod
+    def cast(obj): return obj if isinstance(obj, Design) else None
+    def computeAll(self): self.computeCount += 1; return True
+    def modifyParameters(self, params, values):
+        old = [(p, p._expression) for p in params]
+        self.isComputeDeferred = True
+        try:
+            for p, v in zip(params, values): p.expression = v.stringValue if hasattr(v, 'stringValue') else v.expression
+        except:
+            for p, e in old: p._expression = e
+            self.isComputeDeferred = False
+            raise
+        self.isComputeDeferred = False
+        self.computeCount += 1
+        return True
+    def _add(self, p):
+        self._params.append(p); self._by_name[p.name] = p
+        self.allParameters._items.append(p)
+        if isinstance(p, UserParameter): self.userParameters._items.append(p)
+    def _remove(self, p):
+        self._params.remove(p); self._by_name.pop(p.name, None)
+        self.allParameters._items.remove(p)
+        if p in self.userParameters._items: self.userParameters._items.remove(p)
+    # --- Stand-in only (how synthetic designs get built) ---
+    def add_component(self, name):
+        comp = Component(name); self.allComponents._items.append(comp)
+        return comp
+    def add_model_parameter(self, name, expression, created_by=None, unit='mm'):
+        p = ModelParameter(self, name, expression, unit, '', created_by)
+        self._add(p)
+        return p
+    def add_timeline(self, entity):
+        obj = TimelineObject(entity, self.timeline.count)
+        self.timeline._items.append(obj); self.timeline.markerPosition = self.timeline.count
+        return obj
@@ -0,0 +1,82 @@
+"""
+Synthetic designs for benchmarks (built on the stand-in in tests/stubs).
+
+    design = make_design(user_params=200, model_params=2000, features=400, bodies=80, components=8)
+
+The shape follows what ZenParams sees in real files:
+- components own bodies; each body is made by one or more extrudes of a sketch
+  (some sketches sit on a face of an earlier body)
+- user params belong to a body and form chains (Wall = Base * 2), so
+  param -> param -> owner paths exist
+- model params are sketch dimensions or feature extents; about half reference
+  a user param (mostly one of their own body's), the rest are plain numbers
+"""
+import random
+
+import adsk.core
+import adsk.fusion
+
+SIZES = {
+    'small':  dict(user_params=50,  model_params=500,  features=100,  bodies=20,  components=4),
+    'medium': dict(user_params=200, model_params=2000, features=400,  bodies=80,  components=8),
+    'large':  dict(user_params=600, model_params=8000, features=1500, bodies=300, components=30),
+}
+
+
+def make_design(user_params=200, model_params=2000, features=400, bodies=80, components=8,
+                seed=1, name='Synthetic'):
+    """Builds a stand-in Design and makes it the active product. features counts sketches + extrudes."""
+    rng = random.Random(seed)
+    design = adsk.fusion.Design(name)
+    adsk.core.Application.get().activeProduct = design
+
+    # Components + bodies
+    comps = [design.rootComponent] + [design.add_component(f"Comp{i}") for i in range(1, components)]
+    body_list = [adsk.fusion.BRepBody(f"Body{i}", comps[i % len(comps)]) for i in range(bodies)]
+
+    # User params: each belongs to one body ("home"); the first third are constants,
+    # the rest derive from earlier params of the same home (a few from anywhere)
+    user_names = []
+    by_home = {}
+    for i in range(user_params):
+        pname = f"U{i}"
+        home = by_home.setdefault(i % len(body_list), [])
+        pool = home if home and rng.random() < 0.9 else user_names
+        if i < max(1, user_params // 3) or not pool:
+            expr = f"{rng.randint(1, 200)} mm"
+        else:
+            a, b = rng.choice(pool), rng.choice(pool)
+            expr = rng.choice([f"{a} * 2", f"{a} + {b}", f"({a} + {b}) / 2", f"{a} + 1 mm"])
+        design.userParameters.add(pname, adsk.core.ValueInput.createByString(expr), 'mm', '')
+        user_names.append(pname)
+        home.append(pname)
+
+    # Timeline: sketch, extrude, sketch, extrude, ...
+    owners = [] # (sketch dimension or feature, body index) that model params hang off
+    for i in range(features // 2):
+        b = i % len(body_list)
+        body = body_list[b]
+        plane = None
+        if i >= len(body_list) and rng.random() < 0.15:
+            plane = adsk.fusion.BRepFace(body_list[rng.randrange(len(body_list))]) # Sketch on face
+        sketch = adsk.fusion.Sketch(body.parentComponent, plane)
+        profile = adsk.fusion.Profile(sketch)
+        extrude = adsk.fusion.ExtrudeFeature(bodies=[body], profile=profile)
+        design.add_timeline(sketch)
+        design.add_timeline(extrude)
+        owners.append((adsk.fusion.SketchDimension(sketch), b))
+        owners.append((extrude, b))
+
+    # Model params: about half use a user param, mostly one living on the same body
+    # (some bodies' params stay unused, a few are shared across bodies)
+    for i in range(model_params):
+        owner, b = owners[i % len(owners)] if owners else (None, 0)
+        home = by_home.get(b)
+        if home and rng.random() < 0.5:
+            expr = rng.choice(home if rng.random() < 0.95 else user_names)
+            if rng.random() < 0.3: expr += " + 0.2 mm"
+        else:
+            expr = f"{rng.randint(1, 100)} mm"
+        design.add_model_parameter(f"d{i + 1}", expr, owner)
+
+    return design